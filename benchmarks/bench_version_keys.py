@@ -0,0 +1,78 @@
+"""
+Version comparison microbenchmark.
+
+Compares random pairs from a pool of realistic version strings with the
+memoized keys from ``version_keys``, and a sample of the same pairs by
+parsing both strings with ``packaging`` on every comparison, as
+``BaseAnalyzer._compare_versions`` used to.
+
+Usage:
+    python benchmarks/bench_version_keys.py [--comparisons 1000000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from version_keys import compare_versions, loose_key, pep440_key  # noqa: E402
+
+
+def make_versions(count: int, rng: random.Random) -> list:
+    suffixes = ['', '', '', 'rc1', 'b2', '.post1', '.dev3', 'a1']
+    return [
+        f'{rng.randint(0, 5)}.{rng.randint(0, 40)}.{rng.randint(0, 20)}{rng.choice(suffixes)}'
+        for _ in range(count)
+    ]
+
+
+def throughput(label: str, comparisons: int, seconds: float):
+    print(f'{label:<32} {comparisons:>10,} comparisons  {seconds:8.3f}s  '
+          f'{comparisons / seconds:>14,.0f}/s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark version comparisons')
+    parser.add_argument('--comparisons', type=int, default=1000000)
+    parser.add_argument('--distinct', type=int, default=2000, help='Distinct version strings')
+    parser.add_argument('--baseline-sample', type=int, default=100000,
+                        help='Comparisons timed for the uncached packaging baseline')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    versions = make_versions(args.distinct, rng)
+    pairs = [(rng.choice(versions), rng.choice(versions)) for _ in range(args.comparisons)]
+
+    start = time.perf_counter()
+    for a, b in pairs:
+        compare_versions(a, b)
+    throughput('compare_versions (pep440)', len(pairs), time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for a, b in pairs:
+        pep440_key(a) < pep440_key(b)
+    throughput('pep440_key tuples', len(pairs), time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for a, b in pairs:
+        loose_key(a) < loose_key(b)
+    throughput('loose_key tuples', len(pairs), time.perf_counter() - start)
+
+    try:
+        from packaging import version
+    except ImportError:
+        print('packaging is not installed; skipping the baseline')
+        return
+
+    sample = pairs[:args.baseline_sample]
+    start = time.perf_counter()
+    for a, b in sample:
+        version.parse(a) < version.parse(b)
+    throughput('packaging, parse per call', len(sample), time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    main()
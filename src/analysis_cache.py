@@ -0,0 +1,247 @@
+"""
+Persistent Analysis Cache
+
+Stores the result of parsing a source or manifest file in a SQLite
+database, keyed by path and file fingerprint (mtime + size, optionally a
+content hash), so unchanged files are not parsed again on later runs.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Bump when the table layout or value encoding changes
+SCHEMA_VERSION = 1
+
+DEFAULT_CACHE_DIRNAME = os.path.join('.polydepend', 'cache')
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+
+# Pending writes are committed once this many accumulate
+FLUSH_THRESHOLD = 1000
+
+
+def default_cache_dir(project_path: str) -> str:
+    """Get the default cache directory for a project."""
+    return os.path.join(project_path, DEFAULT_CACHE_DIRNAME)
+
+
+def _file_digest(path: str) -> str:
+    """Compute the sha256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """
+    On-disk cache of per-file analysis results.
+
+    Entries are grouped by namespace (one per analyzer and kind of file)
+    and carry the version of the logic that produced them, so changing an
+    analyzer only invalidates its own entries. The least recently used
+    entries are evicted once the cache grows beyond ``max_size`` bytes.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_size: int = DEFAULT_MAX_SIZE,
+        use_content_hash: bool = False
+    ):
+        """
+        Args:
+            cache_dir (str): Directory holding the cache database
+            max_size (int): Maximum total size of cached values, in bytes
+            use_content_hash (bool): Also fingerprint files by sha256, so a
+                file whose mtime changed but content did not is still a hit
+        """
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.use_content_hash = use_content_hash
+        self.db_path = os.path.join(cache_dir, 'analysis.sqlite3')
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        self._pending_puts: List[Tuple] = []
+        self._pending_touches: Dict[Tuple[str, str], float] = {}
+
+    def __getstate__(self):
+        # Connections cannot be shared across processes; reopen lazily
+        self.flush()
+        state = self.__dict__.copy()
+        state['_conn'] = None
+        return state
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            if conn.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+                conn.execute('DROP TABLE IF EXISTS entries')
+                conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            conn.execute(
+                '''CREATE TABLE IF NOT EXISTS entries (
+                    namespace TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    version INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    digest TEXT,
+                    value TEXT NOT NULL,
+                    nbytes INTEGER NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (namespace, path)
+                )'''
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)')
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, namespace: str, version: int, path: str, stat: os.stat_result = None) -> Optional[Any]:
+        """
+        Look up the cached result for a file.
+
+        Args:
+            namespace (str): Cache namespace (analyzer and kind of file)
+            version (int): Version of the logic that produces the value
+            path (str): Path of the file
+            stat (os.stat_result, optional): Current stat of the file
+
+        Returns:
+            Optional[Any]: The cached value, or None if missing or stale
+        """
+        if stat is None:
+            stat = os.stat(path)
+
+        row = self._connect().execute(
+            'SELECT version, mtime_ns, size, digest, value FROM entries '
+            'WHERE namespace = ? AND path = ?',
+            (namespace, path)
+        ).fetchone()
+        if row is None or row[0] != version or row[2] != stat.st_size:
+            self.misses += 1
+            return None
+
+        if row[1] != stat.st_mtime_ns:
+            if not (self.use_content_hash and row[3] and row[3] == _file_digest(path)):
+                self.misses += 1
+                return None
+            # Same content under a new mtime: refresh the fingerprint
+            self._pending_puts.append(
+                (namespace, path, version, stat.st_mtime_ns, stat.st_size,
+                 row[3], row[4], len(row[4]), time.time())
+            )
+        else:
+            self._pending_touches[(namespace, path)] = time.time()
+
+        self.hits += 1
+        self._maybe_flush()
+        return json.loads(row[4])
+
+    def put(self, namespace: str, version: int, path: str, value: Any, stat: os.stat_result = None):
+        """
+        Store the result for a file.
+
+        Args:
+            namespace (str): Cache namespace (analyzer and kind of file)
+            version (int): Version of the logic that produced the value
+            path (str): Path of the file
+            value (Any): JSON-serializable result
+            stat (os.stat_result, optional): Stat of the file taken before it was read
+        """
+        if stat is None:
+            stat = os.stat(path)
+
+        digest = _file_digest(path) if self.use_content_hash else None
+        encoded = json.dumps(value, separators=(',', ':'))
+        self._pending_puts.append(
+            (namespace, path, version, stat.st_mtime_ns, stat.st_size,
+             digest, encoded, len(encoded), time.time())
+        )
+        self._maybe_flush()
+
+    def get_or_compute(self, namespace: str, version: int, path: str, compute: Callable[[str], Any]) -> Any:
+        """
+        Get the cached result for a file, computing and storing it on a miss.
+
+        Args:
+            namespace (str): Cache namespace (analyzer and kind of file)
+            version (int): Version of the logic that produces the value
+            path (str): Path of the file
+            compute (Callable[[str], Any]): Function parsing the file
+
+        Returns:
+            Any: The (possibly cached) result
+        """
+        stat = os.stat(path)
+        value = self.get(namespace, version, path, stat)
+        if value is None:
+            value = compute(path)
+            self.put(namespace, version, path, value, stat)
+        return value
+
+    def _maybe_flush(self):
+        if len(self._pending_puts) + len(self._pending_touches) >= FLUSH_THRESHOLD:
+            self.flush()
+
+    def flush(self):
+        """Write pending entries and evict the least recently used ones."""
+        if not (self._pending_puts or self._pending_touches):
+            return
+
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO entries '
+                '(namespace, path, version, mtime_ns, size, digest, value, nbytes, last_used) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                self._pending_puts
+            )
+            conn.executemany(
+                'UPDATE entries SET last_used = ? WHERE namespace = ? AND path = ?',
+                [(used, ns, path) for (ns, path), used in self._pending_touches.items()]
+            )
+        self._pending_puts = []
+        self._pending_touches = {}
+        self.evict()
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits ``max_size``."""
+        conn = self._connect()
+        total = conn.execute('SELECT COALESCE(SUM(nbytes), 0) FROM entries').fetchone()[0]
+        if total <= self.max_size:
+            return
+
+        excess = total - self.max_size
+        doomed = []
+        for namespace, path, nbytes in conn.execute(
+            'SELECT namespace, path, nbytes FROM entries ORDER BY last_used'
+        ):
+            doomed.append((namespace, path))
+            excess -= nbytes
+            if excess <= 0:
+                break
+
+        with conn:
+            conn.executemany('DELETE FROM entries WHERE namespace = ? AND path = ?', doomed)
+
+    def clear(self):
+        """Remove every cached entry."""
+        self._pending_puts = []
+        self._pending_touches = {}
+        conn = self._connect()
+        with conn:
+            conn.execute('DELETE FROM entries')
+
+    def close(self):
+        """Flush pending writes and close the database."""
+        self.flush()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
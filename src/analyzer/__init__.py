@@ -1,7 +1,13 @@
-from .python_analyzer import PythonDependencyAnalyzer
-from .javascript_analyzer import JavaScriptDependencyAnalyzer
-from .java_analyzer import JavaDependencyAnalyzer
-from .rust_analyzer import RustDependencyAnalyzer
+import importlib
+
+# Analyzer modules are imported on first attribute access, so importing
+# the package does not load every analyzer and its parsing dependencies
+_ANALYZER_MODULES = {
+    "PythonDependencyAnalyzer": ".python_analyzer",
+    "JavaScriptDependencyAnalyzer": ".javascript_analyzer",
+    "JavaDependencyAnalyzer": ".java_analyzer",
+    "RustDependencyAnalyzer": ".rust_analyzer",
+}
 
 __all__ = [
     "PythonDependencyAnalyzer",
@@ -9,3 +15,14 @@ __all__ = [
     "JavaDependencyAnalyzer",
     "RustDependencyAnalyzer",
 ]
+
+def __getattr__(name):
+    module_name = _ANALYZER_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
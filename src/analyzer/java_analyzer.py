@@ -1,22 +1,37 @@
 import os
-import xml.etree.ElementTree as ET
 import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional
 
 from base_analyzer import BaseAnalyzer
+from dependency_records import ImportTable
+from project_walker import FileIndex
 
 class JavaDependencyAnalyzer(BaseAnalyzer):
-    def analyze_dependencies(self, project_path: str) -> Dict[str, Any]:
+    source_extensions = ('.java',)
+    manifest_names = ('pom.xml', 'build.gradle')
+    
+    # Version 2: static imports are reported
+    cache_version = 2
+    
+    version_scheme = 'maven'
+    
+    def analyze_dependencies(
+        self, 
+        project_path: str, 
+        file_index: Optional[FileIndex] = None
+    ) -> Dict[str, Any]:
         """
         Analyze Java project dependencies.
         
         Args:
             project_path (str): Path to the Java project
+            file_index (Optional[FileIndex]): Index from a shared project walk
         
         Returns:
             Dict[str, Any]: Comprehensive dependency analysis
         """
-        dependencies = self._find_dependencies(project_path)
+        file_index = self._get_file_index(project_path, file_index)
+        dependencies = self._find_dependencies(file_index)
         conflicts = self.detect_conflicts(dependencies)
         
         return {
@@ -24,41 +39,42 @@ class JavaDependencyAnalyzer(BaseAnalyzer):
             'conflicts': conflicts
         }
     
-    def _find_dependencies(self, project_path: str) -> List[Dict[str, Any]]:
+    def _find_dependencies(self, file_index: FileIndex) -> List[Dict[str, Any]]:
         """
-        Find dependencies by scanning pom.xml and build.gradle files.
+        Find dependencies from pom.xml, build.gradle and source imports.
         """
-        dependencies = []
-        
-        # Check Maven (pom.xml)
-        pom_path = self._find_file(project_path, 'pom.xml')
-        if pom_path:
-            dependencies.extend(self._parse_maven_dependencies(pom_path))
-        
-        # Check Gradle (build.gradle)
-        gradle_path = self._find_file(project_path, 'build.gradle')
-        if gradle_path:
-            dependencies.extend(self._parse_gradle_dependencies(gradle_path))
+        dependencies = list(self._iter_declared_dependencies(file_index.root, file_index))
         
         # Scan source files for imports
-        imported_modules = self._scan_imports(project_path)
-        dependencies.extend(imported_modules)
+        imported_modules = self._scan_imports(file_index.files_with_extensions(self.source_extensions))
+        dependencies.extend(imported_modules.to_dicts())
         
         return dependencies
     
-    def _find_file(self, project_path: str, filename: str) -> str:
+    def _iter_declared_dependencies(
+        self, 
+        project_path: str, 
+        file_index: FileIndex
+    ) -> Iterator[Dict[str, Any]]:
         """
-        Find a specific file in the project directory.
+        Yield dependencies declared in pom.xml and build.gradle.
         """
-        for root, _, files in os.walk(project_path):
-            if filename in files:
-                return os.path.join(root, filename)
-        return None
+        # Check Maven (pom.xml)
+        pom_path = file_index.first_file_named('pom.xml')
+        if pom_path:
+            yield from self._cached('pom', pom_path, self._parse_maven_dependencies)
+        
+        # Check Gradle (build.gradle)
+        gradle_path = file_index.first_file_named('build.gradle')
+        if gradle_path:
+            yield from self._cached('gradle', gradle_path, self._parse_gradle_dependencies)
     
     def _parse_maven_dependencies(self, pom_path: str) -> List[Dict[str, Any]]:
         """
         Parse dependencies from Maven pom.xml file.
         """
+        import xml.etree.ElementTree as ET
+        
         dependencies = []
         try:
             tree = ET.parse(pom_path)
@@ -111,59 +127,83 @@ class JavaDependencyAnalyzer(BaseAnalyzer):
         
         return dependencies
     
-    def _scan_imports(self, project_path: str) -> List[Dict[str, Any]]:
+    def _scan_imports(self, source_files: List[str]) -> ImportTable:
         """
         Scan Java source files for imported packages.
+        
+        Returns the occurrences aggregated per imported name.
         """
-        imported_modules = []
+        imports = ImportTable()
         
-        for root, _, files in os.walk(project_path):
-            for file in files:
-                if file.endswith('.java'):
-                    file_path = os.path.join(root, file)
-                    
-                    with open(file_path, 'r') as f:
-                        for line in f:
-                            line = line.strip()
-                            if line.startswith('import ') and not line.startswith('import static'):
-                                try:
-                                    # Remove 'import ' and ';'
-                                    module = line[7:].rstrip(';')
-                                    
-                                    imported_modules.append({
-                                        'name': module,
-                                        'source': file_path,
-                                        'type': 'import'
-                                    })
-                                except Exception:
-                                    pass
+        for file_path in source_files:
+            imports.add_all(self._cached('imports', file_path, self._scan_file_imports), file_path)
         
-        return imported_modules
+        return imports
     
-    def detect_conflicts(self, dependencies: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _scan_file_imports(file_path: str) -> List[str]:
         """
-        Detect potential dependency conflicts.
+        Extract the imported packages of a single Java source file.
+        
+        Imports can only appear between the package statement and the first
+        type declaration, so reading stops at the first statement that is
+        neither (a class, interface, enum, record, @interface, annotation or
+        modifier). Comments are skipped, and static imports are reported as
+        the class whose member they import.
         """
-        conflicts = []
-        dependency_map = {}
+        modules = []
+        statement = ''
+        in_comment = False
         
-        for dep in dependencies:
-            name = dep['name']
-            
-            if name in dependency_map:
-                existing_dep = dependency_map[name]
+        # utf-8-sig drops a leading byte order mark
+        with open(file_path, 'r', encoding='utf-8-sig', errors='replace') as f:
+            for line in f:
+                # Drop block and line comments
+                code = ''
+                while line:
+                    if in_comment:
+                        end = line.find('*/')
+                        if end == -1:
+                            line = ''
+                        else:
+                            line = line[end + 2:]
+                            in_comment = False
+                        continue
+                    
+                    start = line.find('/*')
+                    line_comment = line.find('//')
+                    if line_comment != -1 and (start == -1 or line_comment < start):
+                        code += line[:line_comment]
+                        break
+                    if start == -1:
+                        code += line
+                        break
+                    code += line[:start] + ' '
+                    line = line[start + 2:]
+                    in_comment = True
+                
+                if not code.strip():
+                    continue
+                
+                *complete, statement_tail = code.split(';')
+                for part in complete:
+                    words = (statement + ' ' + part).split()
+                    statement = ''
+                    if not words or words[0] == 'package':
+                        continue
+                    if words[0] != 'import':
+                        return modules
+                    
+                    if len(words) > 1 and words[1] == 'static':
+                        # 'import static a.b.C.member' depends on class a.b.C
+                        modules.append(''.join(words[2:]).rsplit('.', 1)[0])
+                    else:
+                        modules.append(''.join(words[1:]))
                 
-                # Check for version conflicts
-                if dep.get('version') and existing_dep.get('version'):
-                    if dep['version'] != existing_dep['version']:
-                        conflicts.append({
-                            'name': name,
-                            'existing_version': existing_dep['version'],
-                            'conflicting_version': dep['version'],
-                            'existing_source': existing_dep['source'],
-                            'conflicting_source': dep['source']
-                        })
-            else:
-                dependency_map[name] = dep
+                statement += ' ' + statement_tail
+                words = statement.split(None, 1)
+                if words and words[0] not in ('package', 'import'):
+                    # First type declaration (or its annotations/modifiers)
+                    break
         
-        return conflicts
\ No newline at end of file
+        return modules
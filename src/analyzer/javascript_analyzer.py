@@ -1,22 +1,75 @@
 import os
 import json
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional
 
 from base_analyzer import BaseAnalyzer
+from dependency_records import ImportTable
+from project_walker import FileIndex
+
+# Single pass over a source file. Comments and plain string/template
+# literals are consumed whole so imports inside them are ignored; every
+# import form captures its module specifier in the 'spec' group:
+#   import x from 'm' / import {a, b} from 'm' / import * as ns from 'm'
+#   import type {T} from 'm' / export {a} from 'm' / export * from 'm'
+#   import 'm' / import('m') / require('m')
+_IMPORT_SCAN_RE = re.compile(r'''
+      //[^\n]*
+    | /\*[\s\S]*?\*/
+    | (?<![\w$.])(?:import|export)(?:\s+type)?[\s\w$*{},]*?\bfrom\s*(?P<q1>['"])(?P<spec1>[^'"\n]+)(?P=q1)
+    | (?<![\w$.])import\s*(?P<q2>['"])(?P<spec2>[^'"\n]+)(?P=q2)
+    | (?<![\w$.])(?:import|require)\s*\(\s*(?P<q3>['"])(?P<spec3>[^'"\n]+)(?P=q3)\s*\)
+    | '[^'\\\n]*(?:\\.[^'\\\n]*)*'
+    | "[^"\\\n]*(?:\\.[^"\\\n]*)*"
+    | `[^`\\]*(?:\\[\s\S][^`\\]*)*`
+''', re.VERBOSE)
+
+def _package_name(specifier: str) -> Optional[str]:
+    """
+    Normalize a module specifier to the package providing it.
+
+    Args:
+        specifier (str): Specifier as written (e.g. 'lodash/fp', '@scope/pkg/sub')
+
+    Returns:
+        Optional[str]: Package name, or None for relative, absolute and URL imports
+    """
+    if specifier.startswith(('.', '/')) or '://' in specifier:
+        return None
+    if specifier.startswith('node:'):
+        specifier = specifier[5:]
+
+    parts = specifier.split('/')
+    if specifier.startswith('@') and len(parts) > 1:
+        return '/'.join(parts[:2])
+    return parts[0]
 
 class JavaScriptDependencyAnalyzer(BaseAnalyzer):
-    def analyze_dependencies(self, project_path: str) -> Dict[str, Any]:
+    source_extensions = ('.js', '.jsx', '.ts', '.tsx')
+    manifest_names = ('package.json',)
+    
+    # Version 2: imports are normalized to package names and counted
+    cache_version = 2
+    
+    version_scheme = 'npm'
+    
+    def analyze_dependencies(
+        self, 
+        project_path: str, 
+        file_index: Optional[FileIndex] = None
+    ) -> Dict[str, Any]:
         """
         Analyze JavaScript project dependencies.
         
         Args:
             project_path (str): Path to the JavaScript project
+            file_index (Optional[FileIndex]): Index from a shared project walk
         
         Returns:
             Dict[str, Any]: Comprehensive dependency analysis
         """
-        dependencies = self._find_dependencies(project_path)
+        file_index = self._get_file_index(project_path, file_index)
+        dependencies = self._find_dependencies(project_path, file_index)
         conflicts = self.detect_conflicts(dependencies)
         
         return {
@@ -24,111 +77,95 @@ class JavaScriptDependencyAnalyzer(BaseAnalyzer):
             'conflicts': conflicts
         }
     
-    def _find_dependencies(self, project_path: str) -> List[Dict[str, Any]]:
+    def _find_dependencies(self, project_path: str, file_index: FileIndex) -> List[Dict[str, Any]]:
         """
         Find dependencies by scanning package.json and import statements.
         """
-        dependencies = []
-        
-        # Check package.json
-        package_json_path = os.path.join(project_path, 'package.json')
-        if os.path.exists(package_json_path):
-            with open(package_json_path, 'r') as f:
-                try:
-                    package_data = json.load(f)
-                    
-                    # Collect dependencies from different sections
-                    dependency_types = [
-                        'dependencies', 
-                        'devDependencies', 
-                        'peerDependencies', 
-                        'optionalDependencies'
-                    ]
-                    
-                    for dep_type in dependency_types:
-                        if dep_type in package_data:
-                            for name, version in package_data[dep_type].items():
-                                dependencies.append({
-                                    'name': name,
-                                    'version': version,
-                                    'type': dep_type,
-                                    'source': package_json_path
-                                })
-                except json.JSONDecodeError:
-                    pass
+        dependencies = list(self._iter_declared_dependencies(project_path, file_index))
         
         # Scan source files for imports
-        imported_modules = self._scan_imports(project_path)
-        dependencies.extend(imported_modules)
+        imported_modules = self._scan_imports(file_index.files_with_extensions(self.source_extensions))
+        dependencies.extend(imported_modules.to_dicts())
         
         return dependencies
     
-    def _scan_imports(self, project_path: str) -> List[Dict[str, Any]]:
+    def _iter_declared_dependencies(
+        self, 
+        project_path: str, 
+        file_index: FileIndex
+    ) -> Iterator[Dict[str, Any]]:
         """
-        Scan JavaScript source files for imported modules.
+        Yield dependencies declared in the project's package.json.
         """
-        imported_modules = []
-        
-        # Extensions to scan
-        extensions = ['.js', '.jsx', '.ts', '.tsx']
+        package_json_path = os.path.join(project_path, 'package.json')
+        if os.path.exists(package_json_path):
+            yield from self._cached('package_json', package_json_path, self._parse_package_json)
+    
+    @staticmethod
+    def _parse_package_json(package_json_path: str) -> List[Dict[str, Any]]:
+        """
+        Parse declared dependencies from a package.json file.
+        """
+        dependencies = []
         
-        for root, _, files in os.walk(project_path):
-            for file in files:
-                if any(file.endswith(ext) for ext in extensions):
-                    file_path = os.path.join(root, file)
-                    
-                    with open(file_path, 'r') as f:
-                        content = f.read()
-                        
-                        # Regex for different import styles
-                        import_patterns = [
-                            r'import\s+(?:[\w\*]+\s+from\s+)?[\'"]([^\'"\n]+)[\'"]',
-                            r'require\([\'"]([^\'"\n]+)[\'"]\)'
-                        ]
-                        
-                        for pattern in import_patterns:
-                            matches = re.findall(pattern, content)
-                            for module in matches:
-                                # Ignore relative imports
-                                if not module.startswith('.'):
-                                    imported_modules.append({
-                                        'name': module,
-                                        'source': file_path,
-                                        'type': 'import'
-                                    })
+        with open(package_json_path, 'r') as f:
+            try:
+                package_data = json.load(f)
+                
+                # Collect dependencies from different sections
+                dependency_types = [
+                    'dependencies', 
+                    'devDependencies', 
+                    'peerDependencies', 
+                    'optionalDependencies'
+                ]
+                
+                for dep_type in dependency_types:
+                    if dep_type in package_data:
+                        for name, version in package_data[dep_type].items():
+                            dependencies.append({
+                                'name': name,
+                                'version': version,
+                                'type': dep_type,
+                                'source': package_json_path
+                            })
+            except json.JSONDecodeError:
+                pass
         
-        return imported_modules
+        return dependencies
     
-    def detect_conflicts(self, dependencies: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def _scan_imports(self, source_files: List[str]) -> ImportTable:
         """
-        Detect potential dependency conflicts.
+        Scan JavaScript source files for imported packages.
         
-        Args:
-            dependencies (List[Dict[str, Any]]): List of dependencies to check
+        Returns the occurrences aggregated per package, with the number of
+        imports and the files importing it.
+        """
+        imports = ImportTable()
         
-        Returns:
-            List[Dict[str, Any]]: List of detected dependency conflicts
+        for file_path in source_files:
+            for name, count in self._cached('imports', file_path, self._scan_file_imports).items():
+                imports.add(name, file_path, count)
+        
+        return imports
+    
+    @staticmethod
+    def _scan_file_imports(file_path: str) -> Dict[str, int]:
         """
-        conflicts = []
-        dependency_map = {}
+        Count the packages imported by a single JavaScript/TypeScript file.
+        """
+        counts = {}
+        
+        with open(file_path, 'r') as f:
+            content = f.read()
         
-        for dep in dependencies:
-            name = dep['name']
+        for match in _IMPORT_SCAN_RE.finditer(content):
+            specifier = match.group('spec1') or match.group('spec2') or match.group('spec3')
+            if specifier is None:
+                continue
             
-            if name in dependency_map:
-                existing_dep = dependency_map[name]
-                
-                # Check for version conflicts
-                if 'version' in dep and 'version' in existing_dep:
-                    if dep['version'] != existing_dep['version']:
-                        conflicts.append({
-                            'name': name,
-                            'existing_version': existing_dep['version'],
-                            'conflicting_version': dep['version'],
-                            'existing_source': existing_dep['source'],
-                            'conflicting_source': dep['source']
-                        })
-            else:
-                dependency_map[name] = dep
+            name = _package_name(specifier)
+            if name:
+                counts[name] = counts.get(name, 0) + 1
         
-        return conflicts
\ No newline at end of file
+        return counts
@@ -0,0 +1,225 @@
+"""
+Analyzer Registry
+
+Analyzers are described by lightweight specs declaring the manifest file
+names and source extensions they handle, so the project walk can route
+files and pick analyzers without importing any analyzer module. The
+analyzer class itself is imported only when an analyzer is instantiated.
+
+Third-party analyzers register through the ``polydepend.analyzers`` entry
+point group. The entry point name is the language and its object is an
+``AnalyzerSpec`` (or a dict with the same fields), best defined in a
+module that does not import the analyzer itself::
+
+    # setup.py of a plugin
+    entry_points={
+        'polydepend.analyzers': ['go = polydepend_go.spec:SPEC']
+    }
+
+    # polydepend_go/spec.py
+    SPEC = {
+        'target': 'polydepend_go.analyzer:GoDependencyAnalyzer',
+        'manifest_names': ['go.mod'],
+        'source_extensions': ['.go']
+    }
+
+An entry point may also reference a ``BaseAnalyzer`` subclass directly; it
+is then imported while the registry loads.
+"""
+
+import importlib
+import inspect
+import warnings
+from typing import Any, Dict, Iterable, Optional
+
+ENTRY_POINT_GROUP = 'polydepend.analyzers'
+
+
+class AnalyzerSpec:
+    """
+    How to find and load one analyzer.
+    """
+
+    __slots__ = ('name', 'target', 'manifest_names', 'source_extensions', '_analyzer_class')
+
+    def __init__(
+        self,
+        name: str,
+        target: str,
+        manifest_names: Iterable[str] = (),
+        source_extensions: Iterable[str] = ()
+    ):
+        """
+        Args:
+            name (str): Language key used on the command line
+            target (str): Analyzer class as 'module:ClassName'
+            manifest_names (Iterable[str]): Manifest file names the analyzer reads
+            source_extensions (Iterable[str]): Source extensions the analyzer scans
+        """
+        if ':' not in target:
+            raise ValueError(f"Analyzer target must be 'module:ClassName', got {target!r}")
+        self.name = name
+        self.target = target
+        self.manifest_names = tuple(manifest_names)
+        self.source_extensions = tuple(source_extensions)
+        self._analyzer_class = None
+
+    @classmethod
+    def from_class(cls, name: str, analyzer_class: type) -> 'AnalyzerSpec':
+        """
+        Build a spec from an already imported analyzer class.
+        """
+        spec = cls(
+            name,
+            f"{analyzer_class.__module__}:{analyzer_class.__qualname__}",
+            analyzer_class.manifest_names,
+            analyzer_class.source_extensions
+        )
+        spec._analyzer_class = analyzer_class
+        return spec
+
+    def load(self) -> type:
+        """
+        Import the analyzer class.
+
+        Returns:
+            type: The analyzer class
+        """
+        if self._analyzer_class is None:
+            module_name, _, class_name = self.target.partition(':')
+            value = importlib.import_module(module_name)
+            for attribute in class_name.split('.'):
+                value = getattr(value, attribute)
+            self._analyzer_class = value
+        return self._analyzer_class
+
+    def __repr__(self) -> str:
+        return f"AnalyzerSpec({self.name!r}, {self.target!r})"
+
+
+BUILTIN_SPECS = (
+    AnalyzerSpec(
+        'python',
+        'analyzer.python_analyzer:PythonDependencyAnalyzer',
+        ('requirements.txt', 'requirements-dev.txt', 'setup.py', 'pyproject.toml'),
+        ('.py',)
+    ),
+    AnalyzerSpec(
+        'javascript',
+        'analyzer.javascript_analyzer:JavaScriptDependencyAnalyzer',
+        ('package.json',),
+        ('.js', '.jsx', '.ts', '.tsx')
+    ),
+    AnalyzerSpec(
+        'java',
+        'analyzer.java_analyzer:JavaDependencyAnalyzer',
+        ('pom.xml', 'build.gradle'),
+        ('.java',)
+    ),
+    AnalyzerSpec(
+        'rust',
+        'analyzer.rust_analyzer:RustDependencyAnalyzer',
+        ('Cargo.toml',),
+        ('.rs',)
+    ),
+)
+
+
+def _coerce_spec(name: str, value: Any) -> AnalyzerSpec:
+    """
+    Turn the object behind an entry point into a spec.
+    """
+    if isinstance(value, AnalyzerSpec):
+        if value.name != name:
+            value = AnalyzerSpec(name, value.target, value.manifest_names, value.source_extensions)
+        return value
+    if isinstance(value, dict):
+        return AnalyzerSpec(
+            name,
+            value['target'],
+            value.get('manifest_names', ()),
+            value.get('source_extensions', ())
+        )
+    if isinstance(value, type):
+        return AnalyzerSpec.from_class(name, value)
+    raise ValueError(f"Entry point {name!r} is not an analyzer spec or class")
+
+
+def _iter_entry_points(group: str):
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:
+        # Python 3.7 needs the backport
+        try:
+            from importlib_metadata import entry_points
+        except ImportError:
+            return []
+
+    try:
+        return entry_points(group=group)
+    except TypeError:
+        # Python < 3.10 returns a dict of groups
+        return entry_points().get(group, [])
+
+
+def load_analyzer_specs(include_plugins: bool = True) -> Dict[str, AnalyzerSpec]:
+    """
+    Collect the built-in analyzers and those registered by plugins.
+
+    Plugins are ordered by name after the built-ins; a plugin registered
+    under a built-in's name replaces it. Plugins that fail to load are
+    skipped with a warning.
+
+    Args:
+        include_plugins (bool): Also read the ``polydepend.analyzers`` entry points
+
+    Returns:
+        Dict[str, AnalyzerSpec]: Specs by language
+    """
+    specs = {spec.name: spec for spec in BUILTIN_SPECS}
+    if not include_plugins:
+        return specs
+
+    for entry_point in sorted(_iter_entry_points(ENTRY_POINT_GROUP), key=lambda ep: ep.name):
+        try:
+            specs[entry_point.name] = _coerce_spec(entry_point.name, entry_point.load())
+        except Exception as e:
+            warnings.warn(f"Skipping analyzer plugin {entry_point.name!r}: {e}")
+    return specs
+
+
+def _accepts_keyword(function: Any, name: str) -> bool:
+    """Whether a callable takes a keyword argument, by name or through **kwargs."""
+    try:
+        parameters = inspect.signature(function).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    return any(
+        parameter.kind == parameter.VAR_KEYWORD
+        or (parameter.name == name and parameter.kind != parameter.POSITIONAL_ONLY)
+        for parameter in parameters
+    )
+
+
+def create_analyzer(spec: AnalyzerSpec, cache: Optional[Any] = None, workers: Optional[int] = 1):
+    """
+    Instantiate the analyzer described by a spec.
+
+    Args:
+        spec (AnalyzerSpec): Analyzer to create
+        cache (AnalysisCache, optional): Persistent cache of per-file results
+        workers (Optional[int]): Parse workers, for analyzers that parse in parallel
+
+    Returns:
+        BaseAnalyzer: The analyzer
+    """
+    analyzer_class = spec.load()
+    if _accepts_keyword(analyzer_class, 'cache'):
+        analyzer = analyzer_class(cache=cache)
+    else:
+        # Plugins may define a plain __init__(self)
+        analyzer = analyzer_class()
+        analyzer.cache = cache
+    if hasattr(analyzer, 'workers'):
+        analyzer.workers = workers
+    return analyzer
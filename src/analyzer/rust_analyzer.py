@@ -1,22 +1,32 @@
-import os
-import toml
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional
 
 from base_analyzer import BaseAnalyzer
+from dependency_records import ImportTable
+from project_walker import FileIndex
 
 class RustDependencyAnalyzer(BaseAnalyzer):
-    def analyze_dependencies(self, project_path: str) -> Dict[str, Any]:
+    source_extensions = ('.rs',)
+    manifest_names = ('Cargo.toml',)
+    version_scheme = 'cargo'
+    
+    def analyze_dependencies(
+        self, 
+        project_path: str, 
+        file_index: Optional[FileIndex] = None
+    ) -> Dict[str, Any]:
         """
         Analyze Rust project dependencies.
         
         Args:
             project_path (str): Path to the Rust project
+            file_index (Optional[FileIndex]): Index from a shared project walk
         
         Returns:
             Dict[str, Any]: Comprehensive dependency analysis
         """
-        dependencies = self._find_dependencies(project_path)
+        file_index = self._get_file_index(project_path, file_index)
+        dependencies = self._find_dependencies(file_index)
         conflicts = self.detect_conflicts(dependencies)
         
         return {
@@ -24,28 +34,35 @@ class RustDependencyAnalyzer(BaseAnalyzer):
             'conflicts': conflicts
         }
     
-    def _find_dependencies(self, project_path: str) -> List[Dict[str, Any]]:
+    def _find_dependencies(self, file_index: FileIndex) -> List[Dict[str, Any]]:
         """
         Find dependencies by scanning Cargo.toml files.
         """
-        dependencies = []
-        
-        # Find Cargo.toml files
-        for root, _, files in os.walk(project_path):
-            if 'Cargo.toml' in files:
-                cargo_path = os.path.join(root, 'Cargo.toml')
-                dependencies.extend(self._parse_cargo_dependencies(cargo_path))
+        dependencies = list(self._iter_declared_dependencies(file_index.root, file_index))
         
         # Scan source files for module imports
-        imported_modules = self._scan_imports(project_path)
-        dependencies.extend(imported_modules)
+        imported_modules = self._scan_imports(file_index.files_with_extensions(self.source_extensions))
+        dependencies.extend(imported_modules.to_dicts())
         
         return dependencies
     
+    def _iter_declared_dependencies(
+        self, 
+        project_path: str, 
+        file_index: FileIndex
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield dependencies declared in every Cargo.toml found by the project walk.
+        """
+        for cargo_path in file_index.files_named('Cargo.toml'):
+            yield from self._cached('cargo', cargo_path, self._parse_cargo_dependencies)
+    
     def _parse_cargo_dependencies(self, cargo_path: str) -> List[Dict[str, Any]]:
         """
         Parse dependencies from Cargo.toml file.
         """
+        import toml
+        
         dependencies = []
         try:
             with open(cargo_path, 'r') as f:
@@ -80,65 +97,47 @@ class RustDependencyAnalyzer(BaseAnalyzer):
         
         return dependencies
     
-    def _scan_imports(self, project_path: str) -> List[Dict[str, Any]]:
+    def _scan_imports(self, source_files: List[str]) -> ImportTable:
         """
         Scan Rust source files for module imports.
+        
+        Returns the occurrences aggregated per imported name.
         """
-        imported_modules = []
+        imports = ImportTable()
         
-        for root, _, files in os.walk(project_path):
-            for file in files:
-                if file.endswith('.rs'):
-                    file_path = os.path.join(root, file)
-                    
-                    with open(file_path, 'r') as f:
-                        content = f.read()
-                        
-                        # Patterns for different import styles
-                        import_patterns = [
-                            r'use\s+([^:;]+);',  # Simple import
-                            r'use\s+([^:;]+)::[^;]+;',  # Nested import
-                            r'extern\s+crate\s+([^;]+);'  # External crate
-                        ]
-                        
-                        for pattern in import_patterns:
-                            matches = re.findall(pattern, content)
-                            for module in matches:
-                                # Clean up module name
-                                module = module.strip()
-                                
-                                imported_modules.append({
-                                    'name': module,
-                                    'source': file_path,
-                                    'type': 'import'
-                                })
+        for file_path in source_files:
+            imports.add_all(self._cached('imports', file_path, self._scan_file_imports), file_path)
         
-        return imported_modules
+        return imports
     
-    def detect_conflicts(self, dependencies: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _scan_file_imports(file_path: str) -> List[str]:
         """
-        Detect potential dependency conflicts.
+        Extract the imported modules of a single Rust source file.
         """
-        conflicts = []
-        dependency_map = {}
+        modules = []
         
-        for dep in dependencies:
-            name = dep['name']
+        with open(file_path, 'r') as f:
+            content = f.read()
             
-            if name in dependency_map:
-                existing_dep = dependency_map[name]
-                
-                # Check for version conflicts
-                if dep.get('version') and existing_dep.get('version'):
-                    if dep['version'] != existing_dep['version']:
-                        conflicts.append({
-                            'name': name,
-                            'existing_version': existing_dep['version'],
-                            'conflicting_version': dep['version'],
-                            'existing_source': existing_dep['source'],
-                            'conflicting_source': dep['source']
-                        })
-            else:
-                dependency_map[name] = dep
+            # Patterns for different import styles
+            import_patterns = [
+                r'use\s+([^:;]+);',  # Simple import
+                r'use\s+([^:;]+)::[^;]+;',  # Nested import
+                r'extern\s+crate\s+([^;]+);'  # External crate
+            ]
+            
+            for pattern in import_patterns:
+                matches = re.findall(pattern, content)
+                for module in matches:
+                    # Clean up module name
+                    modules.append(module.strip())
         
-        return conflicts
\ No newline at end of file
+        return modules
+    
+    @staticmethod
+    def _normalize_name(name: str) -> str:
+        """
+        Normalize a crate name; crates.io treats '-' and '_' and case as equivalent.
+        """
+        return name.strip().replace('_', '-').lower()
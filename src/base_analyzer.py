@@ -5,7 +5,16 @@ Provides a common abstract base class for language-specific dependency analyzers
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from collections import Counter
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple
+
+from analysis_cache import AnalysisCache
+from project_walker import FileIndex, ProjectWalker
+from version_keys import compare_versions, is_semantic_version
+from version_ranges import ranges_overlap
+
+# Placeholder version of dependencies whose version could not be determined
+UNKNOWN_VERSION = 'Unknown'
 
 class BaseAnalyzer(ABC):
     """
@@ -15,31 +24,263 @@ class BaseAnalyzer(ABC):
     across different programming languages.
     """
     
+    # Files the analyzer needs from the shared project walk
+    source_extensions: Tuple[str, ...] = ()
+    manifest_names: Tuple[str, ...] = ()
+    
+    # Bump when parsing logic changes so cached per-file results are discarded
+    cache_version: int = 1
+    
+    # Requirement syntax of declared versions ('npm', 'cargo', 'maven' or
+    # 'pep440'); without one, any two different version strings conflict
+    version_scheme: Optional[str] = None
+    
+    def __init__(self, cache: Optional[AnalysisCache] = None):
+        """
+        Args:
+            cache (Optional[AnalysisCache]): Persistent cache for per-file results
+        """
+        self.cache = cache
+    
     @abstractmethod
-    def analyze_dependencies(self, project_path: str) -> Dict[str, Any]:
+    def analyze_dependencies(
+        self, 
+        project_path: str, 
+        file_index: Optional[FileIndex] = None
+    ) -> Dict[str, Any]:
         """
         Analyze dependencies for a given project.
         
         Args:
             project_path (str): Path to the project to be analyzed
+            file_index (Optional[FileIndex]): Pre-built index from a shared
+                project walk; the project is walked once if omitted
         
         Returns:
             Dict[str, Any]: Comprehensive dependency analysis results
         """
         pass
     
-    @abstractmethod
     def detect_conflicts(self, dependencies: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
-        Detect potential dependency conflicts.
+        Detect packages declared with incompatible versions.
+        
+        Dependencies are grouped by normalized name in a single pass, so the
+        cost is linear in the number of records. Records without a usable
+        version (imports, 'Unknown') are ignored. With a ``version_scheme``,
+        different requirements only conflict when no version satisfies all
+        of them; requirements that cannot be parsed still conflict whenever
+        they differ.
         
         Args:
             dependencies (List[Dict[str, Any]]): List of dependencies to check
         
         Returns:
-            List[Dict[str, Any]]: List of detected dependency conflicts
+            List[Dict[str, Any]]: One conflict per package, in order of first
+            appearance, with every distinct version and all of its sources
+            under 'versions'. 'existing_*' and 'conflicting_*' describe the
+            first two versions found.
         """
-        pass
+        # normalized name -> (name as first seen, version -> ordered sources)
+        groups: Dict[str, Tuple[str, Dict[str, Dict[Any, None]]]] = {}
+        
+        for dep in dependencies:
+            version = dep.get('version')
+            if not version or version == UNKNOWN_VERSION:
+                continue
+            
+            name = dep['name']
+            key = self._normalize_name(name)
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = (name, {})
+            group[1].setdefault(str(version).strip(), {})[dep.get('source')] = None
+        
+        conflicts = []
+        for name, versions in groups.values():
+            if len(versions) < 2 or self._versions_compatible(versions):
+                continue
+            
+            version_list = [
+                {'version': version, 'sources': list(sources)}
+                for version, sources in versions.items()
+            ]
+            existing, conflicting = version_list[0], version_list[1]
+            conflicts.append({
+                'name': name,
+                'existing_version': existing['version'],
+                'conflicting_version': conflicting['version'],
+                'existing_source': existing['sources'][0],
+                'conflicting_source': conflicting['sources'][0],
+                'versions': version_list
+            })
+        
+        return conflicts
+    
+    def _versions_compatible(self, versions: Iterable[str]) -> bool:
+        """
+        Check whether some version satisfies every requirement.
+        
+        Args:
+            versions (Iterable[str]): Distinct requirements of one package
+        
+        Returns:
+            bool: True if the requirements' ranges intersect
+        """
+        if self.version_scheme is None:
+            return False
+        try:
+            return ranges_overlap(self.version_scheme, versions)
+        except ValueError:
+            return False
+    
+    @staticmethod
+    def _normalize_name(name: str) -> str:
+        """
+        Key under which declarations of the same package are grouped.
+        
+        Args:
+            name (str): Package name as declared
+        
+        Returns:
+            str: Normalized name; ecosystems with looser naming rules override this
+        """
+        return name.strip()
+    
+    def iter_dependencies(
+        self, 
+        project_path: str, 
+        file_index: Optional[FileIndex] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield dependency records one at a time, as they are found.
+        
+        Declared dependencies come first, then one import record per package
+        and source file, so memory use is bounded by a single file rather
+        than the whole project.
+        
+        Args:
+            project_path (str): Path to the project to be analyzed
+            file_index (Optional[FileIndex]): Index from a shared project walk
+        
+        Yields:
+            Dict[str, Any]: Dependency or import record
+        """
+        file_index = self._get_file_index(project_path, file_index)
+        yield from self._iter_declared_dependencies(project_path, file_index)
+        
+        for file_path in file_index.files_with_extensions(self.source_extensions):
+            found = self._cached('imports', file_path, self._scan_file_imports)
+            counts = found if isinstance(found, dict) else Counter(found)
+            for name, count in counts.items():
+                yield {
+                    'name': name,
+                    'source': file_path,
+                    'type': 'import',
+                    'count': count
+                }
+    
+    def iter_analysis(
+        self, 
+        project_path: str, 
+        file_index: Optional[FileIndex] = None
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Stream a full analysis as (kind, record) pairs.
+        
+        Kinds are 'dependency' and 'import' while the project is scanned,
+        then 'conflict'. Only declared dependencies are held in memory, since
+        imports carry no version to conflict on.
+        
+        Args:
+            project_path (str): Path to the project to be analyzed
+            file_index (Optional[FileIndex]): Index from a shared project walk
+        
+        Yields:
+            Tuple[str, Dict[str, Any]]: Record kind and record
+        """
+        declared = []
+        for dependency in self.iter_dependencies(project_path, file_index):
+            if dependency.get('type') == 'import':
+                yield 'import', dependency
+            else:
+                declared.append(dependency)
+                yield 'dependency', dependency
+        
+        for conflict in self.detect_conflicts(declared):
+            yield 'conflict', conflict
+    
+    def _iter_declared_dependencies(
+        self, 
+        project_path: str, 
+        file_index: FileIndex
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the dependencies declared in the project's manifest files.
+        """
+        return iter(())
+    
+    @staticmethod
+    def _scan_file_imports(file_path: str) -> Any:
+        """
+        Extract the imports of a single source file, as a list of names
+        (one per occurrence) or a dict of name -> count.
+        """
+        return []
+    
+    def _get_file_index(
+        self, 
+        project_path: str, 
+        file_index: Optional[FileIndex] = None
+    ) -> FileIndex:
+        """
+        Get the file index for a project, walking it if none was provided.
+        
+        Args:
+            project_path (str): Path to the project
+            file_index (Optional[FileIndex]): Index from a shared walk
+        
+        Returns:
+            FileIndex: Index containing at least this analyzer's files
+        """
+        if file_index is None:
+            walker = ProjectWalker(self.source_extensions, self.manifest_names)
+            file_index = walker.walk(project_path)
+        return file_index
+    
+    def _cached(self, kind: str, path: str, parse: Callable[[str], Any]) -> Any:
+        """
+        Parse a file, reusing the cached result if the file is unchanged.
+        
+        Args:
+            kind (str): Kind of file (e.g. 'imports', 'pom'), used as namespace
+            path (str): Path of the file
+            parse (Callable[[str], Any]): Parser returning a JSON-serializable value
+        
+        Returns:
+            Any: Parse result
+        """
+        return self._cached_in(self.cache, kind, path, parse)
+    
+    @classmethod
+    def _cached_in(
+        cls, 
+        cache: Optional[AnalysisCache], 
+        kind: str, 
+        path: str, 
+        parse: Callable[[str], Any]
+    ) -> Any:
+        """
+        Same as ``_cached`` for an explicit cache, usable from class methods.
+        """
+        if cache is None:
+            return parse(path)
+        return cache.get_or_compute(cls._cache_namespace(kind), cls.cache_version, path, parse)
+    
+    @classmethod
+    def _cache_namespace(cls, kind: str) -> str:
+        """Get the cache namespace for a kind of file parsed by this analyzer."""
+        return f"{cls.__name__}.{kind}"
     
     def _is_semantic_version(self, version_str: str) -> bool:
         """
@@ -51,11 +292,7 @@ class BaseAnalyzer(ABC):
         Returns:
             bool: True if version follows semantic versioning, False otherwise
         """
-        import re
-        
-        semver_pattern = r'^(0|[1-9]\d*)\.(0|[1-9]\d*)\.(0|[1-9]\d*)(?:-((?:0|[1-9]\d*|\d*[a-zA-Z-][0-9a-zA-Z-]*)(?:\.(?:0|[1-9]\d*|\d*[a-zA-Z-][0-9a-zA-Z-]*))*))?(?:\+([0-9a-zA-Z-]+(?:\.[0-9a-zA-Z-]+)*))?$'
-        
-        return re.match(semver_pattern, version_str) is not None
+        return is_semantic_version(version_str)
     
     def _compare_versions(self, version1: str, version2: str) -> int:
         """
@@ -66,23 +303,9 @@ class BaseAnalyzer(ABC):
             version2 (str): Second version string
         
         Returns:
-            int: -1 if version1 < version2, 0 if equal, 1 if version1 > version2
+            int: -1 if version1 < version2, 0 if equal, 1 if version1 > version2,
+            compared in this analyzer's version scheme when both are valid in it
+            and with the loose scheme otherwise
         """
-        from packaging import version
-        
-        try:
-            v1 = version.parse(version1)
-            v2 = version.parse(version2)
-            
-            if v1 < v2:
-                return -1
-            elif v1 > v2:
-                return 1
-            return 0
-        except Exception:
-            # Fallback to string comparison if parsing fails
-            if version1 < version2:
-                return -1
-            elif version1 > version2:
-                return 1
-            return 0
\ No newline at end of file
+        # Keys are memoized, so sorting and repeated comparisons stay cheap
+        return compare_versions(version1, version2, self.version_scheme or 'pep440')
\ No newline at end of file
@@ -1,23 +1,77 @@
 import argparse
+import contextlib
+import copy
 import os
+import sys
 import json
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, TextIO
 
-from analyzer import (
-    PythonDependencyAnalyzer,
-    JavaScriptDependencyAnalyzer,
-    JavaDependencyAnalyzer,
-    RustDependencyAnalyzer
-)
+from analyzer.registry import create_analyzer, load_analyzer_specs
+from analysis_cache import AnalysisCache, default_cache_dir
+from project_walker import DEFAULT_PRUNE_DIRS, FileIndex, ProjectWalker
+
+def _run_analyzer(analyzer, project_path: str, file_index: FileIndex) -> Dict[str, Any]:
+    """
+    Process-pool task: run one analyzer on an already walked project.
+    """
+    try:
+        return analyzer.analyze_dependencies(project_path, file_index)
+    finally:
+        # The worker's copy of the cache holds its own pending writes
+        if analyzer.cache is not None:
+            analyzer.cache.close()
 
 class PolyDependCLI:
-    def __init__(self):
-        self.analyzers = {
-            'python': PythonDependencyAnalyzer(),
-            'javascript': JavaScriptDependencyAnalyzer(),
-            'java': JavaDependencyAnalyzer(),
-            'rust': RustDependencyAnalyzer()
-        }
+    def __init__(
+        self, 
+        ignore_patterns: List[str] = None, 
+        default_ignores: bool = True, 
+        ignore_files: bool = True, 
+        jobs: int = 1, 
+        cache: AnalysisCache = None, 
+        detect: bool = True
+    ):
+        """
+        Args:
+            ignore_patterns (List[str], optional): Extra paths to skip, in .gitignore syntax
+            default_ignores (bool): Skip vendored/build directories such as node_modules
+            ignore_files (bool): Honor .gitignore and .polydependignore files
+            jobs (int): Total worker processes (0 = one per CPU); above 1,
+                analyzers run concurrently and share the budget
+            cache (AnalysisCache, optional): Persistent cache of per-file results
+            detect (bool): Without a language, run only the analyzers whose
+                manifests or sources are found in the project
+        """
+        self.jobs = jobs
+        self.cache = cache
+        self.detect = detect
+        # Ecosystems found by the last detecting analyze_project call
+        self.detected_ecosystems = None
+        self.ignore_patterns = ignore_patterns or []
+        self.default_ignores = default_ignores
+        self.ignore_files = ignore_files
+        
+        # Built-in and plugin analyzers, imported only once they are needed
+        self.specs = load_analyzer_specs()
+        self.analyzers = {}
+    
+    def get_analyzer(self, language: str):
+        """
+        Get the analyzer for a language, creating it on first use.
+        
+        Args:
+            language (str): Language key (e.g. 'python')
+        
+        Returns:
+            BaseAnalyzer: The analyzer
+        """
+        analyzer = self.analyzers.get(language)
+        if analyzer is None:
+            if language not in self.specs:
+                raise ValueError(f"Unsupported language: {language}")
+            analyzer = create_analyzer(self.specs[language], cache=self.cache, workers=self.jobs)
+            self.analyzers[language] = analyzer
+        return analyzer
     
     def analyze_project(self, project_path: str, language: str = None) -> Dict[str, Any]:
         """
@@ -28,70 +82,381 @@ class PolyDependCLI:
             language (str, optional): Specific language to analyze
         
         Returns:
-            Dict[str, Any]: Comprehensive dependency analysis
+            Dict[str, Any]: Comprehensive dependency analysis by language; with
+            detection, the detected ecosystems are kept in ``detected_ecosystems``
         """
         results = {}
+        self.detected_ecosystems = None
         
         # If language is specified, analyze only that language
         if language:
-            if language not in self.analyzers:
-                raise ValueError(f"Unsupported language: {language}")
-            
-            analyzer = self.analyzers[language]
-            results[language] = analyzer.analyze_dependencies(project_path)
+            analyzer = self.get_analyzer(language)
+            file_index = self._walk_project(project_path, [analyzer])
+            results[language] = analyzer.analyze_dependencies(project_path, file_index)
             return results
         
-        # Otherwise, try all supported analyzers
-        for lang, analyzer in self.analyzers.items():
+        # Otherwise, run the detected analyzers on a single shared walk
+        analyzers, file_index = self._select_analyzers(project_path)
+        if self._worker_budget() > 1 and len(analyzers) > 1:
+            results = self._analyze_concurrently(project_path, file_index, analyzers)
+        else:
+            for lang, analyzer in analyzers.items():
+                try:
+                    results[lang] = analyzer.analyze_dependencies(project_path, file_index)
+                except Exception as e:
+                    results[lang] = {
+                        'error': str(e)
+                    }
+        
+        if self.detect:
+            self.detected_ecosystems = list(analyzers)
+        return results
+    
+    def _select_analyzers(self, project_path: str):
+        """
+        Pick the analyzers relevant to a project and walk it for them.
+        
+        A bounded walk first looks for each registered analyzer's manifests
+        and source extensions. If it covers the whole tree, only the analyzers
+        with evidence are kept and the full walk indexes just their files. On
+        larger trees the full walk indexes every analyzer's files and the
+        analyzers with nothing in the index are dropped instead. Analyzer
+        modules are imported only for the analyzers kept.
+        
+        Args:
+            project_path (str): Path to the project
+        
+        Returns:
+            Tuple[Dict[str, BaseAnalyzer], FileIndex]: Analyzers to run, in
+            registration order, and the shared file index
+        """
+        specs = self.specs
+        if not self.detect:
+            file_index = self._walk_project(project_path, specs.values())
+            selected = list(specs)
+        else:
+            found, truncated = self._make_walker(specs.values()).detect(project_path)
+            if not truncated:
+                selected = [
+                    lang 
+                    for lang, spec in specs.items()
+                    if not (found.isdisjoint(spec.manifest_names) and found.isdisjoint(spec.source_extensions))
+                ]
+                file_index = self._walk_project(project_path, [specs[lang] for lang in selected])
+            else:
+                file_index = self._walk_project(project_path, specs.values())
+                selected = [
+                    lang 
+                    for lang, spec in specs.items()
+                    if file_index.has_any(spec.source_extensions, spec.manifest_names)
+                ]
+        
+        analyzers = {lang: self.get_analyzer(lang) for lang in selected}
+        return analyzers, file_index
+    
+    def _worker_budget(self) -> int:
+        """
+        Total number of processes the analysis may use.
+        """
+        return self.jobs or os.cpu_count() or 1
+    
+    def _analyze_concurrently(
+        self, 
+        project_path: str, 
+        file_index: FileIndex, 
+        analyzers: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Run analyzers in parallel processes, isolating failures per language.
+        
+        Analyzers that parse files in parallel themselves run in this
+        process, using the budget the pool leaves them, so no pool is ever
+        started inside a pool worker; every other analyzer gets a pool
+        process. Results keep the order of ``analyzers``.
+        
+        Args:
+            project_path (str): Path to the project
+            file_index (FileIndex): Shared file index
+            analyzers (Dict[str, BaseAnalyzer]): Analyzers by language
+        
+        Returns:
+            Dict[str, Any]: Analysis results by language
+        """
+        from concurrent.futures import ProcessPoolExecutor
+        
+        parallel = {lang: analyzer for lang, analyzer in analyzers.items() if hasattr(analyzer, 'workers')}
+        pooled = {lang: analyzer for lang, analyzer in analyzers.items() if lang not in parallel}
+        
+        budget = self._worker_budget()
+        # Keep one process for the parallel analyzers, which run here
+        pool_size = min(max(1, budget - (1 if parallel else 0)), len(pooled))
+        inner_workers = max(1, budget - pool_size)
+        
+        results = {}
+        executor = ProcessPoolExecutor(max_workers=pool_size) if pooled else None
+        try:
+            futures = {
+                lang: executor.submit(_run_analyzer, analyzer, project_path, file_index)
+                for lang, analyzer in pooled.items()
+            }
+            
+            for lang, analyzer in parallel.items():
+                analyzer = copy.copy(analyzer)
+                analyzer.workers = inner_workers
+                try:
+                    results[lang] = analyzer.analyze_dependencies(project_path, file_index)
+                except Exception as e:
+                    results[lang] = {
+                        'error': str(e)
+                    }
+            
+            for lang, future in futures.items():
+                try:
+                    results[lang] = future.result()
+                except Exception as e:
+                    results[lang] = {
+                        'error': str(e)
+                    }
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        
+        return {lang: results[lang] for lang in analyzers}
+    
+    def stream_results(self, project_path: str, language: str = None, stream: TextIO = None):
+        """
+        Analyze a project and write one JSON record per line as records are produced.
+        
+        Each line is an object with 'language' and 'kind' ('dependency',
+        'import', 'conflict', 'parse_error' or 'error') followed by the
+        record's own fields; with detection, a first 'detection' line
+        lists the ecosystems found. Nothing is accumulated beyond what conflict
+        detection needs, so memory stays bounded on large projects.
+        
+        Args:
+            project_path (str): Path to the project
+            language (str, optional): Specific language to analyze
+            stream (TextIO, optional): Destination, defaults to stdout
+        """
+        stream = stream or sys.stdout
+        
+        if language:
+            analyzers = {language: self.get_analyzer(language)}
+            file_index = self._walk_project(project_path, analyzers.values())
+        else:
+            analyzers, file_index = self._select_analyzers(project_path)
+            if self.detect:
+                stream.write(json.dumps({'language': None, 'kind': 'detection', 'ecosystems': list(analyzers)}) + '\n')
+        
+        for lang, analyzer in analyzers.items():
             try:
-                results[lang] = analyzer.analyze_dependencies(project_path)
+                for kind, record in analyzer.iter_analysis(project_path, file_index):
+                    stream.write(json.dumps({'language': lang, 'kind': kind, **record}) + '\n')
             except Exception as e:
-                results[lang] = {
-                    'error': str(e)
-                }
+                # Like analyze_project, a single requested language fails loudly
+                if language:
+                    raise
+                stream.write(json.dumps({'language': lang, 'kind': 'error', 'error': str(e)}) + '\n')
+    
+    def _walk_project(self, project_path: str, analyzers):
+        """
+        Walk the project once, indexing the files the given analyzers need.
         
-        return results
+        Args:
+            project_path (str): Path to the project
+            analyzers (Iterable): Analyzers or analyzer specs that will consume the index
+        
+        Returns:
+            FileIndex: Shared file index
+        """
+        return self._make_walker(analyzers).walk(project_path)
     
-    def output_results(self, results: Dict[str, Any], output_format: str = 'json'):
+    def _make_walker(self, analyzers) -> ProjectWalker:
+        """
+        Build a walker looking for the files the given analyzers need.
+        """
+        extensions = set()
+        names = set()
+        for analyzer in analyzers:
+            extensions.update(analyzer.source_extensions)
+            names.update(analyzer.manifest_names)
+        
+        return ProjectWalker(
+            extensions, 
+            names, 
+            prune_dirs=DEFAULT_PRUNE_DIRS if self.default_ignores else None, 
+            ignore_patterns=self.ignore_patterns, 
+            use_ignore_files=self.ignore_files
+        )
+    
+    def output_results(
+        self, 
+        results: Dict[str, Any], 
+        output_format: str = 'json', 
+        detected_ecosystems: Optional[List[str]] = None
+    ):
         """
         Output analysis results in specified format.
         
         Args:
-            results (Dict[str, Any]): Dependency analysis results
-            output_format (str, optional): Output format (json or text)
+            results (Dict[str, Any]): Dependency analysis results by language
+            output_format (str, optional): Output format (json or text); use
+                ``stream_results`` for ndjson
+            detected_ecosystems (Optional[List[str]]): Ecosystems found by
+                detection, to report as well; in JSON, results then move
+                under 'results' next to a 'detected_ecosystems' field
         """
         if output_format == 'json':
+            if detected_ecosystems is not None:
+                results = {'detected_ecosystems': detected_ecosystems, 'results': results}
             print(json.dumps(results, indent=2))
         else:
+            if detected_ecosystems is not None:
+                print(f"Detected ecosystems: {', '.join(detected_ecosystems) or 'none'}")
+                print()
             for lang, data in results.items():
                 print(f"--- {lang.upper()} Dependencies ---")
                 print(f"Dependencies: {len(data.get('dependencies', []))}")
                 print(f"Conflicts: {len(data.get('conflicts', []))}")
                 print()
 
+def cache_main(argv: List[str]):
+    """
+    Run a ``polydepend cache`` subcommand.
+    
+    Args:
+        argv (List[str]): Arguments after 'cache'
+    """
+    # Imported here so that analyzing a project doesn't load the fetcher
+    from fetcher.artifact_store import DEFAULT_MAX_SIZE, DEFAULT_STORE_DIR, ArtifactStore, parse_lock_file
+    
+    parser = argparse.ArgumentParser(prog='polydepend cache', 
+                                     description='Manage the local artifact store used for offline installs')
+    parser.add_argument('--store', 
+                        default=DEFAULT_STORE_DIR,
+                        help=f'Artifact store location (default: {DEFAULT_STORE_DIR})')
+    parser.add_argument('--max-size', 
+                        type=int, 
+                        default=DEFAULT_MAX_SIZE // (1024 * 1024),
+                        metavar='MB',
+                        help='Evict least recently used artifacts beyond this size')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    warm = subparsers.add_parser('warm', 
+                                 help='Copy the artifacts pinned by a lock file into the store')
+    warm.add_argument('lock_file', 
+                      help='requirements.txt with == pins, package-lock.json, Cargo.lock or JSON lock')
+    warm.add_argument('--source', 
+                      required=True,
+                      help='Directory searched for wheels, sdists, npm tarballs and crates')
+    subparsers.add_parser('info', help='Show the store size')
+    
+    args = parser.parse_args(argv)
+    
+    with contextlib.closing(ArtifactStore(args.store, max_size=args.max_size * 1024 * 1024)) as store:
+        try:
+            if args.command == 'warm':
+                outcome = store.warm(parse_lock_file(args.lock_file), args.source)
+                print(f"Added: {outcome['added']}, already cached: {outcome['cached']}")
+                for missing in outcome['missing']:
+                    print(f"Missing: {missing}")
+                if outcome['missing']:
+                    exit(1)
+            else:
+                print(f"Store: {store.root}")
+                print(f"Size: {store.size() / (1024 * 1024):.1f} MB of {args.max_size} MB")
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}")
+            exit(1)
+
 def main():
-    parser = argparse.ArgumentParser(description='PolyDepend: Multi-language Dependency Analyzer')
+    if sys.argv[1:2] == ['cache']:
+        cache_main(sys.argv[2:])
+        return
+    
+    parser = argparse.ArgumentParser(description='PolyDepend: Multi-language Dependency Analyzer',
+                                     epilog='Run "polydepend cache -h" to manage the offline artifact store.')
     parser.add_argument('project_path', help='Path to the project to analyze')
     parser.add_argument('-l', '--language', 
-                        help='Specific language to analyze (python, javascript, java, rust)')
+                        help='Specific language to analyze (python, javascript, java, rust, '
+                             'or one added by a plugin)')
     parser.add_argument('-o', '--output', 
-                        choices=['json', 'text'], 
+                        choices=['json', 'text', 'ndjson'], 
                         default='json',
-                        help='Output format')
+                        help='Output format (ndjson streams one record per line)')
+    parser.add_argument('--ignore', 
+                        action='append', 
+                        default=[], 
+                        metavar='PATTERN',
+                        help='Skip paths matching a .gitignore-style pattern (repeatable)')
+    parser.add_argument('--no-default-ignores', 
+                        action='store_true',
+                        help='Also scan node_modules, target, build, dist, .git, .venv, ...')
+    parser.add_argument('--no-ignore-files', 
+                        action='store_true',
+                        help='Do not read .gitignore and .polydependignore files')
+    parser.add_argument('-j', '--jobs', 
+                        type=int, 
+                        default=1,
+                        help='Worker processes shared by the analyzers and source parsing '
+                             '(0 = one per CPU)')
+    parser.add_argument('--no-detect', 
+                        action='store_true',
+                        help='Run every analyzer instead of only those whose files are found')
+    parser.add_argument('--show-detected', 
+                        action='store_true',
+                        help='Also report the detected ecosystems; JSON output then nests the '
+                             'per-language results under "results"')
+    parser.add_argument('--cache', 
+                        action='store_true',
+                        help='Reuse per-file results from previous runs for unchanged files')
+    parser.add_argument('--cache-dir', 
+                        help='Cache location (default: <project>/.polydepend/cache)')
+    parser.add_argument('--cache-max-size', 
+                        type=int, 
+                        default=256,
+                        metavar='MB',
+                        help='Evict least recently used entries beyond this size')
+    parser.add_argument('--cache-hash', 
+                        action='store_true',
+                        help='Also fingerprint files by content hash, not only mtime and size')
     
     args = parser.parse_args()
+    project_path = os.path.abspath(args.project_path)
+    
+    cache = None
+    if args.cache:
+        cache = AnalysisCache(
+            args.cache_dir or default_cache_dir(project_path),
+            max_size=args.cache_max_size * 1024 * 1024,
+            use_content_hash=args.cache_hash
+        )
     
-    cli = PolyDependCLI()
+    cli = PolyDependCLI(
+        ignore_patterns=args.ignore,
+        default_ignores=not args.no_default_ignores,
+        ignore_files=not args.no_ignore_files,
+        jobs=args.jobs,
+        cache=cache,
+        detect=not args.no_detect
+    )
     
     try:
-        results = cli.analyze_project(
-            os.path.abspath(args.project_path), 
-            args.language
-        )
-        cli.output_results(results, args.output)
+        if args.output == 'ndjson':
+            cli.stream_results(project_path, args.language)
+        else:
+            results = cli.analyze_project(
+                project_path, 
+                args.language
+            )
+            # JSON keeps its top-level {language: report} shape unless asked
+            show_detected = args.show_detected or args.output == 'text'
+            cli.output_results(results, args.output, cli.detected_ecosystems if show_detected else None)
     except Exception as e:
         print(f"Error: {e}")
         exit(1)
+    finally:
+        if cache is not None:
+            cache.close()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,158 @@
+"""
+Compact Dependency Records
+
+Import occurrences are aggregated per package instead of being stored as
+one dict per import statement. Source files are interned once in a path
+table and each package keeps the integer ids of the files importing it,
+so large monorepos do not produce millions of small dicts.
+"""
+
+import sys
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List
+
+
+class PathTable:
+    """
+    Interns file paths, mapping each distinct path to a small integer.
+    """
+
+    __slots__ = ('paths', '_ids')
+
+    def __init__(self):
+        self.paths: List[str] = []
+        self._ids: Dict[str, int] = {}
+
+    def intern(self, path: str) -> int:
+        """
+        Get the id of a path, adding it to the table if needed.
+
+        Args:
+            path (str): File path
+
+        Returns:
+            int: Index of the path in ``paths``
+        """
+        path_id = self._ids.get(path)
+        if path_id is None:
+            path_id = len(self.paths)
+            self.paths.append(path)
+            self._ids[path] = path_id
+        return path_id
+
+    def __getitem__(self, path_id: int) -> str:
+        return self.paths[path_id]
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+
+class ImportRecord:
+    """
+    All occurrences of one imported package.
+
+    ``path_ids`` holds one path id per occurrence, in the order found.
+    """
+
+    __slots__ = ('name', 'path_ids')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.path_ids = array('I')
+
+    @property
+    def count(self) -> int:
+        """Number of import occurrences."""
+        return len(self.path_ids)
+
+    def source_ids(self) -> List[int]:
+        """Ids of the distinct files importing the package, in order found."""
+        return list(dict.fromkeys(self.path_ids))
+
+
+class ImportTable:
+    """
+    Import occurrences aggregated per package.
+    """
+
+    def __init__(self, import_type: str = 'import'):
+        """
+        Args:
+            import_type (str): Value of the 'type' key in dict output
+        """
+        self.import_type = import_type
+        self.paths = PathTable()
+        self._records: Dict[str, ImportRecord] = {}
+
+    def add(self, name: str, path: str, count: int = 1):
+        """
+        Record ``count`` imports of a package by a file.
+
+        Args:
+            name (str): Package or module name
+            path (str): File containing the import
+            count (int): Number of occurrences in that file
+        """
+        record = self._records.get(name)
+        if record is None:
+            name = sys.intern(name)
+            record = self._records[name] = ImportRecord(name)
+        path_id = self.paths.intern(path)
+        if count == 1:
+            record.path_ids.append(path_id)
+        else:
+            record.path_ids.extend([path_id] * count)
+
+    def add_all(self, names: Iterable[str], path: str):
+        """Record one import of each name (repeats allowed) by a file."""
+        for name in names:
+            self.add(name, path)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[ImportRecord]:
+        return iter(self._records.values())
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._records
+
+    def __getitem__(self, name: str) -> ImportRecord:
+        return self._records[name]
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """
+        Convert to one dict per package.
+
+        Returns:
+            List[Dict[str, Any]]: Dicts with 'name', 'source' (first importing
+            file), 'type', 'count' and 'sources'
+        """
+        paths = self.paths.paths
+        dicts = []
+        for record in self._records.values():
+            sources = [paths[path_id] for path_id in record.source_ids()]
+            dicts.append({
+                'name': record.name,
+                'source': sources[0],
+                'type': self.import_type,
+                'count': record.count,
+                'sources': sources
+            })
+        return dicts
+
+    def iter_occurrence_dicts(self) -> Iterator[Dict[str, Any]]:
+        """
+        Adapter to the legacy format: one dict per import occurrence.
+
+        Yields:
+            Dict[str, Any]: Dicts with 'name', 'source' and 'type', grouped by package
+        """
+        paths = self.paths.paths
+        for record in self._records.values():
+            for path_id in record.path_ids:
+                yield {
+                    'name': record.name,
+                    'source': paths[path_id],
+                    'type': self.import_type
+                }
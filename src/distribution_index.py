@@ -0,0 +1,271 @@
+"""
+Installed Distribution Index
+
+Scans the distributions installed in a Python environment once, with
+``importlib.metadata``, and answers lookups by distribution name or import
+name from dicts. Indexes are cached per environment and rebuilt when the
+modification time of one of its site-packages directories changes, which
+happens whenever a distribution is installed or removed there.
+
+The running interpreter is indexed from ``sys.path``; any other virtual
+environment is indexed from its site-packages directories without running
+its interpreter.
+"""
+
+import glob
+import hashlib
+import os
+import re
+import sys
+import threading
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+_NAME_SEPARATOR_RE = re.compile(r'[-_.]+')
+
+# Entries of a RECORD file that are not importable top-level names
+_NON_IMPORTABLE_SUFFIXES = ('.dist-info', '.egg-info', '.data', '.pth')
+
+
+def normalize_distribution_name(name: str) -> str:
+    """Normalize a distribution name as in PEP 503 ('Foo_Bar' -> 'foo-bar')."""
+    return _NAME_SEPARATOR_RE.sub('-', name.strip()).lower()
+
+
+class InstalledDistribution:
+    """
+    Metadata of one installed distribution.
+    """
+
+    __slots__ = ('name', 'version', 'requires', 'location', 'import_names')
+
+    def __init__(
+        self,
+        name: str,
+        version: str,
+        requires: Sequence[str],
+        location: str,
+        import_names: Sequence[str]
+    ):
+        """
+        Args:
+            name (str): Distribution name as published (e.g. 'PyYAML')
+            version (str): Installed version
+            requires (Sequence[str]): PEP 508 requirements, including extras
+            location (str): Directory the distribution is installed into
+            import_names (Sequence[str]): Top-level modules it provides (e.g. 'yaml')
+        """
+        self.name = name
+        self.version = version
+        self.requires = tuple(requires)
+        self.location = location
+        self.import_names = tuple(import_names)
+
+    def __repr__(self) -> str:
+        return f"InstalledDistribution({self.name!r}, {self.version!r})"
+
+
+def _import_names(dist) -> List[str]:
+    """Top-level import names of a distribution, from top_level.txt or RECORD."""
+    top_level = dist.read_text('top_level.txt')
+    if top_level:
+        return sorted({line.strip().replace('/', '.') for line in top_level.splitlines() if line.strip()})
+
+    names = set()
+    for file in dist.files or ():
+        parts = file.parts
+        if not parts or parts[0] in ('..', '__pycache__') or parts[0].endswith(_NON_IMPORTABLE_SUFFIXES):
+            continue
+        if len(parts) > 1:
+            names.add(parts[0])
+        elif parts[0].endswith('.py'):
+            names.add(parts[0][:-3])
+        elif parts[0].endswith(('.so', '.pyd')):
+            # Extension modules: 'name.cpython-311-x86_64-linux-gnu.so'
+            names.add(parts[0].split('.', 1)[0])
+    return sorted(names)
+
+
+def site_packages_dirs(environment: str) -> List[str]:
+    """
+    Find the site-packages directories of a virtual environment.
+
+    Args:
+        environment (str): Root of the environment, or its Python executable
+
+    Returns:
+        List[str]: Existing site-packages directories, purelib first
+
+    Raises:
+        ValueError: If no site-packages directory is found
+    """
+    environment = os.path.abspath(environment)
+    if os.path.isfile(environment):
+        # <env>/bin/python or <env>\Scripts\python.exe
+        environment = os.path.dirname(os.path.dirname(environment))
+
+    patterns = [
+        os.path.join(environment, 'lib', 'python*', 'site-packages'),
+        os.path.join(environment, 'lib64', 'python*', 'site-packages'),
+        os.path.join(environment, 'Lib', 'site-packages'),
+    ]
+    directories = []
+    for pattern in patterns:
+        for directory in sorted(glob.glob(pattern)):
+            real = os.path.realpath(directory)
+            if os.path.isdir(real) and real not in directories:
+                directories.append(real)
+
+    if not directories:
+        raise ValueError(f"No site-packages directory found in {environment!r}")
+    return directories
+
+
+class DistributionIndex:
+    """
+    Name- and import-keyed index of the distributions in a set of paths.
+    """
+
+    def __init__(self, paths: Sequence[str]):
+        """
+        Build the index; prefer ``for_environment``, which caches it.
+
+        Args:
+            paths (Sequence[str]): Directories to scan, in import precedence order
+        """
+        from importlib import metadata
+
+        self.paths = tuple(paths)
+        # Taken before scanning, so a change made meanwhile triggers a rebuild
+        self.signature = self._signature(self.paths)
+        self._by_name: Dict[str, InstalledDistribution] = {}
+        self._by_import: Dict[str, List[str]] = {}
+
+        for dist in metadata.distributions(path=list(self.paths)):
+            name = dist.metadata['Name']
+            if not name:
+                continue
+            key = normalize_distribution_name(name)
+            # The first entry on the path wins, as for imports
+            if key in self._by_name:
+                continue
+
+            installed = InstalledDistribution(
+                name,
+                dist.version,
+                dist.requires or (),
+                str(dist.locate_file('')),
+                _import_names(dist)
+            )
+            self._by_name[key] = installed
+            for import_name in installed.import_names:
+                self._by_import.setdefault(import_name, []).append(key)
+
+    def get(self, name: str) -> Optional[InstalledDistribution]:
+        """
+        Look up a distribution by name.
+
+        Args:
+            name (str): Distribution name, in any normalization
+
+        Returns:
+            Optional[InstalledDistribution]: The distribution, or None if not installed
+        """
+        return self._by_name.get(normalize_distribution_name(name))
+
+    def distributions_for_import(self, import_name: str) -> List[InstalledDistribution]:
+        """
+        Find the distributions providing a top-level module.
+
+        Args:
+            import_name (str): Module name, e.g. 'yaml' or 'yaml.loader'
+
+        Returns:
+            List[InstalledDistribution]: Providers; namespace packages may have several
+        """
+        top_level = import_name.split('.', 1)[0]
+        return [self._by_name[key] for key in self._by_import.get(top_level, ())]
+
+    def find(self, name: str) -> Optional[InstalledDistribution]:
+        """
+        Look up a distribution by distribution name, falling back to import name.
+
+        Args:
+            name (str): Distribution name ('PyYAML') or import name ('yaml')
+
+        Returns:
+            Optional[InstalledDistribution]: The distribution, or None if not installed
+        """
+        dist = self.get(name)
+        if dist is None:
+            providers = self.distributions_for_import(name)
+            if providers:
+                dist = providers[0]
+        return dist
+
+    def snapshot_id(self) -> str:
+        """
+        Identify the state of the indexed directories.
+
+        Returns:
+            str: Hex digest that changes whenever a distribution is installed
+            or removed in one of the paths
+        """
+        return hashlib.sha256(repr(self.signature).encode('utf-8')).hexdigest()
+
+    def __contains__(self, name: str) -> bool:
+        return self.get(name) is not None
+
+    def __iter__(self) -> Iterator[InstalledDistribution]:
+        return iter(self._by_name.values())
+
+    def __len__(self) -> int:
+        return len(self._by_name)
+
+    @staticmethod
+    def _signature(paths: Sequence[str]) -> Tuple[Tuple[str, int], ...]:
+        signature = []
+        for path in paths:
+            try:
+                signature.append((path, os.stat(path).st_mtime_ns))
+            except OSError:
+                signature.append((path, -1))
+        return tuple(signature)
+
+    @classmethod
+    def for_environment(cls, environment: Optional[str] = None) -> 'DistributionIndex':
+        """
+        Get the index of an environment, building it on first use or after a change.
+
+        Args:
+            environment (Optional[str]): Virtual environment root or Python
+                executable; None indexes the running interpreter's sys.path
+
+        Returns:
+            DistributionIndex: Cached index of the environment
+        """
+        if environment is None:
+            paths = tuple(path for path in sys.path if path and os.path.isdir(path))
+        else:
+            paths = tuple(site_packages_dirs(environment))
+
+        signature = cls._signature(paths)
+        with _INDEX_LOCK:
+            cached = _INDEXES.get(paths)
+            if cached is not None and cached.signature == signature:
+                return cached
+
+        index = cls(paths)
+        with _INDEX_LOCK:
+            _INDEXES[paths] = index
+        return index
+
+
+# Indexes by scanned paths
+_INDEXES: Dict[Tuple[str, ...], DistributionIndex] = {}
+_INDEX_LOCK = threading.Lock()
+
+
+def clear_cache():
+    """Forget all cached indexes."""
+    with _INDEX_LOCK:
+        _INDEXES.clear()
@@ -0,0 +1,555 @@
+"""
+Content-Addressed Artifact Store
+
+Keeps downloaded wheels, sdists, npm tarballs and crates on disk under
+their sha256, indexed in SQLite by (ecosystem, name, version), so installs
+can run offline straight from the store:
+
+- pip: ``--no-index --find-links <store>/links/pypi``
+- npm: the tarball paths from ``find``
+- Cargo: ``crates_registry`` indexes the stored crates as a local registry
+  to replace crates.io with
+
+The store is filled with ``add`` or ``warm``, which copies every artifact
+pinned by a lock file from a local source directory (a mirror, a shared
+drive, another machine's cache). The least recently used artifacts are
+evicted once the store grows beyond ``max_size`` bytes.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import sqlite3
+import tarfile
+import time
+import uuid
+import zipfile
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from resolver.metadata_store import (
+    normalize_package_name, read_artifact, read_crate_manifest, split_python_filename
+)
+
+# Bump when the table layout or directory layout changes
+SCHEMA_VERSION = 1
+
+DEFAULT_STORE_DIR = os.path.join(os.path.expanduser('~'), '.polydepend', 'artifacts')
+DEFAULT_MAX_SIZE = 10 * 1024 * 1024 * 1024
+
+_NPM_FILENAME_RE = re.compile(r'^(?P<name>.+?)-(?P<version>\d+\.\d+\.\d+(?:[-+][0-9A-Za-z.+-]*)?)\.tgz$')
+_CRATE_FILENAME_RE = re.compile(r'^(?P<name>.+)-(?P<version>\d+\.\d+\.\d+(?:[-+][0-9A-Za-z.+-]*)?)\.crate$')
+_PINNED_REQUIREMENT_RE = re.compile(r'^\s*(?P<name>[A-Za-z0-9][A-Za-z0-9._-]*)(?:\[[^\]]*\])?\s*===?\s*(?P<version>[^\s;\\]+)')
+_HASH_OPTION_RE = re.compile(r'--hash[=\s]+sha256:(?P<digest>[0-9a-fA-F]{64})')
+
+_UNREADABLE_ARTIFACT = (OSError, ValueError, KeyError, TypeError, zipfile.BadZipFile, tarfile.TarError)
+
+
+class LockedArtifact(NamedTuple):
+    """
+    One package version pinned by a lock file.
+    """
+
+    ecosystem: str
+    name: str
+    version: str
+    # Acceptable sha256 digests; empty when the lock file has none
+    hashes: Tuple[str, ...]
+
+
+def split_artifact_filename(filename: str) -> Optional[Tuple[str, str, str]]:
+    """
+    Get the ecosystem, normalized name and version encoded in an artifact's filename.
+
+    Args:
+        filename (str): e.g. 'requests-2.31.0-py3-none-any.whl', 'lodash-4.17.21.tgz'
+
+    Returns:
+        Optional[Tuple[str, str, str]]: (ecosystem, name, version), or None
+    """
+    for pattern, ecosystem in ((_NPM_FILENAME_RE, 'npm'), (_CRATE_FILENAME_RE, 'crates')):
+        match = pattern.match(filename)
+        if match:
+            return ecosystem, normalize_package_name(ecosystem, match.group('name')), match.group('version')
+    parsed = split_python_filename(filename)
+    if parsed is not None:
+        return ('pypi',) + parsed
+    return None
+
+
+def _crate_index_path(name: str) -> str:
+    """Path of a crate's file in a crates.io-style index."""
+    name = name.lower()
+    if len(name) <= 2:
+        return os.path.join(str(len(name)), name)
+    if len(name) == 3:
+        return os.path.join('3', name[0], name)
+    return os.path.join(name[:2], name[2:4], name)
+
+
+def _crate_index_entry(manifest: Dict, sha256: str) -> Dict:
+    """Index line of a crate version, built from its (published) Cargo.toml."""
+    package = manifest['package']
+    deps = []
+    tables = [(None, manifest)] + sorted((manifest.get('target') or {}).items())
+    for target, table in tables:
+        for section, kind in (('dependencies', 'normal'), ('build-dependencies', 'build'), ('dev-dependencies', 'dev')):
+            for name, spec in sorted((table.get(section) or {}).items()):
+                if isinstance(spec, str):
+                    spec = {'version': spec}
+                dep = {
+                    'name': name,
+                    'req': spec.get('version', '*'),
+                    'features': spec.get('features', []),
+                    'optional': spec.get('optional', False),
+                    'default_features': spec.get('default-features', spec.get('default_features', True)),
+                    'target': target,
+                    'kind': kind
+                }
+                if 'package' in spec:
+                    # Renamed dependency: the index names the crate separately
+                    dep['package'] = spec['package']
+                deps.append(dep)
+
+    # Features using 'dep:' or 'name?/feature' syntax go in 'features2'
+    features = {}
+    features2 = {}
+    for feature, enables in (manifest.get('features') or {}).items():
+        new_syntax = any(value.startswith('dep:') or '?/' in value for value in enables)
+        (features2 if new_syntax else features)[feature] = enables
+
+    entry = {
+        'name': package['name'],
+        'vers': str(package['version']),
+        'deps': deps,
+        'cksum': sha256,
+        'features': features,
+        'yanked': False
+    }
+    if features2:
+        entry['features2'] = features2
+        entry['v'] = 2
+    if package.get('links'):
+        entry['links'] = package['links']
+    return entry
+
+
+def file_sha256(path: str) -> str:
+    """Compute the sha256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# --- Lock files ---
+
+def _parse_requirements_lock(text: str) -> Iterator[LockedArtifact]:
+    # Joins continuation lines so '--hash' options stay with their requirement
+    for line in text.replace('\\\n', ' ').splitlines():
+        match = _PINNED_REQUIREMENT_RE.match(line)
+        if match:
+            hashes = tuple(digest.lower() for digest in _HASH_OPTION_RE.findall(line))
+            yield LockedArtifact('pypi', normalize_package_name('pypi', match.group('name')), match.group('version'), hashes)
+
+
+def _parse_package_lock(text: str) -> Iterator[LockedArtifact]:
+    data = json.loads(text)
+    # Lockfile v2/v3 list installed paths; v1 nests 'dependencies'
+    for path, entry in (data.get('packages') or {}).items():
+        if path and 'version' in entry and not entry.get('link'):
+            name = entry.get('name') or path.rsplit('node_modules/', 1)[-1]
+            yield LockedArtifact('npm', name, entry['version'], ())
+    if 'packages' not in data:
+        pending = list((data.get('dependencies') or {}).items())
+        while pending:
+            name, entry = pending.pop()
+            if 'version' in entry:
+                yield LockedArtifact('npm', name, entry['version'], ())
+            pending.extend((entry.get('dependencies') or {}).items())
+
+
+def _parse_cargo_lock(text: str) -> Iterator[LockedArtifact]:
+    import toml
+
+    for package in toml.loads(text).get('package', []):
+        # Workspace members and path dependencies have no source
+        if str(package.get('source', '')).startswith('registry+'):
+            checksum = package.get('checksum')
+            yield LockedArtifact(
+                'crates',
+                normalize_package_name('crates', package['name']),
+                package['version'],
+                (checksum,) if checksum else ()
+            )
+
+
+def _parse_json_lock(text: str) -> Iterator[LockedArtifact]:
+    data = json.loads(text)
+    for entry in data.get('packages', []):
+        yield LockedArtifact(
+            entry.get('ecosystem', 'pypi'),
+            normalize_package_name(entry.get('ecosystem', 'pypi'), entry['name']),
+            entry['version'],
+            tuple(digest.split(':', 1)[-1] for digest in entry.get('hashes', ()))
+        )
+
+
+def parse_lock_file(path: str) -> List[LockedArtifact]:
+    """
+    Read the packages pinned by a lock file.
+
+    Supported: pip requirements files with '==' pins (and '--hash' options),
+    npm's package-lock.json, Cargo.lock, and JSON locks with a 'packages'
+    list of {'ecosystem', 'name', 'version', 'hashes'}.
+
+    Args:
+        path (str): Lock file
+
+    Returns:
+        List[LockedArtifact]: Pinned packages, without duplicates
+
+    Raises:
+        ValueError: If the file cannot be parsed
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+
+    filename = os.path.basename(path)
+    try:
+        if filename in ('package-lock.json', 'npm-shrinkwrap.json'):
+            locked = _parse_package_lock(text)
+        elif filename == 'Cargo.lock':
+            locked = _parse_cargo_lock(text)
+        elif filename.endswith('.json'):
+            locked = _parse_json_lock(text)
+        else:
+            locked = _parse_requirements_lock(text)
+        return list(dict.fromkeys(locked))
+    except (KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f"Invalid lock file {path!r}: {e}") from e
+
+
+def _package_of(path: str) -> Optional[Tuple[str, str, str]]:
+    """(ecosystem, name, version) read from inside an artifact, or None."""
+    try:
+        record = read_artifact(path)
+    except _UNREADABLE_ARTIFACT:
+        return None
+    return None if record is None else (record.ecosystem, record.name, record.version)
+
+
+class _SourceIndex:
+    """
+    Artifacts of a source directory by (ecosystem, name, version).
+
+    Filenames are tried first; archives whose filename does not say what
+    they contain are opened only on a miss. npm tarballs leave the scope out
+    of their filename, so those of scoped packages are opened to check it.
+    """
+
+    def __init__(self, directory: str):
+        self._by_key: Dict[Tuple[str, str, str], List[str]] = {}
+        self._unidentified: List[str] = []
+        for root, _, files in os.walk(directory):
+            for filename in sorted(files):
+                path = os.path.join(root, filename)
+                parsed = split_artifact_filename(filename)
+                if parsed is not None:
+                    self._by_key.setdefault(parsed, []).append(path)
+                elif filename.endswith(('.tgz', '.crate', '.whl', '.tar.gz', '.zip')):
+                    self._unidentified.append(path)
+
+    def _identify_remaining(self):
+        for path in self._unidentified:
+            package = _package_of(path)
+            if package is not None:
+                self._by_key.setdefault(package, []).append(path)
+        self._unidentified = []
+
+    def candidates(self, ecosystem: str, name: str, version: str) -> List[str]:
+        name = normalize_package_name(ecosystem, name)
+        if ecosystem == 'npm' and name.startswith('@'):
+            # 'util-2.0.0.tgz' or 'scope-util-2.0.0.tgz' for '@scope/util'
+            unscoped = self._by_key.get(('npm', name.split('/', 1)[1], version), [])
+            prefixed = self._by_key.get(('npm', name[1:].replace('/', '-'), version), [])
+            matches = [path for path in unscoped + prefixed if _package_of(path) == ('npm', name, version)]
+            if matches:
+                return matches
+        key = (ecosystem, name, version)
+        if key not in self._by_key and self._unidentified:
+            self._identify_remaining()
+        return self._by_key.get(key, [])
+
+
+class ArtifactStore:
+    """
+    On-disk store of package artifacts addressed by sha256.
+    """
+
+    def __init__(self, root: str = DEFAULT_STORE_DIR, max_size: int = DEFAULT_MAX_SIZE):
+        """
+        Args:
+            root (str): Directory holding the artifacts and their index
+            max_size (int): Maximum total size of stored artifacts, in bytes
+        """
+        self.root = root
+        self.max_size = max_size
+        self.db_path = os.path.join(root, 'artifacts.sqlite3')
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(self.root, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            if conn.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+                conn.execute('DROP TABLE IF EXISTS artifacts')
+                conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            conn.execute(
+                '''CREATE TABLE IF NOT EXISTS artifacts (
+                    sha256 TEXT PRIMARY KEY,
+                    ecosystem TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_used REAL NOT NULL
+                )'''
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS artifacts_package ON artifacts (ecosystem, name, version)')
+            conn.execute('CREATE INDEX IF NOT EXISTS artifacts_last_used ON artifacts (last_used)')
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        """Close the index database."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __getstate__(self):
+        # Connections cannot be shared across processes; reopen lazily
+        state = self.__dict__.copy()
+        state['_conn'] = None
+        return state
+
+    def object_path(self, sha256: str) -> str:
+        """Path of the stored content with a digest."""
+        return os.path.join(self.root, 'objects', sha256[:2], sha256)
+
+    def links_dir(self, ecosystem: str) -> str:
+        """
+        Directory of an ecosystem's artifacts under their original filenames.
+
+        For 'pypi' this is the directory to pass to pip's ``--find-links``.
+        """
+        return os.path.join(self.root, 'links', ecosystem)
+
+    def _link(self, sha256: str, ecosystem: str, filename: str):
+        directory = self.links_dir(ecosystem)
+        os.makedirs(directory, exist_ok=True)
+        link = os.path.join(directory, filename)
+        temporary = f'{link}.{uuid.uuid4().hex}.tmp'
+        try:
+            os.link(self.object_path(sha256), temporary)
+        except OSError:
+            # Other filesystem or no hardlink support
+            shutil.copyfile(self.object_path(sha256), temporary)
+        os.replace(temporary, link)
+
+    def add(self, path: str, ecosystem: Optional[str] = None) -> str:
+        """
+        Copy an artifact into the store and evict beyond the size limit.
+
+        Args:
+            path (str): Wheel, sdist, npm tarball or crate
+            ecosystem (Optional[str]): Ecosystem, if the filename doesn't tell
+
+        Returns:
+            str: sha256 of the artifact
+
+        Raises:
+            ValueError: If the package the artifact holds cannot be determined
+        """
+        filename = os.path.basename(path)
+        parsed = split_artifact_filename(filename)
+        # npm tarball names drop the package's scope
+        if parsed is None or parsed[0] == 'npm' or (ecosystem and parsed[0] != ecosystem):
+            try:
+                record = read_artifact(path)
+            except _UNREADABLE_ARTIFACT as e:
+                raise ValueError(f"Unreadable artifact {path!r}: {e}") from e
+            if record is None:
+                raise ValueError(f"Not a package artifact: {path!r}")
+            parsed = (record.ecosystem, record.name, record.version)
+        artifact_ecosystem, name, version = parsed
+        if artifact_ecosystem == 'npm':
+            # As named by 'npm pack', so scoped packages don't collide
+            filename = f"{name.lstrip('@').replace('/', '-')}-{version}.tgz"
+
+        sha256 = file_sha256(path)
+        target = self.object_path(sha256)
+        if not os.path.exists(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            temporary = f'{target}.{uuid.uuid4().hex}.tmp'
+            shutil.copyfile(path, temporary)
+            os.replace(temporary, target)
+        self._link(sha256, artifact_ecosystem, filename)
+
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO artifacts (sha256, ecosystem, name, version, filename, size, last_used) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (sha256, artifact_ecosystem, name, version, filename, os.path.getsize(target), time.time())
+            )
+        self.evict()
+        return sha256
+
+    def get(self, sha256: str) -> Optional[str]:
+        """
+        Get the path of stored content, marking it as recently used.
+
+        Args:
+            sha256 (str): Digest of the artifact
+
+        Returns:
+            Optional[str]: Path of the content, or None if not stored
+        """
+        conn = self._connect()
+        if conn.execute('SELECT 1 FROM artifacts WHERE sha256 = ?', (sha256,)).fetchone() is None:
+            return None
+        with conn:
+            conn.execute('UPDATE artifacts SET last_used = ? WHERE sha256 = ?', (time.time(), sha256))
+        return self.object_path(sha256)
+
+    def find(self, ecosystem: str, name: str, version: str) -> List[Tuple[str, str]]:
+        """
+        Find the stored artifacts of a package version.
+
+        Args:
+            ecosystem (str): 'pypi', 'npm' or 'crates'
+            name (str): Package name, in any normalization
+            version (str): Version
+
+        Returns:
+            List[Tuple[str, str]]: (sha256, path under the original filename)
+        """
+        rows = self._connect().execute(
+            'SELECT sha256, filename FROM artifacts WHERE ecosystem = ? AND name = ? AND version = ?',
+            (ecosystem, normalize_package_name(ecosystem, name), version)
+        ).fetchall()
+        return [(sha256, os.path.join(self.links_dir(ecosystem), filename)) for sha256, filename in rows]
+
+    def crates_registry(self) -> str:
+        """
+        Index the stored crates as a Cargo local registry.
+
+        A local registry is a directory of '<name>-<version>.crate' files
+        with an 'index' directory laid out like the crates.io index; both
+        are (re)written under ``links_dir('crates')``. Cargo uses it in place
+        of crates.io with ``--offline`` and the source replacement
+        ``source.crates-io.replace-with = '<name>'``,
+        ``source.<name>.local-registry = '<this directory>'``.
+
+        Returns:
+            str: Directory of the local registry
+        """
+        registry = self.links_dir('crates')
+        entries: Dict[str, List[Dict]] = {}
+        rows = self._connect().execute(
+            "SELECT sha256, filename FROM artifacts WHERE ecosystem = 'crates' ORDER BY name, version"
+        ).fetchall()
+        for sha256, filename in rows:
+            try:
+                manifest = read_crate_manifest(self.object_path(sha256))
+                name, version = manifest['package']['name'], str(manifest['package']['version'])
+            except _UNREADABLE_ARTIFACT:
+                continue
+            if filename != f'{name}-{version}.crate':
+                # Cargo finds crates by their exact name
+                self._link(sha256, 'crates', f'{name}-{version}.crate')
+            entries.setdefault(name.lower(), []).append(_crate_index_entry(manifest, sha256))
+
+        index = os.path.join(registry, 'index')
+        shutil.rmtree(index, ignore_errors=True)
+        os.makedirs(index)
+        for name, versions in entries.items():
+            path = os.path.join(index, _crate_index_path(name))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as f:
+                f.writelines(json.dumps(entry) + '\n' for entry in versions)
+        return registry
+
+    def size(self) -> int:
+        """Total bytes of stored artifacts."""
+        return self._connect().execute('SELECT COALESCE(SUM(size), 0) FROM artifacts').fetchone()[0]
+
+    def warm(self, locked: List[LockedArtifact], source: str) -> Dict[str, object]:
+        """
+        Copy every locked artifact that is not stored yet from a local source.
+
+        Args:
+            locked (List[LockedArtifact]): Packages to have available offline
+            source (str): Directory searched recursively for artifacts
+
+        Returns:
+            Dict[str, object]: Counts of 'added' and 'cached' packages, and
+            'missing' packages ('ecosystem:name==version') not found in the source
+        """
+        index = None
+        added = 0
+        cached = 0
+        missing = []
+
+        for artifact in locked:
+            stored = {sha256 for sha256, _ in self.find(artifact.ecosystem, artifact.name, artifact.version)}
+            if stored and (not artifact.hashes or stored.intersection(artifact.hashes)):
+                for sha256 in stored:
+                    self.get(sha256)
+                cached += 1
+                continue
+
+            if index is None:
+                index = _SourceIndex(source)
+            found = False
+            for path in index.candidates(artifact.ecosystem, artifact.name, artifact.version):
+                if artifact.hashes and file_sha256(path) not in artifact.hashes:
+                    continue
+                self.add(path, artifact.ecosystem)
+                found = True
+            if found:
+                added += 1
+            else:
+                missing.append(f'{artifact.ecosystem}:{artifact.name}=={artifact.version}')
+
+        return {'added': added, 'cached': cached, 'missing': missing}
+
+    def evict(self):
+        """Drop least recently used artifacts until the store fits ``max_size``."""
+        conn = self._connect()
+        excess = self.size() - self.max_size
+        if excess <= 0:
+            return
+
+        doomed = []
+        for sha256, ecosystem, filename, size in conn.execute(
+            'SELECT sha256, ecosystem, filename, size FROM artifacts ORDER BY last_used'
+        ):
+            doomed.append((sha256, ecosystem, filename))
+            excess -= size
+            if excess <= 0:
+                break
+
+        with conn:
+            conn.executemany('DELETE FROM artifacts WHERE sha256 = ?', [(sha256,) for sha256, _, _ in doomed])
+        for sha256, ecosystem, filename in doomed:
+            link = os.path.join(self.links_dir(ecosystem), filename)
+            # The link may have been replaced by another artifact of the same name
+            if os.path.exists(link) and file_sha256(link) == sha256:
+                os.remove(link)
+            if os.path.exists(self.object_path(sha256)):
+                os.remove(self.object_path(sha256))
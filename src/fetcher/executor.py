@@ -0,0 +1,214 @@
+"""
+Asynchronous Command Executor
+
+Runs package-manager commands (pip, npm, cargo, mvn) as asyncio
+subprocesses instead of blocking ``subprocess.run`` calls:
+
+- at most ``max_concurrency`` commands run at once per event loop
+- each command can have a timeout, after which it is killed
+- stdout and stderr are read as they are produced and passed line by line
+  to an optional callback, as well as collected for the result
+- commands sharing a lock key run one after the other; the key names what
+  the tool itself locks or cannot share (a venv, a node_modules directory,
+  Cargo's package cache, Maven's local repository), so that installs for
+  different ecosystems run concurrently without waiting on each other's
+  tool locks while holding a concurrency slot
+"""
+
+import asyncio
+import codecs
+import os
+import time
+import weakref
+from typing import Callable, Dict, Hashable, List, NamedTuple, Optional, Sequence
+
+# Receives ('stdout' or 'stderr', line without its newline)
+OutputCallback = Callable[[str, str], None]
+
+DEFAULT_MAX_CONCURRENCY = max(os.cpu_count() or 1, 4)
+
+# Return code of commands that could not be started
+NOT_FOUND_RETURNCODE = 127
+
+_READ_SIZE = 64 * 1024
+
+
+class CommandResult(NamedTuple):
+    """
+    Outcome of a command.
+    """
+
+    args: List[str]
+    returncode: int
+    stdout: str
+    stderr: str
+    timed_out: bool
+    duration: float
+
+    @property
+    def success(self) -> bool:
+        return self.returncode == 0 and not self.timed_out
+
+
+def tool_lock_key(tool: str, target: Optional[str] = None) -> Hashable:
+    """
+    Lock key for a package manager working on a target.
+
+    Args:
+        tool (str): 'pip', 'npm', 'cargo' or 'mvn'
+        target (Optional[str]): Venv or project directory the command changes
+
+    Returns:
+        Hashable: Key for ``AsyncExecutor.run``; equal keys never run concurrently
+    """
+    if tool == 'cargo':
+        # The package cache lock covers all of CARGO_HOME
+        return ('cargo', os.path.realpath(os.environ.get('CARGO_HOME', os.path.expanduser('~/.cargo'))))
+    if tool == 'mvn':
+        # The local repository is not safe for concurrent writers
+        return ('mvn', os.path.realpath(os.path.expanduser('~/.m2')))
+    return (tool, os.path.realpath(target or os.getcwd()))
+
+
+async def _pump(
+    stream: asyncio.StreamReader,
+    name: str,
+    chunks: List[str],
+    callback: Optional[OutputCallback]
+):
+    """Read a stream to its end, collecting its text and passing complete lines on."""
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    pending = ''
+    while True:
+        data = await stream.read(_READ_SIZE)
+        text = decoder.decode(data, final=not data)
+        chunks.append(text)
+        if callback is not None:
+            *lines, pending = (pending + text).split('\n')
+            for line in lines:
+                callback(name, line.rstrip('\r'))
+        if not data:
+            break
+    if callback is not None and pending:
+        callback(name, pending)
+
+
+class AsyncExecutor:
+    """
+    Runs commands as asyncio subprocesses with bounded concurrency.
+    """
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY, timeout: Optional[float] = None):
+        """
+        Args:
+            max_concurrency (int): Commands running at once, per event loop
+            timeout (Optional[float]): Default seconds before a command is killed
+
+        Raises:
+            ValueError: If max_concurrency is less than 1
+        """
+        if max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency}")
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        # asyncio primitives belong to one event loop
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._locks = weakref.WeakKeyDictionary()
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphores[loop]
+
+    def _lock(self, key: Hashable) -> asyncio.Lock:
+        locks: Dict[Hashable, asyncio.Lock] = self._locks.setdefault(asyncio.get_running_loop(), {})
+        if key not in locks:
+            locks[key] = asyncio.Lock()
+        return locks[key]
+
+    async def run(
+        self,
+        args: Sequence[str],
+        timeout: Optional[float] = None,
+        callback: Optional[OutputCallback] = None,
+        lock: Optional[Hashable] = None,
+        cwd: Optional[str] = None,
+        env: Optional[Dict[str, str]] = None
+    ) -> CommandResult:
+        """
+        Run a command.
+
+        Args:
+            args (Sequence[str]): Program and arguments
+            timeout (Optional[float]): Seconds before it is killed; defaults to the executor's
+            callback (Optional[OutputCallback]): Receives output lines as they arrive
+            lock (Optional[Hashable]): Key from ``tool_lock_key``; commands with
+                the same key run one at a time
+            cwd (Optional[str]): Working directory
+            env (Optional[Dict[str, str]]): Environment; defaults to the current one
+
+        Returns:
+            CommandResult: Outcome; a program that cannot be started gives
+            return code 127 with the error as stderr
+        """
+        if lock is None:
+            return await self._run(list(args), timeout, callback, cwd, env)
+        # Wait for the tool before taking a concurrency slot
+        async with self._lock(lock):
+            return await self._run(list(args), timeout, callback, cwd, env)
+
+    async def _run(
+        self,
+        args: List[str],
+        timeout: Optional[float],
+        callback: Optional[OutputCallback],
+        cwd: Optional[str],
+        env: Optional[Dict[str, str]]
+    ) -> CommandResult:
+        timeout = self.timeout if timeout is None else timeout
+        async with self._semaphore():
+            start = time.monotonic()
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *args,
+                    stdin=asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    cwd=cwd,
+                    env=env
+                )
+            except OSError as e:
+                return CommandResult(args, NOT_FOUND_RETURNCODE, '', str(e), False, time.monotonic() - start)
+
+            stdout: List[str] = []
+            stderr: List[str] = []
+            timed_out = False
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(
+                        _pump(process.stdout, 'stdout', stdout, callback),
+                        _pump(process.stderr, 'stderr', stderr, callback),
+                        process.wait()
+                    ),
+                    timeout
+                )
+            except asyncio.TimeoutError:
+                timed_out = True
+            finally:
+                # Timed out or cancelled: don't leave the process behind
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+
+            return CommandResult(
+                args, process.returncode, ''.join(stdout), ''.join(stderr), timed_out, time.monotonic() - start
+            )
+
+    def run_sync(self, args: Sequence[str], **kwargs) -> CommandResult:
+        """
+        Run a command from synchronous code; takes the arguments of ``run``.
+
+        Must not be called while an event loop is running in this thread.
+        """
+        return asyncio.run(self.run(args, **kwargs))
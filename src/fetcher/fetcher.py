@@ -1,132 +1,620 @@
-import subprocess
+import asyncio
+import re
 import sys
-import venv
 import os
 import json
+import tempfile
 from typing import List, Dict, Optional, Any  # Import Any here
 
+from distribution_index import normalize_distribution_name
+from fetcher.artifact_store import ArtifactStore
+from fetcher.executor import AsyncExecutor, CommandResult, OutputCallback, tool_lock_key
+from fetcher.exporter import format_requirements, scan_environment
+from fetcher.venv_pool import VenvPool
+from resolver.solver import normalize_requirement
+
+# Project name at the start of a requirement ('Requests[socks]>=2' -> 'Requests')
+_REQUIREMENT_NAME_RE = re.compile(r'\s*[A-Za-z0-9][A-Za-z0-9._-]*')
+
+# npm package spec naming a version ('@scope/util@2.0.0' -> '@scope/util', '2.0.0')
+_NPM_SPEC_RE = re.compile(r'^(?P<name>@?[^@\s]+)@(?P<version>[^@\s]+)$')
+
+# Source name Cargo knows an artifact store's local registry by
+_CARGO_STORE_SOURCE = 'polydepend-artifacts'
+
 class DependencyFetcher:
     """Advanced dependency installation and management."""
     
+    # Runs every pip/npm/cargo/mvn command; replace to change the
+    # concurrency limit or the default timeout
+    executor = AsyncExecutor()
+    
     @staticmethod
-    def create_virtual_environment(path: Optional[str] = None) -> str:
+    def default_venv_path() -> str:
+        """Virtual environment used when no path is given."""
+        return os.path.join(os.getcwd(), 'polydepend_venv')
+    
+    @classmethod
+    def create_virtual_environment(cls, path: Optional[str] = None, pool: Optional[VenvPool] = None) -> str:
         """
         Create a virtual environment.
         
+        A new venv is cloned from the pool's bare venv instead of being
+        created from scratch; the clone is private to the caller.
+        
         Args:
-            path (Optional[str]): Path to create virtual environment
+            path (Optional[str]): Path to create virtual environment;
+                defaults to ./polydepend_venv
+            pool (Optional[VenvPool]): Pool to clone the venv from
         
         Returns:
             Path to the virtual environment
+        
+        Raises:
+            RuntimeError: If the venv can't be created
         """
         if not path:
-            path = os.path.join(os.getcwd(), 'polydepend_venv')
+            path = cls.default_venv_path()
         
-        # Create virtual environment
-        venv.create(path, with_pip=True)
+        if not os.path.exists(path):
+            return (pool or VenvPool(executor=cls.executor)).clone(path)
+        
+        # Update the existing virtual environment in place
+        result = cls.executor.run_sync([sys.executable, '-m', 'venv', path], lock=tool_lock_key('pip', path))
+        if not result.success:
+            raise RuntimeError(f"Could not create a venv at {path}: {cls._error(result).strip()}")
         
         return path
     
+    @staticmethod
+    def _pip_executable(venv_path: str) -> str:
+        """Get the pip executable of a virtual environment."""
+        if sys.platform == 'win32':
+            return os.path.join(venv_path, 'Scripts', 'pip')
+        return os.path.join(venv_path, 'bin', 'pip')
+    
+    @staticmethod
+    def _source_options(artifact_store: Optional[ArtifactStore]) -> List[str]:
+        """pip options installing only from an artifact store, or none for the package index."""
+        if artifact_store is None:
+            return []
+        return ['--no-index', '--find-links', artifact_store.links_dir('pypi')]
+    
+    @staticmethod
+    def _npm_tarballs(dependencies: List[str], artifact_store: ArtifactStore) -> Dict[str, Optional[str]]:
+        """Stored tarball of each npm spec pinned to an exact version, None for the others."""
+        tarballs = {}
+        for dep in dependencies:
+            match = _NPM_SPEC_RE.match(dep.strip())
+            found = artifact_store.find('npm', match.group('name'), match.group('version')) if match else []
+            tarballs[dep] = found[0][1] if found else None
+        return tarballs
+    
+    @staticmethod
+    def _cargo_source_options(artifact_store: Optional[ArtifactStore]) -> List[str]:
+        """cargo options replacing crates.io with an artifact store's local registry, or none."""
+        if artifact_store is None:
+            return []
+        registry = artifact_store.crates_registry()
+        return [
+            '--offline', 
+            '--config', f'source.crates-io.replace-with = "{_CARGO_STORE_SOURCE}"', 
+            '--config', f'source.{_CARGO_STORE_SOURCE}.local-registry = {json.dumps(registry)}'
+        ]
+    
+    @staticmethod
+    def _constraint_options(workdir: str, constraints: Optional[Dict[str, str]]) -> List[str]:
+        """pip options holding packages to the given versions, with the constraints file in workdir."""
+        if not constraints:
+            return []
+        constraints_path = os.path.join(workdir, 'constraints.txt')
+        with open(constraints_path, 'w') as f:
+            f.writelines(f"{name}=={version}\n" for name, version in sorted(constraints.items()))
+        return ['--constraint', constraints_path]
+    
+    @staticmethod
+    def _error(result: CommandResult) -> str:
+        """Error output of a failed command, '' if it succeeded."""
+        if result.timed_out:
+            return f"{result.stderr}Timed out after {result.duration:.0f}s: {' '.join(result.args)}"
+        return '' if result.success else result.stderr
+    
+    @classmethod
+    def install_batch(
+        cls, 
+        dependencies: List[str], 
+        venv_path: str, 
+        upgrade: bool = False, 
+        constraints: Optional[Dict[str, str]] = None, 
+        artifact_store: Optional[ArtifactStore] = None, 
+        callback: Optional[OutputCallback] = None
+    ) -> Dict[str, Any]:
+        """
+        Install dependencies with a single pip invocation.
+        
+        pip resolves the whole set at once, so either all of it is installed
+        consistently or nothing is. See ``install_batch_async`` for the arguments.
+        """
+        return asyncio.run(cls.install_batch_async(
+            dependencies, venv_path, upgrade, constraints, artifact_store, callback
+        ))
+    
+    @classmethod
+    async def install_batch_async(
+        cls, 
+        dependencies: List[str], 
+        venv_path: str, 
+        upgrade: bool = False, 
+        constraints: Optional[Dict[str, str]] = None, 
+        artifact_store: Optional[ArtifactStore] = None, 
+        callback: Optional[OutputCallback] = None
+    ) -> Dict[str, Any]:
+        """
+        Install dependencies with a single pip invocation, without blocking the event loop.
+        
+        Args:
+            dependencies (List[str]): Requirements to install
+            venv_path (str): Path to virtual environment
+            upgrade (bool): Whether to upgrade existing packages
+            constraints (Optional[Dict[str, str]]): Versions to hold packages
+                to (e.g. resolved pins), passed to pip as a constraints file
+            artifact_store (Optional[ArtifactStore]): Install offline from this
+                store instead of the package index
+            callback (Optional[OutputCallback]): Receives pip's output lines as they arrive
+        
+        Returns:
+            Dictionary with 'success', 'installed' (name -> version from
+            pip's report; packages already satisfied are not listed),
+            'packages' (each requirement -> the version pip's report shows
+            installed for it, or None if it was already satisfied; empty on
+            failure) and 'error' (pip's stderr on failure)
+        """
+        with tempfile.TemporaryDirectory(prefix='polydepend-install-') as workdir:
+            report_path = os.path.join(workdir, 'report.json')
+            install_cmd = [cls._pip_executable(venv_path), 'install', '--report', report_path]
+            if upgrade:
+                install_cmd.append('--upgrade')
+            install_cmd.extend(cls._source_options(artifact_store))
+            install_cmd.extend(cls._constraint_options(workdir, constraints))
+            install_cmd.extend(dependencies)
+            
+            lock = tool_lock_key('pip', venv_path)
+            result = await cls.executor.run(install_cmd, callback=callback, lock=lock)
+            if result.returncode != 0 and 'no such option: --report' in result.stderr:
+                # pip older than 22.2: install without a report
+                install_cmd.remove('--report')
+                install_cmd.remove(report_path)
+                result = await cls.executor.run(install_cmd, callback=callback, lock=lock)
+            
+            installed = {}
+            if result.success and os.path.exists(report_path):
+                with open(report_path) as f:
+                    report = json.load(f)
+                for item in report.get('install', []):
+                    metadata = item.get('metadata', {})
+                    if metadata.get('name'):
+                        installed[metadata['name']] = metadata.get('version')
+        
+        packages = {}
+        if result.success:
+            by_name = {normalize_distribution_name(name): version for name, version in installed.items()}
+            for dep in dependencies:
+                match = _REQUIREMENT_NAME_RE.match(dep)
+                name = normalize_distribution_name(match.group(0)) if match else None
+                packages[dep] = by_name.get(name)
+        
+        return {
+            'success': result.success,
+            'installed': installed,
+            'packages': packages,
+            'error': cls._error(result)
+        }
+    
+    @classmethod
+    def resolve_pins(
+        cls, 
+        dependencies: List[str], 
+        constraints: Optional[Dict[str, str]] = None, 
+        artifact_store: Optional[ArtifactStore] = None, 
+        interpreter: Optional[str] = None
+    ) -> Optional[List[str]]:
+        """
+        Resolve dependencies to the exact versions pip would install, without installing.
+        
+        Args:
+            dependencies (List[str]): Requirements to resolve
+            constraints (Optional[Dict[str, str]]): Versions to hold packages to
+            artifact_store (Optional[ArtifactStore]): Resolve against this
+                store instead of the package index
+            interpreter (Optional[str]): Python whose pip resolves; defaults to the running one
+        
+        Returns:
+            Sorted 'name==version' pins of every package, dependencies
+            included, or None if pip can't resolve the set (or is older than
+            22.2) or it has direct URL requirements, which have no version pin
+        """
+        with tempfile.TemporaryDirectory(prefix='polydepend-resolve-') as workdir:
+            report_path = os.path.join(workdir, 'report.json')
+            resolve_cmd = [
+                interpreter or sys.executable, '-m', 'pip', 'install', 
+                '--dry-run', '--ignore-installed', '--quiet', '--report', report_path
+            ]
+            resolve_cmd.extend(cls._source_options(artifact_store))
+            resolve_cmd.extend(cls._constraint_options(workdir, constraints))
+            resolve_cmd.extend(dependencies)
+            
+            result = cls.executor.run_sync(resolve_cmd)
+            if not result.success or not os.path.exists(report_path):
+                return None
+            with open(report_path) as f:
+                report = json.load(f)
+        
+        pins = []
+        for item in report.get('install', []):
+            metadata = item.get('metadata', {})
+            if item.get('is_direct') or not metadata.get('name') or not metadata.get('version'):
+                return None
+            pins.append(normalize_requirement(f"{metadata['name']}=={metadata['version']}"))
+        return sorted(pins)
+    
+    @classmethod
+    def _install_bisect(
+        cls, 
+        dependencies: List[str], 
+        venv_path: str, 
+        upgrade: bool, 
+        constraints: Optional[Dict[str, str]], 
+        artifact_store: Optional[ArtifactStore], 
+        callback: Optional[OutputCallback], 
+        details: Dict[str, Dict[str, Any]]
+    ):
+        """
+        Install a batch, splitting it in halves until the failing requirements are isolated.
+        """
+        outcome = cls.install_batch(dependencies, venv_path, upgrade, constraints, artifact_store, callback)
+        if outcome['success']:
+            for dep in dependencies:
+                details[dep] = {'success': True, 'version': outcome['packages'].get(dep), 'error': ''}
+            return
+        
+        if len(dependencies) == 1:
+            cls._record_failure(dependencies[0], outcome['error'], details, callback)
+            return
+        
+        middle = len(dependencies) // 2
+        cls._install_bisect(dependencies[:middle], venv_path, upgrade, constraints, artifact_store, callback, details)
+        cls._install_bisect(dependencies[middle:], venv_path, upgrade, constraints, artifact_store, callback, details)
+    
+    @staticmethod
+    def _record_failure(
+        dependency: str, 
+        error: str, 
+        details: Dict[str, Dict[str, Any]], 
+        callback: Optional[OutputCallback]
+    ):
+        """Record a requirement that failed to install and report it to the callback."""
+        details[dependency] = {'success': False, 'version': None, 'error': error}
+        if callback is not None:
+            callback('stderr', f"Failed to install {dependency}")
+    
     @classmethod
     def install_dependencies(
         cls, 
         dependencies: List[str], 
         venv_path: Optional[str] = None, 
-        upgrade: bool = False
+        upgrade: bool = False, 
+        batch: bool = True, 
+        constraints: Optional[Dict[str, str]] = None, 
+        pool: Optional[VenvPool] = None, 
+        artifact_store: Optional[ArtifactStore] = None, 
+        callback: Optional[OutputCallback] = None, 
+        details: Optional[Dict[str, Dict[str, Any]]] = None
     ) -> Dict[str, bool]:
         """
         Install dependencies with advanced error handling.
         
+        In batch mode the whole set is installed by one pip invocation; only
+        if that fails is it bisected to find the requirements that can't be
+        installed, and the others are still installed.
+        
+        A venv that doesn't exist yet is cloned from the pool: the
+        dependencies are resolved to exact pins first, and a pooled venv with
+        exactly those pins is copied as is; otherwise the closest pooled venv
+        is cloned and only the missing pins are installed.
+        
         Args:
             dependencies (List[str]): List of dependencies to install
-            venv_path (Optional[str]): Path to virtual environment
+            venv_path (Optional[str]): Path to virtual environment; defaults
+                to ./polydepend_venv
             upgrade (bool): Whether to upgrade existing packages
+            batch (bool): Install with one pip invocation instead of one per dependency
+            constraints (Optional[Dict[str, str]]): Versions to hold packages to,
+                e.g. ``resolved_dependencies`` from the resolver (batch mode only)
+            pool (Optional[VenvPool]): Pool used when the venv doesn't exist yet
+            artifact_store (Optional[ArtifactStore]): Install offline from this
+                store (see ``ArtifactStore.warm``) instead of the package index
+            callback (Optional[OutputCallback]): Receives pip's output lines as
+                they arrive, and a 'Failed to install <requirement>' line per failure
+            details (Optional[Dict[str, Dict[str, Any]]]): Filled with each
+                requirement's 'success', 'version' (installed according to pip's
+                report; None if already satisfied or unknown) and 'error'
         
         Returns:
             Dictionary of installation results
         """
-        # Use existing virtual environment or create new one
+        if details is None:
+            details = {}
+        
         if not venv_path:
-            venv_path = cls.create_virtual_environment()
+            venv_path = cls.default_venv_path()
         
-        # Determine pip executable
-        pip_executable = os.path.join(venv_path, 'bin', 'pip')
-        if sys.platform == 'win32':
-            pip_executable = os.path.join(venv_path, 'Scripts', 'pip')
+        if not os.path.exists(venv_path):
+            return cls._install_pooled(
+                dependencies, venv_path, upgrade, batch, constraints, 
+                pool or VenvPool(executor=cls.executor), artifact_store, callback, details
+            )
         
-        # Installation results tracker
-        installation_results = {}
+        if batch:
+            if dependencies:
+                cls._install_bisect(
+                    list(dependencies), venv_path, upgrade, constraints, artifact_store, callback, details
+                )
+            return {dep: details[dep]['success'] for dep in dependencies}
+        
+        pip_executable = cls._pip_executable(venv_path)
         
         for dep in dependencies:
             # Prepare install command
             install_cmd = [pip_executable, 'install']
             if upgrade:
                 install_cmd.append('--upgrade')
+            install_cmd.extend(cls._source_options(artifact_store))
             install_cmd.append(dep)
             
-            try:
-                # Run installation
-                result = subprocess.run(
-                    install_cmd, 
-                    capture_output=True, 
-                    text=True, 
-                    check=True
+            # Run installation
+            result = cls.executor.run_sync(
+                install_cmd, 
+                callback=callback, 
+                lock=tool_lock_key('pip', venv_path)
+            )
+            if result.success:
+                details[dep] = {'success': True, 'version': None, 'error': ''}
+            else:
+                cls._record_failure(dep, cls._error(result), details, callback)
+        
+        return {dep: details[dep]['success'] for dep in dependencies}
+    
+    @classmethod
+    def _install_pooled(
+        cls, 
+        dependencies: List[str], 
+        venv_path: str, 
+        upgrade: bool, 
+        batch: bool, 
+        constraints: Optional[Dict[str, str]], 
+        pool: VenvPool, 
+        artifact_store: Optional[ArtifactStore], 
+        callback: Optional[OutputCallback], 
+        details: Dict[str, Dict[str, Any]]
+    ) -> Dict[str, bool]:
+        """
+        Install dependencies into a new venv cloned from the pool.
+        """
+        pins = cls.resolve_pins(dependencies, constraints, artifact_store)
+        if pins is None:
+            # Without pins there is no key to pool by; pip reports what failed
+            pool.clone(venv_path)
+            return cls.install_dependencies(
+                dependencies, venv_path, upgrade, batch, constraints, 
+                artifact_store=artifact_store, callback=callback, details=details
+            )
+        
+        pooled_details = {}
+        
+        def installer(missing: List[str], path: str) -> List[str]:
+            results = cls.install_dependencies(
+                missing, path, upgrade, batch, 
+                artifact_store=artifact_store, callback=callback, details=pooled_details
+            )
+            return [pin for pin in missing if results.get(pin)]
+        
+        # Upgrading must not get the venv installed last time back
+        pool.clone(venv_path, pins, installer=installer, refresh=upgrade)
+        
+        # Report each requirement as given, by the pin of its package
+        pins_by_name = {pin.split('==', 1)[0]: pin for pin in pins}
+        for dep in dependencies:
+            match = _REQUIREMENT_NAME_RE.match(dep)
+            pin = pins_by_name.get(normalize_distribution_name(match.group(0)) if match else None)
+            if pin in pooled_details and not pooled_details[pin]['success']:
+                details[dep] = pooled_details[pin]
+            else:
+                details[dep] = {'success': True, 'version': pin.split('==', 1)[1] if pin else None, 'error': ''}
+        return {dep: details[dep]['success'] for dep in dependencies}
+    
+    @classmethod
+    def install_concurrently(
+        cls, 
+        plan: Dict[str, List[str]], 
+        venv_path: Optional[str] = None, 
+        project_path: Optional[str] = None, 
+        upgrade: bool = False, 
+        callback: Optional[OutputCallback] = None, 
+        artifact_store: Optional[ArtifactStore] = None
+    ) -> Dict[str, Dict[str, bool]]:
+        """
+        Install the dependencies of several ecosystems at the same time.
+        
+        Each ecosystem's package manager runs as its own command, so pip,
+        npm, cargo and mvn work in parallel within the executor's
+        concurrency limit; commands of one tool on one target still run
+        one at a time.
+        
+        Args:
+            plan (Dict[str, List[str]]): Dependencies per language: 'python'
+                (pip requirements), 'javascript' (npm package specs), 'rust'
+                (cargo add specs) or 'java' (Maven 'group:artifact:version')
+            venv_path (Optional[str]): Virtual environment for Python
+                dependencies; created from the pool if it doesn't exist
+            project_path (Optional[str]): Project that npm and cargo add
+                dependencies to; defaults to the working directory
+            upgrade (bool): Whether to upgrade existing Python packages
+            callback (Optional[OutputCallback]): Receives output lines as they
+                arrive, prefixed with '[<language>] '
+            artifact_store (Optional[ArtifactStore]): Install offline from this
+                store: pip from its wheels and sdists, npm from its tarballs
+                (specs must pin an exact version, e.g. 'lodash@4.17.21', and
+                package.json records the tarball paths), and cargo from a
+                local registry of its crates that replaces crates.io. Maven
+                artifacts aren't stored; mvn runs offline on its local repository
+        
+        Returns:
+            Installation results per language
+        
+        Raises:
+            ValueError: If a language is unsupported, or Python dependencies
+                are given without a venv
+        """
+        unsupported = set(plan) - {'python', 'javascript', 'rust', 'java'}
+        if unsupported:
+            raise ValueError(f"Unsupported languages: {', '.join(sorted(unsupported))}")
+        if plan.get('python') and not venv_path:
+            raise ValueError("A venv_path is needed to install Python dependencies")
+        if plan.get('python') and not os.path.exists(venv_path):
+            # As install_dependencies does; there is no pip to run otherwise
+            cls.create_virtual_environment(venv_path)
+        
+        return asyncio.run(cls._install_concurrently_async(
+            plan, venv_path, project_path, upgrade, callback, artifact_store
+        ))
+    
+    @classmethod
+    async def _install_concurrently_async(
+        cls, 
+        plan: Dict[str, List[str]], 
+        venv_path: Optional[str], 
+        project_path: Optional[str], 
+        upgrade: bool, 
+        callback: Optional[OutputCallback], 
+        artifact_store: Optional[ArtifactStore]
+    ) -> Dict[str, Dict[str, bool]]:
+        """
+        Run every language's installation concurrently.
+        """
+        project_path = project_path or os.getcwd()
+        
+        def prefixed(language: str) -> Optional[OutputCallback]:
+            if callback is None:
+                return None
+            return lambda stream, line: callback(stream, f"[{language}] {line}")
+        
+        def report_failure(language: str, error: str):
+            if callback is None:
+                return
+            # The cause is usually the last line, e.g. pip's 'ERROR: ...' or
+            # the timeout or missing program, which the tool never printed
+            lines = [line for line in error.splitlines() if line.strip()]
+            cause = f": {lines[-1].strip()}" if lines else ''
+            callback('stderr', f"[{language}] Failed to install {language} dependencies{cause}")
+        
+        async def run(language: str, tool: str, args: List[str], target: str) -> CommandResult:
+            result = await cls.executor.run(
+                args,
+                callback=prefixed(language),
+                lock=tool_lock_key(tool, target),
+                cwd=project_path
+            )
+            if not result.success:
+                report_failure(language, cls._error(result))
+            return result
+        
+        async def install(language: str, dependencies: List[str]) -> Dict[str, bool]:
+            if language == 'python':
+                outcome = await cls.install_batch_async(
+                    dependencies, venv_path, upgrade, artifact_store=artifact_store, callback=prefixed(language)
                 )
-                installation_results[dep] = True
-            except subprocess.CalledProcessError as e:
-                # Detailed error logging
-                installation_results[dep] = False
-                print(f"Failed to install {dep}:")
-                print(f"Error output: {e.stderr}")
+                if not outcome['success']:
+                    report_failure(language, outcome['error'])
+                return {dep: outcome['success'] for dep in dependencies}
+            if language == 'java':
+                # dependency:get takes one artifact per invocation
+                offline = ['-o'] if artifact_store is not None else []
+                results = {}
+                for dep in dependencies:
+                    args = ['mvn', '-B', '-q', *offline, 'dependency:get', f'-Dartifact={dep}']
+                    results[dep] = (await run(language, 'mvn', args, project_path)).success
+                return results
+            if language == 'javascript' and artifact_store is not None:
+                tarballs = cls._npm_tarballs(dependencies, artifact_store)
+                for dep, tarball in tarballs.items():
+                    if tarball is None and callback is not None:
+                        prefixed(language)('stderr', f"No stored tarball for {dep}")
+                stored = [tarball for tarball in tarballs.values() if tarball]
+                success = bool(stored) and (await run(
+                    language, 'npm', ['npm', 'install', '--offline', '--no-audit', '--no-fund', *stored], project_path
+                )).success
+                return {dep: success and tarballs[dep] is not None for dep in dependencies}
+            if language == 'javascript':
+                result = await run(language, 'npm', ['npm', 'install', '--no-audit', '--no-fund', *dependencies], project_path)
+            else:
+                args = ['cargo', *cls._cargo_source_options(artifact_store), 'add', *dependencies]
+                result = await run(language, 'cargo', args, project_path)
+            return {dep: result.success for dep in dependencies}
         
-        return installation_results
+        languages = [language for language, dependencies in plan.items() if dependencies]
+        outcomes = await asyncio.gather(*(install(language, plan[language]) for language in languages))
+        return dict(zip(languages, outcomes))
     
     @classmethod
     def export_requirements(
         cls, 
         venv_path: Optional[str] = None, 
-        output_path: Optional[str] = None
+        output_path: Optional[str] = None, 
+        fmt: str = 'freeze', 
+        artifact_store: Optional[ArtifactStore] = None, 
+        include_all: bool = False
     ) -> str:
         """
         Export requirements from a virtual environment.
         
+        The distributions' metadata is read from site-packages directly,
+        without running pip.
+        
         Args:
-            venv_path (Optional[str]): Path to virtual environment
+            venv_path (Optional[str]): Path to virtual environment; defaults to
+                the running environment, without creating a venv
             output_path (Optional[str]): Path to save requirements file
+            fmt (str): 'freeze' (as pip freeze), 'hashes' (pins with --hash
+                options) or 'json' (lock file)
+            artifact_store (Optional[ArtifactStore]): Source of archive hashes
+                for the 'hashes' and 'json' formats
+            include_all (bool): Also export pip, setuptools, wheel and distribute
         
         Returns:
             Path to the generated requirements file
         """
-        # Use existing virtual environment or create new one
-        if not venv_path:
-            venv_path = cls.create_virtual_environment()
-        
-        # Determine pip executable
-        pip_executable = os.path.join(venv_path, 'bin', 'pip')
-        if sys.platform == 'win32':
-            pip_executable = os.path.join(venv_path, 'Scripts', 'pip')
-        
-        # Generate requirements
+        # Without a venv, export the running environment
         try:
-            result = subprocess.run(
-                [pip_executable, 'freeze'], 
-                capture_output=True, 
-                text=True, 
-                check=True
+            requirements = format_requirements(
+                scan_environment(venv_path or None), 
+                fmt, 
+                artifact_store, 
+                include_all
             )
-            
-            # Determine output path
-            if not output_path:
-                output_path = os.path.join(os.getcwd(), 'requirements.txt')
-            
-            # Write requirements to file
-            with open(output_path, 'w') as f:
-                f.write(result.stdout)
-            
-            return output_path
-        except subprocess.CalledProcessError as e:
-            print(f"Failed to export requirements: {e.stderr}")
+        except ValueError as e:
+            print(f"Failed to export requirements: {e}")
             return ''
+        
+        # Determine output path
+        if not output_path:
+            filename = 'requirements.lock.json' if fmt == 'json' else 'requirements.txt'
+            output_path = os.path.join(os.getcwd(), filename)
+        
+        # Write requirements to file
+        with open(output_path, 'w') as f:
+            f.write(requirements)
+        
+        return output_path
     
     @classmethod
     def manage_dependency_cache(
@@ -155,20 +643,14 @@ class DependencyFetcher:
         else:
             raise ValueError(f"Unsupported cache action: {action}")
         
-        try:
-            result = subprocess.run(
-                cmd, 
-                capture_output=True, 
-                text=True, 
-                check=True
-            )
-            
-            return {
-                'success': True,
-                'output': result.stdout
-            }
-        except subprocess.CalledProcessError as e:
+        result = cls.executor.run_sync(cmd)
+        if not result.success:
             return {
                 'success': False,
-                'error': e.stderr
+                'error': cls._error(result)
             }
+        
+        return {
+            'success': True,
+            'output': result.stdout
+        }
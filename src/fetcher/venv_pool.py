@@ -0,0 +1,360 @@
+"""
+Virtual Environment Pool
+
+Keeps virtual environments keyed by (interpreter, installed requirement
+set) so a venv with the same contents is reused instead of created again.
+Callers should pass resolved pins ('name==version' for every package,
+transitive ones included), so that a key names exact contents and a
+loose requirement like 'requests>=2' doesn't stay on the version it was
+first installed at.
+A venv with new contents is cloned from the closest pooled venv, one whose
+requirements are a subset of the wanted ones, and only the missing
+requirements are installed into the clone. Clones hardlink the files they
+share with their source, so they are created in well under a second and
+take little extra space; files embedding the venv's own path (scripts,
+activation scripts, pyvenv.cfg) are copied with the path rewritten.
+
+The least recently used venvs are evicted once the pool holds more than
+``max_entries`` venvs or ``max_size`` bytes.
+
+Pooled venvs are shared: callers must not install into them directly,
+but take a private copy with ``clone``.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import time
+import uuid
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from fetcher.executor import AsyncExecutor, tool_lock_key
+from resolver.solver import normalize_requirement
+
+# Bump when the table layout changes
+SCHEMA_VERSION = 1
+
+DEFAULT_POOL_DIR = os.path.join(os.path.expanduser('~'), '.polydepend', 'venvs')
+DEFAULT_MAX_ENTRIES = 16
+DEFAULT_MAX_SIZE = 4 * 1024 * 1024 * 1024
+
+# Installs requirements into a venv and returns the ones that succeeded
+Installer = Callable[[List[str], str], List[str]]
+
+_SCRIPTS_DIR = 'Scripts' if sys.platform == 'win32' else 'bin'
+
+
+def _normalized(requirements: Sequence[str]) -> List[str]:
+    return sorted({normalize_requirement(requirement) for requirement in requirements})
+
+
+def _directory_size(path: str) -> int:
+    """Bytes used by a directory, counting each hardlinked file once."""
+    seen = set()
+    total = 0
+    for directory, _, files in os.walk(path):
+        for name in files:
+            try:
+                stat = os.lstat(os.path.join(directory, name))
+            except OSError:
+                continue
+            if (stat.st_dev, stat.st_ino) not in seen:
+                seen.add((stat.st_dev, stat.st_ino))
+                total += stat.st_size
+    return total
+
+
+def _copy_rewriting(source: str, destination: str, old: bytes, new: bytes):
+    """Copy a file, replacing the source venv's path in it; hardlink if it has none."""
+    with open(source, 'rb') as f:
+        content = f.read()
+    if old not in content:
+        _link_or_copy(source, destination)
+        return
+    with open(destination, 'wb') as f:
+        f.write(content.replace(old, new))
+    shutil.copymode(source, destination)
+
+
+def _link_or_copy(source: str, destination: str):
+    try:
+        os.link(source, destination)
+    except OSError:
+        # Other filesystem or no hardlink support
+        shutil.copy2(source, destination)
+
+
+def clone_venv(source: str, destination: str):
+    """
+    Clone a virtual environment, hardlinking files where possible.
+
+    Args:
+        source (str): Existing venv
+        destination (str): Path of the clone; must not exist
+    """
+    old = os.path.abspath(source).encode()
+    new = os.path.abspath(destination).encode()
+
+    def copy(src: str, dst: str):
+        relative = os.path.relpath(src, source)
+        # Scripts and top-level files (pyvenv.cfg) embed the venv's own path
+        if os.path.dirname(relative) in ('', _SCRIPTS_DIR):
+            _copy_rewriting(src, dst, old, new)
+        else:
+            _link_or_copy(src, dst)
+        return dst
+
+    shutil.copytree(source, destination, symlinks=True, copy_function=copy)
+
+
+class VenvPool:
+    """
+    Pool of virtual environments keyed by interpreter and installed requirements.
+    """
+
+    def __init__(
+        self,
+        root: str = DEFAULT_POOL_DIR,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_size: int = DEFAULT_MAX_SIZE,
+        with_pip: bool = True,
+        executor: Optional[AsyncExecutor] = None
+    ):
+        """
+        Args:
+            root (str): Directory holding the pooled venvs and their index
+            max_entries (int): Venvs kept before the least recently used are evicted
+            max_size (int): Total bytes kept before the least recently used are evicted
+            with_pip (bool): Bootstrap pip into new base venvs
+            executor (Optional[AsyncExecutor]): Runs the commands creating
+                base venvs; defaults to a new one
+        """
+        self.root = root
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.with_pip = with_pip
+        self.executor = executor or AsyncExecutor()
+        self.db_path = os.path.join(root, 'pool.sqlite3')
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(self.root, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            if conn.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+                conn.execute('DROP TABLE IF EXISTS venvs')
+                conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            conn.execute(
+                '''CREATE TABLE IF NOT EXISTS venvs (
+                    key TEXT PRIMARY KEY,
+                    interpreter TEXT NOT NULL,
+                    requirements TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_used REAL NOT NULL
+                )'''
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        """Close the pool index."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    @staticmethod
+    def key(interpreter: str, requirements: Sequence[str]) -> str:
+        """
+        Key of a venv.
+
+        Args:
+            interpreter (str): Python executable the venv is based on
+            requirements (Sequence[str]): Requirements installed in it
+
+        Returns:
+            str: sha256 hex digest; equivalent requirement spellings share it
+        """
+        encoded = json.dumps([os.path.realpath(interpreter), _normalized(requirements)])
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+    def _lookup(self, key: str) -> Optional[str]:
+        conn = self._connect()
+        row = conn.execute('SELECT path FROM venvs WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        if not os.path.isdir(row[0]):
+            # Removed behind the pool's back
+            with conn:
+                conn.execute('DELETE FROM venvs WHERE key = ?', (key,))
+            return None
+        with conn:
+            conn.execute('UPDATE venvs SET last_used = ? WHERE key = ?', (time.time(), key))
+        return row[0]
+
+    def _closest(self, interpreter: str, wanted: List[str]) -> Optional[Tuple[str, List[str]]]:
+        """Pooled venv with the most requirements that are all among ``wanted``."""
+        wanted_set = set(wanted)
+        best = None
+        rows = self._connect().execute(
+            'SELECT key, requirements, path FROM venvs WHERE interpreter = ? ORDER BY last_used DESC',
+            (os.path.realpath(interpreter),)
+        )
+        for key, encoded, path in rows.fetchall():
+            requirements = json.loads(encoded)
+            if set(requirements) <= wanted_set and (best is None or len(requirements) > len(best[1])):
+                if self._lookup(key) is not None:
+                    best = (path, requirements)
+        return best
+
+    def _create_base(self, interpreter: str, path: str):
+        command = [interpreter, '-m', 'venv', path]
+        if not self.with_pip:
+            command.append('--without-pip')
+        result = self.executor.run_sync(command, lock=tool_lock_key('pip', path))
+        if not result.success:
+            error = 'timed out' if result.timed_out else result.stderr.strip()
+            raise RuntimeError(f"Could not create a venv with {interpreter}: {error}")
+
+    def _register(self, key: str, interpreter: str, requirements: List[str], path: str):
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO venvs (key, interpreter, requirements, path, size, last_used) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (key, os.path.realpath(interpreter), json.dumps(requirements),
+                 path, _directory_size(path), time.time())
+            )
+
+    def acquire(
+        self,
+        requirements: Sequence[str] = (),
+        interpreter: Optional[str] = None,
+        installer: Optional[Installer] = None,
+        refresh: bool = False
+    ) -> str:
+        """
+        Get a venv with exactly ``requirements`` installed.
+
+        Args:
+            requirements (Sequence[str]): Requirements the venv must have,
+                preferably resolved pins
+            interpreter (Optional[str]): Python executable; defaults to the running one
+            installer (Optional[Installer]): Installs missing requirements into a
+                new venv; required unless ``requirements`` is empty or pooled
+            refresh (bool): Don't reuse a venv with these requirements or clone
+                one with some of them; install everything into a copy of the
+                bare venv, replacing the pooled venv (e.g. to upgrade)
+
+        Returns:
+            str: Path of the pooled venv; if some requirements fail to install,
+            the venv holds the ones that succeeded
+
+        Raises:
+            ValueError: If requirements are missing and no installer is given
+            RuntimeError: If the bare venv can't be created
+        """
+        interpreter = interpreter or sys.executable
+        wanted = _normalized(requirements)
+        key = self.key(interpreter, wanted)
+
+        if refresh and wanted:
+            closest = self._closest(interpreter, [])
+        else:
+            path = self._lookup(key)
+            if path is not None:
+                return path
+            closest = self._closest(interpreter, wanted)
+        if closest is None and wanted:
+            # Build the bare venv once; every other venv is cloned from it
+            self.acquire((), interpreter)
+            closest = self._closest(interpreter, wanted)
+
+        missing = [requirement for requirement in wanted if closest is None or requirement not in closest[1]]
+        if missing and installer is None:
+            raise ValueError(f"An installer is needed to add {', '.join(missing)}")
+
+        path = os.path.join(self.root, uuid.uuid4().hex)
+        try:
+            if closest is None:
+                self._create_base(interpreter, path)
+                installed = []
+            else:
+                clone_venv(closest[0], path)
+                installed = list(closest[1])
+            if missing:
+                installed.extend(installer(missing, path))
+        except BaseException:
+            shutil.rmtree(path, ignore_errors=True)
+            raise
+
+        installed = _normalized(installed)
+        key = self.key(interpreter, installed)
+        existing = self._lookup(key)
+        if existing is not None and not (refresh and installed):
+            # Nothing new was installed; the venv was already pooled
+            shutil.rmtree(path, ignore_errors=True)
+            return existing
+
+        self._register(key, interpreter, installed, path)
+        if existing is not None:
+            # Refreshed: the new venv takes the old one's place
+            shutil.rmtree(existing, ignore_errors=True)
+        self.evict(keep=key)
+        return path
+
+    def clone(
+        self,
+        destination: str,
+        requirements: Sequence[str] = (),
+        interpreter: Optional[str] = None,
+        installer: Optional[Installer] = None,
+        refresh: bool = False
+    ) -> str:
+        """
+        Make a private venv with ``requirements`` installed, from the pool.
+
+        The pooled venv is acquired as with ``acquire`` and cloned to
+        ``destination``, which the caller may then install into freely.
+
+        Args:
+            destination (str): Path of the new venv; must not exist
+            requirements (Sequence[str]): Requirements the venv must have
+            interpreter (Optional[str]): Python executable; defaults to the running one
+            installer (Optional[Installer]): See ``acquire``
+            refresh (bool): See ``acquire``
+
+        Returns:
+            str: ``destination``
+        """
+        source = self.acquire(requirements, interpreter, installer, refresh)
+        clone_venv(source, destination)
+        return destination
+
+    def evict(self, keep: Optional[str] = None):
+        """
+        Remove least recently used venvs beyond ``max_entries`` or ``max_size``.
+
+        Args:
+            keep (Optional[str]): Key of a venv never to evict
+        """
+        conn = self._connect()
+        rows = conn.execute('SELECT key, path, size FROM venvs ORDER BY last_used DESC').fetchall()
+        kept = 0
+        total = 0
+        doomed = []
+        for key, path, size in rows:
+            if key == keep or (kept < self.max_entries and total + size <= self.max_size):
+                kept += 1
+                total += size
+            else:
+                doomed.append((key, path))
+
+        with conn:
+            conn.executemany('DELETE FROM venvs WHERE key = ?', [(key,) for key, _ in doomed])
+        for _, path in doomed:
+            shutil.rmtree(path, ignore_errors=True)
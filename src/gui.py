@@ -4,6 +4,7 @@ import os
 import json
 
 from analyzer.python_analyzer import PythonDependencyAnalyzer
+from resolver.resolution_cache import ResolutionCache
 from resolver.resolver_engine import DependencyResolver
 from fetcher.fetcher import DependencyFetcher
 
@@ -20,7 +21,8 @@ class PolyDependGUI:
         
         # Analyzer and resolver instances
         self.analyzer = PythonDependencyAnalyzer()
-        self.resolver = DependencyResolver()
+        # Repeated resolves of unchanged requirements are served from the cache
+        self.resolver = DependencyResolver(cache=ResolutionCache())
         self.fetcher = DependencyFetcher()
         
         # Create UI components
@@ -187,14 +189,16 @@ class PolyDependGUI:
             # Get project dependencies
             project_deps = self.analyzer.analyze_requirements(path)
             
-            # Install dependencies
+            # Install dependencies into the project's own venv
+            venv_path = os.path.join(path, 'polydepend_venv')
             install_results = self.fetcher.install_dependencies(
                 project_deps, 
+                venv_path, 
                 upgrade=self.upgrade_var.get()
             )
             
             # Display results
-            result_str = json.dumps(install_results, indent=2)
+            result_str = json.dumps({'venv': venv_path, 'results': install_results}, indent=2)
             self.install_results.insert(tk.END, result_str)
         except Exception as e:
             messagebox.showerror("Installation Error", str(e))
@@ -0,0 +1,433 @@
+"""
+Project Walker for Dependency Analysis
+
+Performs a single filesystem traversal of a project and groups the files
+found by extension and file name, so every analyzer can be handed only the
+files it cares about without walking the tree itself.
+
+Vendored and generated directories are pruned during the walk, together
+with anything matched by .gitignore or .polydependignore files.
+"""
+
+import os
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Directories that never contain first-party sources
+DEFAULT_PRUNE_DIRS = frozenset({
+    '.git',
+    '.hg',
+    '.svn',
+    '.venv',
+    'venv',
+    '__pycache__',
+    '.tox',
+    '.mypy_cache',
+    '.pytest_cache',
+    '.polydepend',
+    'node_modules',
+    'target',
+    'build',
+    'dist',
+})
+
+GITIGNORE_FILE = '.gitignore'
+POLYDEPEND_IGNORE_FILE = '.polydependignore'
+
+# Bounds of the ecosystem detection walk
+DETECT_MAX_DEPTH = 3
+DETECT_MAX_DIRS = 200
+
+
+class IgnorePattern:
+    """
+    A single compiled pattern in .gitignore syntax.
+
+    Patterns containing a slash are anchored to ``base`` (the directory of
+    the ignore file, relative to the project root); others match a name at
+    any depth below it.
+    """
+
+    __slots__ = ('base', 'negate', 'dir_only', 'regex')
+
+    def __init__(self, pattern: str, base: str = ''):
+        self.base = base
+        self.negate = pattern.startswith('!')
+        if self.negate:
+            pattern = pattern[1:]
+        if pattern.startswith('\\'):
+            pattern = pattern[1:]
+
+        self.dir_only = pattern.endswith('/')
+        pattern = pattern.rstrip('/')
+        anchored = '/' in pattern
+        pattern = pattern.lstrip('/')
+
+        regex = _glob_to_regex(pattern)
+        if not anchored:
+            regex = '(?:.*/)?' + regex
+        self.regex = re.compile(regex + '$')
+
+    def matches(self, rel_path: str, is_dir: bool) -> bool:
+        """
+        Check whether a project-relative path matches this pattern.
+
+        Args:
+            rel_path (str): '/'-separated path relative to the project root
+            is_dir (bool): Whether the path is a directory
+
+        Returns:
+            bool: True if the pattern matches the path
+        """
+        if self.dir_only and not is_dir:
+            return False
+        if self.base:
+            if not rel_path.startswith(self.base + '/'):
+                return False
+            rel_path = rel_path[len(self.base) + 1:]
+        return self.regex.match(rel_path) is not None
+
+
+def _glob_to_regex(pattern: str) -> str:
+    """
+    Translate a gitignore glob into a regular expression.
+    """
+    parts = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == '*':
+            if pattern.startswith('**/', i):
+                parts.append('(?:.*/)?')
+                i += 3
+                continue
+            if pattern.startswith('**', i):
+                parts.append('.*')
+                i += 2
+                continue
+            parts.append('[^/]*')
+        elif c == '?':
+            parts.append('[^/]')
+        elif c == '[':
+            end = pattern.find(']', i + 1)
+            if end == -1:
+                parts.append('\\[')
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                parts.append('[' + body.replace('\\', '\\\\') + ']')
+                i = end + 1
+                continue
+        elif c == '\\' and i + 1 < n:
+            parts.append(re.escape(pattern[i + 1]))
+            i += 2
+            continue
+        else:
+            parts.append(re.escape(c))
+        i += 1
+    return ''.join(parts)
+
+
+def parse_ignore_lines(lines: Iterable[str], base: str = '') -> List[IgnorePattern]:
+    """
+    Compile the patterns of an ignore file.
+
+    Args:
+        lines (Iterable[str]): Lines in .gitignore syntax
+        base (str): Directory of the ignore file relative to the project root
+
+    Returns:
+        List[IgnorePattern]: Compiled patterns, in file order
+    """
+    patterns = []
+    for line in lines:
+        line = line.rstrip('\r\n').rstrip(' ')
+        if not line or line.startswith('#'):
+            continue
+        patterns.append(IgnorePattern(line, base))
+    return patterns
+
+
+def load_ignore_file(path: str, base: str = '') -> List[IgnorePattern]:
+    """
+    Load and compile an ignore file, returning no patterns if unreadable.
+    """
+    try:
+        with open(path, 'r', errors='replace') as f:
+            return parse_ignore_lines(f, base)
+    except OSError:
+        return []
+
+
+def is_ignored(patterns: Tuple[IgnorePattern, ...], rel_path: str, is_dir: bool) -> bool:
+    """
+    Check a path against ordered ignore patterns; the last match wins.
+    """
+    for pattern in reversed(patterns):
+        if pattern.matches(rel_path, is_dir):
+            return not pattern.negate
+    return False
+
+
+class FileIndex:
+    """
+    Files of a project grouped by extension and by file name.
+
+    Paths are stored in walk order: files of a directory come before the
+    files of its subdirectories.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._by_extension: Dict[str, List[str]] = {}
+        self._by_name: Dict[str, List[str]] = {}
+
+    def add_by_extension(self, extension: str, path: str):
+        """Record a source file under its extension."""
+        self._by_extension.setdefault(extension, []).append(path)
+
+    def add_by_name(self, name: str, path: str):
+        """Record a manifest file under its file name."""
+        self._by_name.setdefault(name, []).append(path)
+
+    def files_with_extensions(self, extensions: Iterable[str]) -> List[str]:
+        """
+        Get all indexed files having one of the given extensions.
+
+        Args:
+            extensions (Iterable[str]): Extensions including the dot (e.g. '.py')
+
+        Returns:
+            List[str]: Matching file paths, grouped in the order of ``extensions``
+        """
+        files = []
+        for extension in extensions:
+            files.extend(self._by_extension.get(extension, ()))
+        return files
+
+    def files_named(self, name: str) -> List[str]:
+        """
+        Get all indexed files with the given file name.
+
+        Args:
+            name (str): File name to look up (e.g. 'pom.xml')
+
+        Returns:
+            List[str]: Matching file paths in walk order
+        """
+        return list(self._by_name.get(name, ()))
+
+    def first_file_named(self, name: str) -> Optional[str]:
+        """Get the first indexed file with the given name, or None."""
+        paths = self._by_name.get(name)
+        return paths[0] if paths else None
+
+    def has_any(self, extensions: Iterable[str], names: Iterable[str]) -> bool:
+        """Check whether any file with one of the extensions or names was indexed."""
+        return (
+            any(extension in self._by_extension for extension in extensions)
+            or any(name in self._by_name for name in names)
+        )
+
+
+class ProjectWalker:
+    """
+    Single-pass, scandir-based project traversal.
+
+    Only files whose extension or name was requested are indexed; passing
+    ``None`` for both indexes every file by extension. Ignored directories
+    are pruned as they are found, so their contents are never listed.
+    """
+
+    def __init__(
+        self,
+        extensions: Optional[Iterable[str]] = None,
+        names: Optional[Iterable[str]] = None,
+        prune_dirs: Optional[Iterable[str]] = DEFAULT_PRUNE_DIRS,
+        ignore_patterns: Optional[Iterable[str]] = None,
+        use_ignore_files: bool = True
+    ):
+        """
+        Args:
+            extensions (Optional[Iterable[str]]): Source extensions to index
+            names (Optional[Iterable[str]]): Manifest file names to index
+            prune_dirs (Optional[Iterable[str]]): Directory names never entered
+            ignore_patterns (Optional[Iterable[str]]): Extra patterns in
+                .gitignore syntax, relative to the project root
+            use_ignore_files (bool): Honor .gitignore and .polydependignore files
+        """
+        self.extensions = frozenset(extensions) if extensions is not None else None
+        self.names = frozenset(names) if names is not None else frozenset()
+        self.prune_dirs = frozenset(prune_dirs or ())
+        self.ignore_patterns = tuple(parse_ignore_lines(ignore_patterns or ()))
+        self.use_ignore_files = use_ignore_files
+
+    def walk(self, project_path: str) -> FileIndex:
+        """
+        Traverse a project once and build its file index.
+
+        Args:
+            project_path (str): Root path of the project
+
+        Returns:
+            FileIndex: Files found, grouped by extension and name
+        """
+        index = FileIndex(project_path)
+        extensions = self.extensions
+        names = self.names
+        overrides = self._load_overrides(project_path)
+
+        # Depth-first, files before subdirectories (same order as os.walk)
+        stack = [(project_path, '', ())]
+        while stack:
+            directory, rel_dir, gitignore_patterns = stack.pop()
+            files, subdirs = self._scan_directory(directory, rel_dir, gitignore_patterns, overrides)
+
+            for name, extension, path in files:
+                if name in names:
+                    index.add_by_name(name, path)
+                if extension and (extensions is None or extension in extensions):
+                    index.add_by_extension(extension, path)
+
+            stack.extend(reversed(subdirs))
+
+        return index
+
+    def detect(
+        self,
+        project_path: str,
+        max_depth: int = DETECT_MAX_DEPTH,
+        max_dirs: int = DETECT_MAX_DIRS
+    ) -> Tuple[Set[str], bool]:
+        """
+        Look for the requested names and extensions with a bounded walk.
+
+        Directories are visited breadth-first so manifests near the root
+        are seen first, and the walk ends as soon as every requested name
+        and extension has been found.
+
+        Args:
+            project_path (str): Root path of the project
+            max_depth (int): Deepest directory level entered (root is 0)
+            max_dirs (int): Maximum number of directories listed
+
+        Returns:
+            Tuple[Set[str], bool]: Names and extensions found, and whether
+            the limits stopped the walk before the tree was exhausted
+        """
+        wanted = set(self.names)
+        if self.extensions is not None:
+            wanted.update(self.extensions)
+        overrides = self._load_overrides(project_path)
+
+        found = set()
+        visited = 0
+        truncated = False
+        queue = deque([(project_path, '', (), 0)])
+        while queue:
+            if visited >= max_dirs:
+                return found, True
+            directory, rel_dir, gitignore_patterns, depth = queue.popleft()
+            files, subdirs = self._scan_directory(directory, rel_dir, gitignore_patterns, overrides)
+            visited += 1
+
+            for name, extension, _ in files:
+                if name in wanted:
+                    found.add(name)
+                if extension in wanted:
+                    found.add(extension)
+            if found == wanted:
+                return found, False
+
+            if subdirs and depth >= max_depth:
+                # Siblings at this depth are still scanned; only descending stops
+                truncated = True
+                continue
+            queue.extend(subdir + (depth + 1,) for subdir in subdirs)
+
+        return found, truncated
+
+    def _load_overrides(self, project_path: str) -> Tuple[IgnorePattern, ...]:
+        """
+        Patterns overriding any .gitignore: .polydependignore, then explicit ones.
+        """
+        overrides = self.ignore_patterns
+        if self.use_ignore_files:
+            overrides = tuple(load_ignore_file(
+                os.path.join(project_path, POLYDEPEND_IGNORE_FILE)
+            )) + overrides
+        return overrides
+
+    def _scan_directory(
+        self,
+        directory: str,
+        rel_dir: str,
+        gitignore_patterns: Tuple[IgnorePattern, ...],
+        overrides: Tuple[IgnorePattern, ...]
+    ) -> Tuple[List[Tuple[str, str, str]], List[Tuple[str, str, Tuple[IgnorePattern, ...]]]]:
+        """
+        List one directory, applying pruning and ignore patterns.
+
+        Args:
+            directory (str): Directory to list
+            rel_dir (str): Its path relative to the project root ('' for the root)
+            gitignore_patterns (Tuple[IgnorePattern, ...]): Patterns inherited
+                from .gitignore files of parent directories
+            overrides (Tuple[IgnorePattern, ...]): Patterns that always win
+
+        Returns:
+            Tuple of the wanted files as (name, extension, path) and the
+            subdirectories to enter as (path, rel_path, gitignore patterns)
+        """
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except OSError:
+            return [], []
+
+        extensions = self.extensions
+        names = self.names
+        prune_dirs = self.prune_dirs
+
+        # Nested .gitignore files apply to their own subtree and take
+        # precedence over those of parent directories
+        if self.use_ignore_files:
+            for entry in entries:
+                if entry.name == GITIGNORE_FILE:
+                    gitignore_patterns = gitignore_patterns + tuple(
+                        load_ignore_file(entry.path, rel_dir)
+                    )
+                    break
+        patterns = gitignore_patterns + overrides
+
+        files = []
+        subdirs = []
+        for entry in entries:
+            name = entry.name
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                continue
+
+            rel_path = rel_dir + '/' + name if rel_dir else name
+
+            if is_dir:
+                # Like os.walk, do not descend into symlinked directories
+                if name in prune_dirs or entry.is_symlink():
+                    continue
+                if patterns and is_ignored(patterns, rel_path, True):
+                    continue
+                subdirs.append((entry.path, rel_path, gitignore_patterns))
+                continue
+
+            extension = os.path.splitext(name)[1]
+            wanted_extension = bool(extension) and (extensions is None or extension in extensions)
+            if not (name in names or wanted_extension):
+                continue
+            if patterns and is_ignored(patterns, rel_path, False):
+                continue
+            files.append((name, extension, entry.path))
+
+        return files, subdirs
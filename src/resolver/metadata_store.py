@@ -0,0 +1,580 @@
+"""
+Offline Package Metadata Store
+
+Keeps the versions and requirements of packages from several ecosystems
+in a SQLite database indexed by (ecosystem, name, version), so resolution
+works without network access, e.g. in air-gapped CI. The store is filled
+from local artifacts:
+
+- directories of wheels, sdists, npm tarballs and ``.crate`` files
+- PyPI simple-index mirror dumps (PEP 503 HTML or PEP 691 JSON pages)
+
+Archives are read one at a time, and only the metadata member of each is
+decompressed. Records are written in batches, so importing a large mirror
+takes little memory.
+
+Requirements are stored as written by each ecosystem: PEP 508 strings for
+'pypi' and 'name@range' for 'npm' and 'crates'.
+"""
+
+import email.parser
+import hashlib
+import html.parser
+import json
+import os
+import re
+import sqlite3
+import tarfile
+import zipfile
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from resolver.providers import normalize_name
+
+# Bump when the table layout or record encoding changes
+SCHEMA_VERSION = 1
+
+ECOSYSTEMS = ('pypi', 'npm', 'crates')
+
+# Records written per transaction during imports
+IMPORT_BATCH_SIZE = 1000
+
+_EMPTY_SNAPSHOT = 0
+_SNAPSHOT_BITS = 256
+
+_SDIST_SUFFIXES = ('.tar.gz', '.tar.bz2', '.tgz', '.zip')
+_SIMPLE_INDEX_PAGES = ('index.html', 'index.v1_json', 'index.json')
+
+
+class PackageRecord(NamedTuple):
+    """
+    Metadata of one version of a package.
+    """
+
+    ecosystem: str
+    name: str
+    version: str
+    # None when the source carries no dependency metadata
+    requires: Optional[List[str]]
+    source: str
+
+
+def normalize_package_name(ecosystem: str, name: str) -> str:
+    """
+    Normalize a package name the way its ecosystem compares names.
+
+    Args:
+        ecosystem (str): 'pypi', 'npm' or 'crates'
+        name (str): Name as written
+
+    Returns:
+        str: PEP 503 name for 'pypi', lowercase with '_' as '-' for 'crates',
+        and the stripped name for 'npm'
+    """
+    if ecosystem == 'pypi':
+        return normalize_name(name)
+    if ecosystem == 'crates':
+        # Cargo treats '-' and '_' in crate names as the same
+        return name.strip().lower().replace('_', '-')
+    return name.strip()
+
+
+def _record_digest(record: PackageRecord) -> int:
+    encoded = json.dumps([record.ecosystem, record.name, record.version, record.requires])
+    return int.from_bytes(hashlib.sha256(encoded.encode('utf-8')).digest(), 'big')
+
+
+# --- Python artifacts ---
+
+def _parse_core_metadata(text: str) -> Tuple[str, str, List[str]]:
+    """Name, version and Requires-Dist of a METADATA/PKG-INFO file."""
+    headers = email.parser.HeaderParser().parsestr(text)
+    name, version = headers.get('Name'), headers.get('Version')
+    if not name or not version:
+        raise ValueError('Metadata lacks Name or Version')
+    return name, version, list(headers.get_all('Requires-Dist') or [])
+
+
+def _parse_requires_txt(text: str) -> List[str]:
+    """Requirements of an egg-info requires.txt, skipping extras sections."""
+    requires = []
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith('['):
+            # Sections are extras or environment markers; only the base set is kept
+            break
+        if line and not line.startswith('#'):
+            requires.append(line)
+    return requires
+
+
+def _read_wheel(path: str) -> PackageRecord:
+    with zipfile.ZipFile(path) as archive:
+        for member in archive.namelist():
+            parts = member.split('/')
+            if len(parts) == 2 and parts[0].endswith('.dist-info') and parts[1] == 'METADATA':
+                text = archive.read(member).decode('utf-8', 'replace')
+                name, version, requires = _parse_core_metadata(text)
+                return PackageRecord('pypi', normalize_name(name), version, requires, path)
+    raise ValueError('Wheel has no .dist-info/METADATA')
+
+
+def _read_sdist(path: str) -> PackageRecord:
+    pkg_info = None
+    requires_txt = None
+
+    if path.endswith('.zip'):
+        with zipfile.ZipFile(path) as archive:
+            for member in archive.namelist():
+                depth = member.count('/')
+                if depth == 1 and member.endswith('/PKG-INFO'):
+                    pkg_info = archive.read(member).decode('utf-8', 'replace')
+                elif depth == 2 and member.endswith('.egg-info/requires.txt'):
+                    requires_txt = archive.read(member).decode('utf-8', 'replace')
+    else:
+        # Streams through the archive; members are not extracted
+        with tarfile.open(path, 'r:*') as archive:
+            for member in archive:
+                depth = member.name.count('/')
+                if depth == 1 and member.name.endswith('/PKG-INFO'):
+                    pkg_info = archive.extractfile(member).read().decode('utf-8', 'replace')
+                elif depth == 2 and member.name.endswith('.egg-info/requires.txt'):
+                    requires_txt = archive.extractfile(member).read().decode('utf-8', 'replace')
+                if pkg_info is not None and requires_txt is not None:
+                    break
+
+    if pkg_info is None:
+        raise ValueError('Sdist has no PKG-INFO')
+    name, version, requires = _parse_core_metadata(pkg_info)
+    if not requires and requires_txt is not None:
+        # Older sdists only list requirements in the egg-info
+        requires = _parse_requires_txt(requires_txt)
+    elif not requires:
+        requires = None
+    return PackageRecord('pypi', normalize_name(name), version, requires, path)
+
+
+# --- npm and Cargo artifacts ---
+
+def _read_npm_tarball(path: str) -> PackageRecord:
+    with tarfile.open(path, 'r:gz') as archive:
+        for member in archive:
+            # The top directory is usually 'package/' but not always
+            if member.name.count('/') == 1 and member.name.endswith('/package.json'):
+                manifest = json.load(archive.extractfile(member))
+                break
+        else:
+            raise ValueError('Tarball has no package.json')
+
+    requires = [
+        f'{name}@{spec}'
+        for name, spec in sorted((manifest.get('dependencies') or {}).items())
+    ]
+    return PackageRecord('npm', normalize_package_name('npm', manifest['name']), manifest['version'], requires, path)
+
+
+def read_crate_manifest(path: str) -> Dict:
+    """
+    Read the Cargo.toml of a crate.
+
+    Args:
+        path (str): ``.crate`` file
+
+    Returns:
+        Dict: The parsed manifest
+
+    Raises:
+        ValueError: If the crate has no Cargo.toml
+        OSError, tarfile.TarError: If it cannot be read
+    """
+    import toml
+
+    with tarfile.open(path, 'r:gz') as archive:
+        for member in archive:
+            if member.name.count('/') == 1 and member.name.endswith('/Cargo.toml'):
+                return toml.loads(archive.extractfile(member).read().decode('utf-8'))
+    raise ValueError('Crate has no Cargo.toml')
+
+
+def _read_crate(path: str) -> PackageRecord:
+    manifest = read_crate_manifest(path)
+    package = manifest['package']
+    requires = []
+    for name, spec in sorted((manifest.get('dependencies') or {}).items()):
+        if isinstance(spec, str):
+            requires.append(f"{normalize_package_name('crates', name)}@{spec}")
+        elif isinstance(spec, dict) and 'version' in spec and not spec.get('optional'):
+            # 'package' renames a dependency; optional ones are features
+            real_name = spec.get('package', name)
+            requires.append(f"{normalize_package_name('crates', real_name)}@{spec['version']}")
+    return PackageRecord('crates', normalize_package_name('crates', package['name']), str(package['version']), requires, path)
+
+
+def read_artifact(path: str) -> Optional[PackageRecord]:
+    """
+    Read the metadata of a local artifact.
+
+    Args:
+        path (str): Wheel, sdist, npm tarball or crate
+
+    Returns:
+        Optional[PackageRecord]: Its record, or None if the file is not an artifact
+
+    Raises:
+        ValueError: If the artifact lacks metadata
+        OSError, zipfile.BadZipFile, tarfile.TarError: If it cannot be read
+    """
+    if path.endswith('.whl'):
+        return _read_wheel(path)
+    if path.endswith('.crate'):
+        return _read_crate(path)
+    if path.endswith('.tgz'):
+        # npm tarballs; an sdist with this suffix has PKG-INFO instead
+        try:
+            return _read_npm_tarball(path)
+        except ValueError:
+            return _read_sdist(path)
+    if path.endswith(_SDIST_SUFFIXES):
+        return _read_sdist(path)
+    return None
+
+
+def _iter_files(directory: str) -> Iterator[str]:
+    with os.scandir(directory) as entries:
+        for entry in sorted(entries, key=lambda entry: entry.name):
+            if entry.is_dir(follow_symlinks=False):
+                yield from _iter_files(entry.path)
+            elif entry.is_file():
+                yield entry.path
+
+
+def iter_archives(directory: str, errors: Optional[List[Dict[str, str]]] = None) -> Iterator[PackageRecord]:
+    """
+    Read the metadata of every artifact under a directory.
+
+    Args:
+        directory (str): Directory of wheels, sdists, npm tarballs and crates
+        errors (Optional[List[Dict[str, str]]]): Receives a {'source', 'message'}
+            record for each unreadable artifact
+
+    Yields:
+        PackageRecord: One record per artifact
+    """
+    for path in _iter_files(directory):
+        try:
+            record = read_artifact(path)
+        except (OSError, ValueError, KeyError, TypeError, zipfile.BadZipFile, tarfile.TarError) as e:
+            if errors is not None:
+                errors.append({'source': path, 'message': str(e) or type(e).__name__})
+            continue
+        if record is not None:
+            yield record
+
+
+# --- Simple index dumps ---
+
+_WHEEL_NAME_RE = re.compile(r'^(?P<name>[^-]+)-(?P<version>[^-]+)(?:-\d[^-]*)?-[^-]+-[^-]+-[^-]+\.whl$')
+_SDIST_NAME_RE = re.compile(r'^(?P<name>.+)-(?P<version>[0-9][^-]*)\.(?:tar\.gz|tar\.bz2|tgz|zip)$')
+
+
+def split_python_filename(filename: str) -> Optional[Tuple[str, str]]:
+    """Name and version encoded in a wheel or sdist filename."""
+    match = _WHEEL_NAME_RE.match(filename) or _SDIST_NAME_RE.match(filename)
+    if match is None:
+        return None
+    return normalize_name(match.group('name')), match.group('version')
+
+
+class _AnchorParser(html.parser.HTMLParser):
+    """Collects hrefs of a PEP 503 project page."""
+
+    def __init__(self):
+        super().__init__()
+        self.hrefs: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a':
+            href = dict(attrs).get('href')
+            if href:
+                self.hrefs.append(href)
+
+
+def _page_files(page: str) -> List[str]:
+    """File URLs listed on a project page, without fragments."""
+    with open(page, 'r', encoding='utf-8') as f:
+        if page.endswith('.html'):
+            parser = _AnchorParser()
+            parser.feed(f.read())
+            urls = parser.hrefs
+        else:
+            urls = [file['url'] for file in json.load(f).get('files', ())]
+    return [url.split('#', 1)[0] for url in urls]
+
+
+def _simple_index_requires(directory: str, url: str) -> Optional[List[str]]:
+    """Requirements of a listed file from its PEP 658 metadata or a local wheel."""
+    if '://' in url:
+        return None
+    path = os.path.normpath(os.path.join(directory, url))
+    if os.path.isfile(path + '.metadata'):
+        with open(path + '.metadata', 'r', encoding='utf-8', errors='replace') as f:
+            return _parse_core_metadata(f.read())[2]
+    if path.endswith('.whl') and os.path.isfile(path):
+        return _read_wheel(path).requires
+    return None
+
+
+def iter_simple_index(root: str, errors: Optional[List[Dict[str, str]]] = None) -> Iterator[PackageRecord]:
+    """
+    Read the versions listed in a dump of a PyPI simple index.
+
+    Requirements come from PEP 658 '.metadata' files or wheels next to the
+    listed files, when the dump includes them.
+
+    Args:
+        root (str): Directory holding one subdirectory per project
+        errors (Optional[List[Dict[str, str]]]): Receives a {'source', 'message'}
+            record for each unreadable page or metadata file
+
+    Yields:
+        PackageRecord: One record per listed version
+    """
+    for path in _iter_files(root):
+        if os.path.basename(path) not in _SIMPLE_INDEX_PAGES:
+            continue
+
+        directory = os.path.dirname(path)
+        try:
+            versions: Dict[Tuple[str, str], Optional[List[str]]] = {}
+            for url in _page_files(path):
+                parsed = split_python_filename(url.rsplit('/', 1)[-1])
+                if parsed is None:
+                    continue
+                # Any file with metadata describes the version
+                if versions.get(parsed) is None:
+                    versions[parsed] = _simple_index_requires(directory, url)
+        except (OSError, ValueError, KeyError, TypeError, zipfile.BadZipFile) as e:
+            if errors is not None:
+                errors.append({'source': path, 'message': str(e) or type(e).__name__})
+            continue
+
+        for (name, version), requires in versions.items():
+            yield PackageRecord('pypi', name, version, requires, path)
+
+
+class MetadataStore:
+    """
+    SQLite-backed store of package versions and requirements.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Args:
+            db_path (str): Database file; created on first use
+        """
+        self.db_path = db_path
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(os.path.abspath(self.db_path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            if conn.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+                conn.execute('DROP TABLE IF EXISTS packages')
+                conn.execute('DROP TABLE IF EXISTS meta')
+                conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            conn.execute(
+                '''CREATE TABLE IF NOT EXISTS packages (
+                    ecosystem TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    requires TEXT,
+                    source TEXT NOT NULL,
+                    digest TEXT NOT NULL,
+                    PRIMARY KEY (ecosystem, name, version)
+                ) WITHOUT ROWID'''
+            )
+            conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        """Close the database connection."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self) -> 'MetadataStore':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __getstate__(self):
+        # Connections cannot be shared across processes; reopen lazily
+        state = self.__dict__.copy()
+        state['_conn'] = None
+        return state
+
+    # --- Queries ---
+
+    def versions(self, ecosystem: str, name: str) -> List[str]:
+        """
+        List the known versions of a package.
+
+        Args:
+            ecosystem (str): 'pypi', 'npm' or 'crates'
+            name (str): Package name, in any normalization
+
+        Returns:
+            List[str]: Versions in no particular order; empty if unknown
+        """
+        rows = self._connect().execute(
+            'SELECT version FROM packages WHERE ecosystem = ? AND name = ?',
+            (ecosystem, normalize_package_name(ecosystem, name))
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def requires(self, ecosystem: str, name: str, version: str) -> Optional[List[str]]:
+        """
+        Get the requirements of one version of a package.
+
+        Args:
+            ecosystem (str): 'pypi', 'npm' or 'crates'
+            name (str): Package name, in any normalization
+            version (str): Version as returned by ``versions``
+
+        Returns:
+            Optional[List[str]]: Requirements, or None if the version is
+            unknown or was imported without dependency metadata
+        """
+        row = self._connect().execute(
+            'SELECT requires FROM packages WHERE ecosystem = ? AND name = ? AND version = ?',
+            (ecosystem, normalize_package_name(ecosystem, name), version)
+        ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return json.loads(row[0])
+
+    def count(self, ecosystem: Optional[str] = None) -> int:
+        """Count stored versions, optionally of one ecosystem."""
+        if ecosystem is None:
+            return self._connect().execute('SELECT COUNT(*) FROM packages').fetchone()[0]
+        return self._connect().execute(
+            'SELECT COUNT(*) FROM packages WHERE ecosystem = ?', (ecosystem,)
+        ).fetchone()[0]
+
+    def _snapshot(self) -> int:
+        row = self._connect().execute("SELECT value FROM meta WHERE key = 'snapshot'").fetchone()
+        return int(row[0], 16) if row else _EMPTY_SNAPSHOT
+
+    def snapshot_id(self) -> str:
+        """
+        Identify the current contents of the store.
+
+        The id only depends on the stored records, not on the order they
+        were imported in, so two stores with the same contents share it.
+
+        Returns:
+            str: Hex digest that changes whenever a record is added or changed
+        """
+        return format(self._snapshot(), f'0{_SNAPSHOT_BITS // 4}x')
+
+    # --- Imports ---
+
+    def _upsert(self, conn: sqlite3.Connection, record: PackageRecord, snapshot: int) -> Tuple[bool, int]:
+        row = conn.execute(
+            'SELECT requires, digest FROM packages WHERE ecosystem = ? AND name = ? AND version = ?',
+            (record.ecosystem, record.name, record.version)
+        ).fetchone()
+        if row is not None and record.requires is None and row[0] is not None:
+            # Never lose known requirements to a source without metadata
+            return False, snapshot
+
+        digest = _record_digest(record)
+        if row is not None:
+            old_digest = int(row[1], 16)
+            if old_digest == digest:
+                return False, snapshot
+            snapshot ^= old_digest
+
+        conn.execute(
+            'INSERT OR REPLACE INTO packages (ecosystem, name, version, requires, source, digest) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            (record.ecosystem, record.name, record.version,
+             None if record.requires is None else json.dumps(record.requires, separators=(',', ':')),
+             record.source, format(digest, 'x'))
+        )
+        return True, snapshot ^ digest
+
+    def import_records(self, records: Iterable[PackageRecord], batch_size: int = IMPORT_BATCH_SIZE) -> int:
+        """
+        Add or update records, committing every ``batch_size`` records.
+
+        Args:
+            records (Iterable[PackageRecord]): Records, consumed lazily
+            batch_size (int): Records written per transaction
+
+        Returns:
+            int: Number of records that were new or changed
+
+        Raises:
+            ValueError: If a record has an unknown ecosystem
+        """
+        conn = self._connect()
+        snapshot = self._snapshot()
+        changed = 0
+        pending = 0
+
+        def commit():
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('snapshot', ?)",
+                (format(snapshot, 'x'),)
+            )
+            conn.commit()
+
+        try:
+            for record in records:
+                if record.ecosystem not in ECOSYSTEMS:
+                    raise ValueError(f"Unknown ecosystem: {record.ecosystem!r}")
+                record = record._replace(name=normalize_package_name(record.ecosystem, record.name))
+
+                updated, snapshot = self._upsert(conn, record, snapshot)
+                changed += updated
+                pending += 1
+                if pending >= batch_size:
+                    commit()
+                    pending = 0
+        except BaseException:
+            # Earlier batches stay committed together with their snapshot
+            conn.rollback()
+            raise
+        commit()
+        return changed
+
+    def import_archives(self, directory: str, errors: Optional[List[Dict[str, str]]] = None) -> int:
+        """
+        Import every wheel, sdist, npm tarball and crate under a directory.
+
+        Args:
+            directory (str): Directory to scan recursively
+            errors (Optional[List[Dict[str, str]]]): Receives unreadable artifacts
+
+        Returns:
+            int: Number of records that were new or changed
+        """
+        return self.import_records(iter_archives(directory, errors))
+
+    def import_simple_index(self, root: str, errors: Optional[List[Dict[str, str]]] = None) -> int:
+        """
+        Import the versions listed in a dump of a PyPI simple index.
+
+        Args:
+            root (str): Directory holding one subdirectory per project
+            errors (Optional[List[Dict[str, str]]]): Receives unreadable pages
+
+        Returns:
+            int: Number of records that were new or changed
+        """
+        return self.import_records(iter_simple_index(root, errors))
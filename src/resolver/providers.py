@@ -0,0 +1,151 @@
+"""
+Metadata Providers for Dependency Resolution
+
+The resolver asks a provider which versions of a package exist and what
+each version requires; where that information comes from (the running
+environment, an in-memory index, an offline store) is up to the provider.
+"""
+
+import hashlib
+import json
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional
+
+from distribution_index import DistributionIndex, normalize_distribution_name as normalize_name
+
+
+class MetadataProvider(ABC):
+    """
+    Source of package versions and their dependencies.
+    """
+
+    @abstractmethod
+    def get_versions(self, name: str) -> List[str]:
+        """
+        List the available versions of a package.
+
+        Args:
+            name (str): Normalized package name
+
+        Returns:
+            List[str]: Versions in any order; empty if the package is unknown
+        """
+        pass
+
+    @abstractmethod
+    def get_dependencies(self, name: str, version: str) -> List[str]:
+        """
+        List the requirements of one version of a package.
+
+        Args:
+            name (str): Normalized package name
+            version (str): One of the versions returned by ``get_versions``
+
+        Returns:
+            List[str]: PEP 508 requirement strings (e.g. 'idna>=2.5,<4')
+        """
+        pass
+
+    def snapshot_id(self) -> Optional[str]:
+        """
+        Identify the metadata currently served, for caching resolutions.
+
+        Returns:
+            Optional[str]: Id that changes whenever the metadata does, or
+            None if the provider cannot tell (results are then not cached)
+        """
+        return None
+
+
+class InMemoryMetadataProvider(MetadataProvider):
+    """
+    Provider backed by a mapping of name -> version -> requirements.
+
+    Change the index through ``add`` only, so the snapshot id stays current.
+    """
+
+    def __init__(self, index: Optional[Dict[str, Dict[str, Iterable[str]]]] = None):
+        """
+        Args:
+            index (Optional[Dict[str, Dict[str, Iterable[str]]]]): Known packages
+        """
+        self.index: Dict[str, Dict[str, List[str]]] = {}
+        # Digest of the index, computed on first use after a change
+        self._snapshot_id: Optional[str] = None
+        for name, versions in (index or {}).items():
+            for version, requirements in versions.items():
+                self.add(name, version, requirements)
+
+    def add(self, name: str, version: str, requirements: Iterable[str] = ()):
+        """Register one version of a package and its requirements."""
+        self.index.setdefault(normalize_name(name), {})[version] = list(requirements)
+        self._snapshot_id = None
+
+    def get_versions(self, name: str) -> List[str]:
+        return list(self.index.get(name, ()))
+
+    def get_dependencies(self, name: str, version: str) -> List[str]:
+        return self.index.get(name, {}).get(version, [])
+
+    def snapshot_id(self) -> Optional[str]:
+        if self._snapshot_id is None:
+            encoded = json.dumps(self.index, sort_keys=True, separators=(',', ':'))
+            self._snapshot_id = hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+        return self._snapshot_id
+
+
+class InstalledMetadataProvider(MetadataProvider):
+    """
+    Provider describing the distributions installed in a Python environment.
+
+    Only the installed version of each package is available, so resolving
+    against it checks whether the environment satisfies the requirements.
+    """
+
+    def __init__(self, environment: Optional[str] = None):
+        """
+        Args:
+            environment (Optional[str]): Virtual environment root or Python
+                executable; None describes the running interpreter
+        """
+        self.environment = environment
+
+    def get_versions(self, name: str) -> List[str]:
+        dist = DistributionIndex.for_environment(self.environment).get(name)
+        return [dist.version] if dist is not None else []
+
+    def get_dependencies(self, name: str, version: str) -> List[str]:
+        dist = DistributionIndex.for_environment(self.environment).get(name)
+        if dist is None or dist.version != version:
+            return []
+        return list(dist.requires)
+
+    def snapshot_id(self) -> Optional[str]:
+        return DistributionIndex.for_environment(self.environment).snapshot_id()
+
+
+class OfflineMetadataProvider(MetadataProvider):
+    """
+    Provider backed by a local ``MetadataStore``; never touches the network.
+
+    Versions imported without dependency metadata are reported as having
+    no requirements.
+    """
+
+    def __init__(self, store, ecosystem: str = 'pypi'):
+        """
+        Args:
+            store (MetadataStore): Store to query
+            ecosystem (str): Ecosystem whose packages are resolved
+        """
+        self.store = store
+        self.ecosystem = ecosystem
+
+    def get_versions(self, name: str) -> List[str]:
+        return self.store.versions(self.ecosystem, name)
+
+    def get_dependencies(self, name: str, version: str) -> List[str]:
+        return self.store.requires(self.ecosystem, name, version) or []
+
+    def snapshot_id(self) -> Optional[str]:
+        return f'{self.ecosystem}:{self.store.snapshot_id()}'
@@ -0,0 +1,170 @@
+"""
+Resolution Result Cache
+
+Stores resolution reports in a SQLite database under the sha256 of their
+inputs: the normalized requirement set and the snapshot id of the
+metadata they were resolved against. Resolving the same requirements
+against unchanged metadata is then a single lookup. Entries expire after
+``max_age`` seconds and the least recently used ones are evicted once the
+cache grows beyond ``max_size`` bytes.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+from resolver.solver import normalize_requirement
+
+# Bump when the table layout or report format changes
+SCHEMA_VERSION = 1
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.polydepend', 'cache')
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+DEFAULT_MAX_AGE = 7 * 24 * 3600
+
+
+def resolution_key(requirements: Iterable[str], snapshot_id: str, context: Sequence[str] = ()) -> str:
+    """
+    Content address of a resolution.
+
+    Args:
+        requirements (Iterable[str]): Root requirements, in any order and spelling
+        snapshot_id (str): Id of the metadata resolved against
+        context (Sequence[str]): Anything else the result depends on
+
+    Returns:
+        str: sha256 hex digest; equivalent inputs give the same key
+    """
+    normalized = sorted({normalize_requirement(requirement) for requirement in requirements})
+    encoded = json.dumps([normalized, snapshot_id, list(context)], separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class ResolutionCache:
+    """
+    On-disk, content-addressed cache of resolution reports.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        max_size: int = DEFAULT_MAX_SIZE,
+        max_age: float = DEFAULT_MAX_AGE
+    ):
+        """
+        Args:
+            cache_dir (str): Directory holding the cache database
+            max_size (int): Maximum total size of cached reports, in bytes
+            max_age (float): Seconds after which an entry expires
+        """
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.max_age = max_age
+        self.db_path = os.path.join(cache_dir, 'resolutions.sqlite3')
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            if conn.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+                conn.execute('DROP TABLE IF EXISTS resolutions')
+                conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            conn.execute(
+                '''CREATE TABLE IF NOT EXISTS resolutions (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    nbytes INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )'''
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS resolutions_last_used ON resolutions (last_used)')
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def __getstate__(self):
+        # Connections cannot be shared across processes; reopen lazily
+        state = self.__dict__.copy()
+        state['_conn'] = None
+        return state
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a report.
+
+        Args:
+            key (str): Key from ``resolution_key``
+
+        Returns:
+            Optional[Dict[str, Any]]: The report, or None if missing or expired
+        """
+        conn = self._connect()
+        row = conn.execute('SELECT value, created FROM resolutions WHERE key = ?', (key,)).fetchone()
+        now = time.time()
+        if row is None or now - row[1] > self.max_age:
+            self.misses += 1
+            return None
+
+        with conn:
+            conn.execute('UPDATE resolutions SET last_used = ? WHERE key = ?', (now, key))
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, report: Dict[str, Any]):
+        """
+        Store a report and evict entries beyond the age and size limits.
+
+        Args:
+            key (str): Key from ``resolution_key``
+            report (Dict[str, Any]): JSON-serializable resolution report
+        """
+        encoded = json.dumps(report, separators=(',', ':'))
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO resolutions (key, value, nbytes, created, last_used) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (key, encoded, len(encoded), now, now)
+            )
+        self.evict()
+
+    def evict(self):
+        """Drop expired entries, then least recently used ones until under ``max_size``."""
+        conn = self._connect()
+        with conn:
+            conn.execute('DELETE FROM resolutions WHERE created < ?', (time.time() - self.max_age,))
+
+        total = conn.execute('SELECT COALESCE(SUM(nbytes), 0) FROM resolutions').fetchone()[0]
+        if total <= self.max_size:
+            return
+
+        excess = total - self.max_size
+        doomed = []
+        for key, nbytes in conn.execute('SELECT key, nbytes FROM resolutions ORDER BY last_used'):
+            doomed.append((key,))
+            excess -= nbytes
+            if excess <= 0:
+                break
+
+        with conn:
+            conn.executemany('DELETE FROM resolutions WHERE key = ?', doomed)
+
+    def clear(self):
+        """Remove every cached report."""
+        conn = self._connect()
+        with conn:
+            conn.execute('DELETE FROM resolutions')
+
+    def close(self):
+        """Close the database."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
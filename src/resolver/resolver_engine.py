@@ -1,10 +1,55 @@
+import platform
 import re
-from typing import List, Dict, Any
-import pkg_resources
+import sys
+from typing import List, Dict, Any, Optional, Tuple
+
+from distribution_index import DistributionIndex
+from resolver.providers import InstalledMetadataProvider, MetadataProvider, normalize_name
+from resolver.resolution_cache import ResolutionCache, resolution_key
+from resolver.solver import (
+    DEFAULT_MAX_ROUNDS,
+    BacktrackingSolver,
+    Resolution,
+    ResolutionImpossible,
+    ResolutionTooDeep,
+    parse_requirement
+)
+from version_keys import loose_key, pep440_key
+from version_ranges import ANY
+
+# Version of an exact '==' or '===' clause ('requests>=2,==2.31.0' -> '2.31.0')
+_EXACT_PIN_RE = re.compile(r'(?<![<>!~=])===?\s*([^,;\s]+)')
 
 class DependencyResolver:
     """Advanced dependency resolution and conflict management."""
     
+    def __init__(
+        self, 
+        provider: Optional[MetadataProvider] = None, 
+        max_rounds: int = DEFAULT_MAX_ROUNDS,
+        environment: Optional[str] = None,
+        cache: Optional[ResolutionCache] = None
+    ):
+        """
+        Args:
+            provider (Optional[MetadataProvider]): Source of package versions and
+                dependencies; defaults to the distributions installed in
+                ``environment``, with requirements on packages that are not
+                installed resolved to the version they pin (see ``resolve``)
+            max_rounds (int): Search rounds allowed before giving up
+            environment (Optional[str]): Virtual environment checked by
+                ``check_compatibility``; None is the running interpreter
+            cache (Optional[ResolutionCache]): Stores reports of
+                ``resolve_dependencies`` for unchanged inputs
+        """
+        self.provider = provider or InstalledMetadataProvider(environment)
+        # Installed packages can't answer for the rest of a requirements file
+        self.pin_fallback = provider is None
+        self.max_rounds = max_rounds
+        self.environment = environment
+        self.cache = cache
+        self.last_stats: Dict[str, Any] = {}
+    
     @staticmethod
     def parse_version(version_str: str) -> tuple:
         """
@@ -14,60 +59,164 @@ class DependencyResolver:
             version_str (str): Version string
         
         Returns:
-            Tuple of version components for comparison
+            Tuple of version components for comparison; keys of any two
+            versions compare without error ('1.0rc1' < '1.0' < '1.0.post1')
         """
-        # Remove any leading 'v' or 'V'
-        version_str = version_str.lstrip('vV')
+        return loose_key(version_str)
+    
+    @staticmethod
+    def pinned_version(requirement: str) -> str:
+        """
+        Get the version a requirement pins exactly, or '*' if it pins none.
         
-        # Split version into components, handling pre-release tags
-        components = re.split(r'[.-]', version_str)
+        Args:
+            requirement (str): Requirement (e.g. 'requests==2.31.0')
+        
+        Returns:
+            Version of its '==' or '===' clause (e.g. '2.31.0'); '*' for
+            ranges, exclusions and wildcard pins such as '==2.*'
+        """
+        spec = requirement.split(';', 1)[0]
+        pins = [version for version in _EXACT_PIN_RE.findall(spec) if '*' not in version]
+        return pins[-1] if pins else '*'
+    
+    @staticmethod
+    def _requirement_name(requirement: str) -> Optional[str]:
+        """Normalized name of a requirement; None if unparseable or excluded by its marker."""
+        try:
+            parsed = parse_requirement(requirement)
+        except ValueError:
+            return None
+        return parsed[0] if parsed is not None else None
+    
+    def _satisfiable(self, requirement: str) -> bool:
+        """Whether the provider has a version of the package the requirement allows; unparseable ones are."""
+        try:
+            parsed = parse_requirement(requirement)
+        except ValueError:
+            return True
+        if parsed is None:
+            return True
+        name, version_range = parsed
+        for version in self.provider.get_versions(name):
+            try:
+                if version_range.contains(pep440_key(version)):
+                    return True
+            except ValueError:
+                continue
+        return False
+    
+    def _pinned_resolution(self, name: str, requirements: List[str]) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Resolve a package from its requirements alone.
+        
+        Returns:
+            (version, conflict): the highest exact pin all requirements allow,
+            '*' if none is pinned, or None with a message if they conflict
+        """
+        allowed = ANY
+        for requirement in requirements:
+            allowed = allowed.intersect(parse_requirement(requirement)[1])
+        conflict = f"Conflicting requirements on {name}: {', '.join(requirements)}"
+        if allowed.is_empty():
+            return None, conflict
         
-        # Convert to integers where possible
-        parsed_components = []
-        for comp in components:
+        pins = {self.pinned_version(requirement) for requirement in requirements} - {'*'}
+        if not pins:
+            return '*', None
+        for pin in sorted(pins, key=loose_key, reverse=True):
             try:
-                parsed_components.append(int(comp))
+                if allowed.contains(pep440_key(pin)):
+                    return pin, None
             except ValueError:
-                # Handle pre-release tags like alpha, beta
-                parsed_components.append(comp)
+                continue
+        return None, conflict
+    
+    def resolve(self, dependencies: List[str]) -> Resolution:
+        """
+        Resolve requirements, including transitive ones, to one version each.
+        
+        With ``pin_fallback`` (the default provider), root requirements the
+        installed packages can't satisfy are not searched: those no installed
+        version matches (or whose package isn't installed), and those on the
+        package a search fails on
+        (all remaining roots if it fails on a transitive package). They
+        resolve to the version they pin exactly, '*' if they pin none; the
+        packages are listed in the stats under 'pinned'. Requirements that
+        contradict each other leave their package unresolved. Both kinds of
+        problem are described in the stats under 'conflicts'.
+        
+        Args:
+            dependencies (List[str]): PEP 508 requirements (e.g. 'requests>=2.25')
+        
+        Returns:
+            Resolution: Chosen versions and search statistics
+        
+        Raises:
+            ResolutionImpossible: If the requirements cannot be satisfied
+                (without ``pin_fallback``)
+            ResolutionTooDeep: If the search exceeds ``max_rounds``
+        """
+        pinned: Dict[str, List[str]] = {}
+        conflicts: List[str] = []
+        if self.pin_fallback:
+            searched = []
+            for dep in dependencies:
+                if self._satisfiable(dep):
+                    searched.append(dep)
+                    continue
+                name = self._requirement_name(dep)
+                pinned.setdefault(name, []).append(dep)
+                installed = self.provider.get_versions(name)
+                if installed:
+                    conflicts.append(
+                        f"{dep} doesn't match installed {name} {', '.join(installed)}; "
+                        f"resolved from the requirements instead"
+                    )
+            dependencies = searched
         
-        return tuple(parsed_components)
+        solver = BacktrackingSolver(self.provider, self.max_rounds)
+        while True:
+            try:
+                resolution = solver.solve(dependencies)
+                break
+            except ResolutionImpossible as e:
+                names = {dep: self._requirement_name(dep) for dep in dependencies}
+                failing = [dep for dep in dependencies if names[dep] is not None and names[dep] == e.package]
+                if not failing:
+                    failing = [dep for dep in dependencies if names[dep] is not None]
+                if not self.pin_fallback or not failing:
+                    raise
+                conflicts.append(f"{e} among the installed packages; resolved from the requirements instead")
+                for dep in failing:
+                    pinned.setdefault(names[dep], []).append(dep)
+                dependencies = [dep for dep in dependencies if dep not in failing]
+        
+        for name, requirements in pinned.items():
+            version, conflict = self._pinned_resolution(name, requirements)
+            if conflict is not None:
+                conflicts.append(conflict)
+            # An exact pin of a root wins over the installed version
+            if version is not None and (version != '*' or name not in resolution.versions):
+                resolution.versions[name] = version
+        if pinned:
+            resolution.stats['pinned'] = sorted(pinned)
+        if conflicts:
+            resolution.stats['conflicts'] = conflicts
+        self.last_stats = resolution.stats
+        return resolution
     
     def resolve_version_conflicts(self, dependencies: List[str]) -> Dict[str, str]:
         """
-        Resolve version conflicts using smart version comparison.
+        Resolve version conflicts by finding versions satisfying every specifier.
         
         Args:
             dependencies (List[str]): List of dependencies with versions
         
         Returns:
-            Dictionary of resolved dependencies
-        """
-        # Group dependencies by package name
-        dependency_groups = {}
-        for dep in dependencies:
-            # Split into package name and version
-            match = re.match(r'([a-zA-Z0-9-_]+)[=><]*(.*)', dep)
-            if match:
-                pkg_name, version = match.groups()
-                if not version:
-                    version = '*'  # No specific version specified
-                
-                if pkg_name not in dependency_groups:
-                    dependency_groups[pkg_name] = []
-                dependency_groups[pkg_name].append(version)
-        
-        # Resolve conflicts
-        resolved_dependencies = {}
-        for pkg_name, versions in dependency_groups.items():
-            if len(versions) == 1:
-                resolved_dependencies[pkg_name] = versions[0]
-            else:
-                # Compare versions and select the highest
-                sorted_versions = sorted(versions, key=self.parse_version, reverse=True)
-                resolved_dependencies[pkg_name] = sorted_versions[0]
-        
-        return resolved_dependencies
+            Dictionary of resolved dependencies, including transitive ones
+        """
+        return self.resolve(dependencies).versions
     
     def check_compatibility(self, dependencies: Dict[str, str]) -> List[str]:
         """
@@ -79,45 +228,102 @@ class DependencyResolver:
         Returns:
             List of potential compatibility issues
         """
+        index = DistributionIndex.for_environment(self.environment)
+        resolved = {normalize_name(name): version for name, version in dependencies.items()}
+        
         compatibility_warnings = []
         
-        for pkg_name, version in dependencies.items():
-            try:
-                # Check if package is available
-                dist = pkg_resources.get_distribution(pkg_name)
+        for pkg_name in dependencies:
+            # Packages that are not installed can't get a deep compatibility check
+            dist = index.get(pkg_name)
+            if dist is None:
+                continue
+            
+            # Check for potential conflicts with installed packages
+            for requirement in dist.requires:
+                try:
+                    parsed = parse_requirement(requirement)
+                except ValueError:
+                    continue
+                if parsed is None or parsed[0] not in resolved:
+                    continue
                 
-                # Check for potential conflicts with installed packages
-                for req in dist.requires():
-                    req_name = req.project_name
-                    if req_name in dependencies:
-                        # Check if the required version matches
-                        required_version = req.specifier
-                        resolved_version = dependencies[req_name]
-                        
-                        if not pkg_resources.Requirement.parse(f"{req_name}{required_version}").specifier.contains(resolved_version):
-                            compatibility_warnings.append(
-                                f"Potential conflict: {pkg_name} requires {req_name} {required_version}, but resolved version is {resolved_version}"
-                            )
-            except pkg_resources.DistributionNotFound:
-                # Package not installed, can't perform deep compatibility check
-                pass
+                # Check if the required version matches
+                req_name, version_range = parsed
+                resolved_version = resolved[req_name]
+                try:
+                    matches = version_range.contains(pep440_key(resolved_version))
+                except ValueError:
+                    continue
+                
+                if not matches:
+                    compatibility_warnings.append(
+                        f"Potential conflict: {pkg_name} requires {requirement.split(';')[0].strip()}, but resolved version is {resolved_version}"
+                    )
         
         return compatibility_warnings
     
+    def _cache_key(self, dependencies: List[str]) -> Optional[str]:
+        """
+        Key of a resolution report, or None if the provider's metadata can't be identified.
+        """
+        snapshot_id = self.provider.snapshot_id()
+        if snapshot_id is None:
+            return None
+        context = [
+            # Environment markers are evaluated for this interpreter
+            platform.python_version(),
+            sys.platform,
+            platform.machine(),
+            str(self.max_rounds),
+            # Compatibility warnings depend on what is installed
+            DistributionIndex.for_environment(self.environment).snapshot_id(),
+        ]
+        return resolution_key(dependencies, snapshot_id, context)
+    
     def resolve_dependencies(self, dependencies: List[str]) -> Dict[str, Any]:
         """
         Comprehensive dependency resolution.
         
+        With a cache, the report for requirements already resolved against
+        the same metadata is returned without resolving; its
+        'resolution_stats' then have 'cache_hit' set.
+        
         Args:
             dependencies (List[str]): List of dependencies
         
         Returns:
             Comprehensive resolution report
         """
-        resolved_versions = self.resolve_version_conflicts(dependencies)
-        compatibility_warnings = self.check_compatibility(resolved_versions)
+        key = self._cache_key(dependencies) if self.cache is not None else None
+        if key is not None:
+            report = self.cache.get(key)
+            if report is not None:
+                report['resolution_stats']['cache_hit'] = True
+                self.last_stats = report['resolution_stats']
+                return report
+        
+        report = self._resolve_report(dependencies)
+        if key is not None:
+            self.cache.put(key, report)
+        return report
+    
+    def _resolve_report(self, dependencies: List[str]) -> Dict[str, Any]:
+        """Resolve and check compatibility, bypassing the cache."""
+        try:
+            resolution = self.resolve(dependencies)
+        except (ResolutionImpossible, ResolutionTooDeep) as e:
+            return {
+                'resolved_dependencies': {},
+                'compatibility_warnings': [str(e)],
+                'resolution_stats': e.stats
+            }
+        
+        resolved_versions = resolution.versions
+        compatibility_warnings = resolution.stats.get('conflicts', []) + self.check_compatibility(resolved_versions)
         
         return {
             'resolved_dependencies': resolved_versions,
-            'compatibility_warnings': compatibility_warnings
+            'compatibility_warnings': compatibility_warnings,
+            'resolution_stats': resolution.stats
         }
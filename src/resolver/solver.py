@@ -0,0 +1,421 @@
+"""
+Backtracking Dependency Solver
+
+Picks one version per package so that every requirement, direct or
+transitive, is satisfied. The search is conflict-driven: when a package
+runs out of candidate versions, the decisions responsible are recorded as
+a nogood (a combination that can never be part of a solution) and the
+search jumps straight back to the most recent of them, instead of
+retrying every decision in between. Learned nogoods keep the solver from
+re-exploring the same dead branches, so real-world dependency sets
+resolve in a few rounds instead of an exponential search.
+"""
+
+import re
+import time
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from resolver.providers import MetadataProvider, normalize_name
+from version_keys import pep440_is_prerelease, pep440_key
+from version_ranges import ANY, VersionRange, parse_range
+
+# Upper bound on search rounds before giving up
+DEFAULT_MAX_ROUNDS = 100000
+
+_REQUIREMENT_RE = re.compile(
+    r'^\s*(?P<name>[A-Za-z0-9](?:[A-Za-z0-9._-]*[A-Za-z0-9])?)\s*'
+    r'(?:\[(?P<extras>[^\]]*)\])?\s*'
+    r'\(?(?P<spec>[^;@()]*?)\)?\s*'
+    r'(?:;\s*(?P<marker>.*?))?\s*$'
+)
+
+Decision = Tuple[str, str]
+
+
+class ResolutionImpossible(ValueError):
+    """
+    Raised when no combination of versions satisfies the requirements.
+    """
+
+    def __init__(self, message: str, stats: Dict[str, Any], package: Optional[str] = None):
+        super().__init__(message)
+        self.stats = stats
+        # Normalized name of the package no version could be found for
+        self.package = package
+
+
+class ResolutionTooDeep(RuntimeError):
+    """
+    Raised when the search exceeds its round limit.
+    """
+
+    def __init__(self, message: str, stats: Dict[str, Any]):
+        super().__init__(message)
+        self.stats = stats
+
+
+class Resolution:
+    """
+    Result of a successful resolution.
+    """
+
+    __slots__ = ('versions', 'stats')
+
+    def __init__(self, versions: Dict[str, str], stats: Dict[str, Any]):
+        """
+        Args:
+            versions (Dict[str, str]): Chosen version per normalized package name
+            stats (Dict[str, Any]): Search statistics and timings
+        """
+        self.versions = versions
+        self.stats = stats
+
+
+@lru_cache(maxsize=1024)
+def _marker_applies(marker: str) -> bool:
+    # Evaluated for the running interpreter with no extras requested
+    from packaging.markers import InvalidMarker, Marker
+
+    try:
+        return Marker(marker).evaluate({'extra': ''})
+    except InvalidMarker:
+        return True
+
+
+@lru_cache(maxsize=8192)
+def parse_requirement(requirement: str) -> Optional[Tuple[str, VersionRange]]:
+    """
+    Parse a PEP 508 requirement string.
+
+    Extras are accepted but not expanded; direct URL references are not
+    supported.
+
+    Args:
+        requirement (str): Requirement (e.g. 'requests[socks]>=2.25; python_version>"3"')
+
+    Returns:
+        Optional[Tuple[str, VersionRange]]: Normalized name and allowed versions,
+        or None if the environment marker excludes the requirement
+
+    Raises:
+        ValueError: If the requirement cannot be parsed
+    """
+    match = _REQUIREMENT_RE.match(requirement)
+    if match is None:
+        raise ValueError(f"Unsupported requirement: {requirement!r}")
+
+    marker = match.group('marker')
+    if marker and not _marker_applies(marker):
+        return None
+
+    spec = match.group('spec').strip()
+    version_range = parse_range('pep440', spec) if spec else ANY
+    return normalize_name(match.group('name')), version_range
+
+
+def normalize_requirement(requirement: str) -> str:
+    """
+    Spell a requirement canonically, so equivalent spellings compare equal.
+
+    Names are normalized, whitespace removed and extras and specifier
+    clauses sorted; 'Foo_Bar >= 1.0, <2' becomes 'foo-bar<2,>=1.0'.
+
+    Args:
+        requirement (str): PEP 508 requirement
+
+    Returns:
+        str: Canonical spelling; unparseable requirements are only stripped
+    """
+    match = _REQUIREMENT_RE.match(requirement)
+    if match is None:
+        return requirement.strip()
+
+    normalized = normalize_name(match.group('name'))
+    extras = match.group('extras')
+    if extras and extras.strip():
+        normalized += '[' + ','.join(sorted(normalize_name(extra) for extra in extras.split(','))) + ']'
+    spec = ''.join(match.group('spec').split())
+    if spec:
+        normalized += ','.join(sorted(clause for clause in spec.split(',') if clause))
+    marker = match.group('marker')
+    if marker:
+        normalized += '; ' + ' '.join(marker.split())
+    return normalized
+
+
+class _Search:
+    """
+    State of one resolution.
+    """
+
+    def __init__(self, provider: MetadataProvider, max_rounds: int):
+        self.provider = provider
+        self.max_rounds = max_rounds
+
+        # name -> [(allowed range, decision that imposed it or None for the root)]
+        self.constraints: Dict[str, List[Tuple[VersionRange, Optional[Decision]]]] = {}
+        self.decided: Dict[str, str] = {}
+        # One frame per decision: (name, version, names it added constraints to)
+        self.frames: List[Tuple[str, str, List[str]]] = []
+        self.depth: Dict[str, int] = {}
+        self.nogoods: Dict[Decision, List[FrozenSet[Decision]]] = {}
+
+        self._versions: Dict[str, List[Tuple[tuple, str]]] = {}
+        self._dependencies: Dict[Decision, Optional[List[Tuple[str, VersionRange]]]] = {}
+
+        self.stats = {
+            'rounds': 0,
+            'decisions': 0,
+            'backjumps': 0,
+            'nogoods': 0,
+            'metadata_calls': 0,
+            'metadata_seconds': 0.0,
+            'elapsed_seconds': 0.0,
+        }
+
+    # --- Provider access (memoized) ---
+
+    def versions(self, name: str) -> List[Tuple[tuple, str]]:
+        """Versions of a package as (key, version), preferred first."""
+        versions = self._versions.get(name)
+        if versions is None:
+            start = time.perf_counter()
+            raw_versions = self.provider.get_versions(name)
+            self.stats['metadata_calls'] += 1
+            self.stats['metadata_seconds'] += time.perf_counter() - start
+
+            keyed = []
+            for version in raw_versions:
+                try:
+                    keyed.append((pep440_key(version), version))
+                except ValueError:
+                    continue
+            # Newest final releases first; pre-releases only as a last resort
+            keyed.sort(key=lambda item: (not pep440_is_prerelease(item[0]), item[0]), reverse=True)
+            versions = self._versions[name] = keyed
+        return versions
+
+    def dependencies(self, name: str, version: str) -> Optional[List[Tuple[str, VersionRange]]]:
+        """Parsed requirements of a version, or None if its metadata is unusable."""
+        decision = (name, version)
+        if decision not in self._dependencies:
+            start = time.perf_counter()
+            requirements = self.provider.get_dependencies(name, version)
+            self.stats['metadata_calls'] += 1
+            self.stats['metadata_seconds'] += time.perf_counter() - start
+
+            parsed = []
+            try:
+                for requirement in requirements:
+                    dependency = parse_requirement(requirement)
+                    if dependency is not None and dependency[0] != name:
+                        parsed.append(dependency)
+            except ValueError:
+                parsed = None
+            self._dependencies[decision] = parsed
+        return self._dependencies[decision]
+
+    # --- Constraint bookkeeping ---
+
+    def allowed(self, name: str) -> VersionRange:
+        allowed = ANY
+        for version_range, _ in self.constraints.get(name, ()):
+            allowed = allowed.intersect(version_range)
+        return allowed
+
+    def excluded_by(self, decision: Decision) -> Optional[FrozenSet[Decision]]:
+        """A learned nogood ruling out ``decision`` given the current decisions."""
+        for nogood in self.nogoods.get(decision, ()):
+            if all(
+                self.decided.get(name) == version
+                for name, version in nogood
+                if (name, version) != decision
+            ):
+                return nogood
+        return None
+
+    def learn(self, nogood: FrozenSet[Decision]):
+        for decision in nogood:
+            self.nogoods.setdefault(decision, []).append(nogood)
+        self.stats['nogoods'] += 1
+
+    def candidates(self, name: str) -> List[str]:
+        allowed = self.allowed(name)
+        return [
+            version
+            for key, version in self.versions(name)
+            if allowed.contains(key) and self.excluded_by((name, version)) is None
+        ]
+
+    def push(self, name: str, version: str, dependencies: List[Tuple[str, VersionRange]]):
+        decision = (name, version)
+        self.depth[name] = len(self.frames)
+        self.decided[name] = version
+        for dependency, version_range in dependencies:
+            self.constraints.setdefault(dependency, []).append((version_range, decision))
+        self.frames.append((name, version, [dependency for dependency, _ in dependencies]))
+        self.stats['decisions'] += 1
+
+    def pop(self):
+        name, _, dependencies = self.frames.pop()
+        for dependency in dependencies:
+            self.constraints[dependency].pop()
+        del self.decided[name]
+        del self.depth[name]
+
+    # --- Search ---
+
+    def explain(self, name: str) -> FrozenSet[Decision]:
+        """Decisions that together leave ``name`` without a usable version."""
+        conflict = set()
+        for _, origin in self.constraints.get(name, ()):
+            if origin is not None:
+                conflict.add(origin)
+
+        allowed = self.allowed(name)
+        for key, version in self.versions(name):
+            if allowed.contains(key):
+                nogood = self.excluded_by((name, version))
+                if nogood is not None:
+                    conflict.update(decision for decision in nogood if decision != (name, version))
+        return frozenset(conflict)
+
+    def backjump(self, name: str) -> bool:
+        """
+        Learn why ``name`` has no candidates and undo the latest decision involved.
+
+        Returns:
+            bool: False if the root requirements alone are unsatisfiable
+        """
+        conflict = self.explain(name)
+        if not conflict:
+            return False
+
+        self.learn(conflict)
+        target = max(self.depth[decided_name] for decided_name, _ in conflict)
+        while len(self.frames) > target:
+            self.pop()
+        self.stats['backjumps'] += 1
+        return True
+
+    def next_package(self) -> Optional[str]:
+        """Undecided required package with the fewest versions left in range."""
+        best = None
+        best_count = None
+        for name, constraints in self.constraints.items():
+            if not constraints or name in self.decided:
+                continue
+            allowed = self.allowed(name)
+            count = sum(1 for key, _ in self.versions(name) if allowed.contains(key))
+            if best is None or count < best_count:
+                best, best_count = name, count
+                if count <= 1:
+                    break
+        return best
+
+    def try_decide(self, name: str) -> bool:
+        """
+        Decide the best viable version of ``name``.
+
+        Candidates whose requirements clash with current decisions, or leave
+        another package without any version, are ruled out by a nogood.
+
+        Returns:
+            bool: False if no candidate is viable
+        """
+        for version in self.candidates(name):
+            decision = (name, version)
+            dependencies = self.dependencies(name, version)
+            if dependencies is None:
+                self.learn(frozenset([decision]))
+                continue
+
+            clash = None
+            for dependency, version_range in dependencies:
+                chosen = self.decided.get(dependency)
+                if chosen is not None:
+                    if not version_range.contains(pep440_key(chosen)):
+                        clash = frozenset([decision, (dependency, chosen)])
+                        break
+                    continue
+
+                allowed = self.allowed(dependency).intersect(version_range)
+                if not any(allowed.contains(key) for key, _ in self.versions(dependency)):
+                    origins = {origin for _, origin in self.constraints.get(dependency, ()) if origin is not None}
+                    clash = frozenset(origins | {decision})
+                    break
+
+            if clash is not None:
+                self.learn(clash)
+                continue
+
+            self.push(name, version, dependencies)
+            return True
+        return False
+
+    def run(self, requirements: Iterable[str]) -> Dict[str, str]:
+        for requirement in requirements:
+            dependency = parse_requirement(requirement)
+            if dependency is not None:
+                name, version_range = dependency
+                self.constraints.setdefault(name, []).append((version_range, None))
+
+        while True:
+            self.stats['rounds'] += 1
+            if self.stats['rounds'] > self.max_rounds:
+                raise ResolutionTooDeep(
+                    f"Resolution exceeded {self.max_rounds} rounds", self.stats
+                )
+
+            name = self.next_package()
+            if name is None:
+                return dict(sorted(self.decided.items()))
+
+            if not self.try_decide(name) and not self.backjump(name):
+                raise ResolutionImpossible(self.describe_failure(name), self.stats, name)
+
+    def describe_failure(self, name: str) -> str:
+        if not self.versions(name):
+            return f"No versions of {name} are available"
+        # Only root requirements remain on a package that fails at the top level
+        return f"No version of {name} satisfies the requirements together with its dependencies"
+
+
+class BacktrackingSolver:
+    """
+    Conflict-driven backtracking resolver over a metadata provider.
+    """
+
+    def __init__(self, provider: MetadataProvider, max_rounds: int = DEFAULT_MAX_ROUNDS):
+        """
+        Args:
+            provider (MetadataProvider): Source of versions and dependencies
+            max_rounds (int): Search rounds allowed before giving up
+        """
+        self.provider = provider
+        self.max_rounds = max_rounds
+
+    def solve(self, requirements: Iterable[str]) -> Resolution:
+        """
+        Resolve requirements to one version per package.
+
+        Args:
+            requirements (Iterable[str]): Root PEP 508 requirements
+
+        Returns:
+            Resolution: Chosen versions, including transitive dependencies,
+            and search statistics ('rounds', 'decisions', 'backjumps',
+            'nogoods', 'metadata_calls', 'metadata_seconds', 'elapsed_seconds')
+
+        Raises:
+            ResolutionImpossible: If the requirements cannot be satisfied
+            ResolutionTooDeep: If the round limit is reached
+        """
+        search = _Search(self.provider, self.max_rounds)
+        start = time.perf_counter()
+        try:
+            versions = search.run(requirements)
+        finally:
+            search.stats['elapsed_seconds'] = time.perf_counter() - start
+        return Resolution(versions, search.stats)
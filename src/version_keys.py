@@ -0,0 +1,388 @@
+"""
+Version Keys
+
+Turns version strings into tuples that sort the way each ecosystem orders
+versions, so versions can be compared and sorted directly with ``<`` and
+``sorted()``. All patterns are compiled once and parsed keys are kept in
+bounded LRU caches, since the same versions are compared over and over
+while sorting, detecting conflicts and resolving.
+
+Schemes:
+
+- 'pep440': Python packages
+- 'semver': npm and Cargo (strict MAJOR.MINOR.PATCH[-pre][+build])
+- 'maven': Maven's ComparableVersion ordering
+- 'loose': any string; numbers compare numerically, known pre-release
+  words sort before the release and anything else after it
+
+Keys of one scheme are totally ordered: any two keys compare without
+error. Keys of different schemes must not be mixed.
+"""
+
+import math
+import re
+from functools import lru_cache
+from typing import Callable, Dict, Optional, Tuple
+
+# Distinct version strings whose keys are kept per scheme
+KEY_CACHE_SIZE = 65536
+
+# --- Semantic versions ---
+
+_SEMVER_PARTIAL_RE = re.compile(
+    r'^v?(?P<major>\d+|[xX*])'
+    r'(?:\.(?P<minor>\d+|[xX*]))?'
+    r'(?:\.(?P<patch>\d+|[xX*]))?'
+    r'(?:-(?P<pre>[0-9A-Za-z-]+(?:\.[0-9A-Za-z-]+)*))?'
+    r'(?:\+[0-9A-Za-z-]+(?:\.[0-9A-Za-z-]+)*)?$'
+)
+
+_SEMVER_RE = re.compile(
+    r'^(0|[1-9]\d*)\.(0|[1-9]\d*)\.(0|[1-9]\d*)'
+    r'(?:-((?:0|[1-9]\d*|\d*[a-zA-Z-][0-9a-zA-Z-]*)(?:\.(?:0|[1-9]\d*|\d*[a-zA-Z-][0-9a-zA-Z-]*))*))?'
+    r'(?:\+([0-9a-zA-Z-]+(?:\.[0-9a-zA-Z-]+)*))?$'
+)
+
+# Key component of a release; sorts above every pre-release of the same version
+SEMVER_RELEASE = (1,)
+# Key component sorting below every pre-release, as in npm's '<2.0.0-0'
+SEMVER_LOWEST_PRE = (0,)
+
+
+def is_semantic_version(version: str) -> bool:
+    """
+    Check if a version string follows semantic versioning 2.0.0.
+
+    Args:
+        version (str): Version string to validate
+
+    Returns:
+        bool: True if the version is a strict semantic version
+    """
+    return _SEMVER_RE.match(version) is not None
+
+
+def prerelease_key(pre: Optional[str]) -> tuple:
+    """
+    Key component of a semver pre-release ('rc.1'), or of a release if None.
+    """
+    if pre is None:
+        return SEMVER_RELEASE
+    return (0,) + tuple(
+        (0, int(part)) if part.isdigit() else (1, part)
+        for part in pre.split('.')
+    )
+
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def parse_semver_partial(text: str) -> Tuple[Tuple[int, ...], Optional[str]]:
+    """
+    Parse a possibly partial semantic version such as '1', '1.2.x' or '1.2.3-rc.1'.
+
+    Args:
+        text (str): Version, optionally with a leading 'v'
+
+    Returns:
+        Tuple of the numeric parts given before any wildcard, and the pre-release
+
+    Raises:
+        ValueError: If the text is not a (partial) semantic version
+    """
+    match = _SEMVER_PARTIAL_RE.match(text)
+    if match is None:
+        raise ValueError(f"Invalid semantic version: {text!r}")
+
+    parts = []
+    for group in ('major', 'minor', 'patch'):
+        value = match.group(group)
+        if value is None or not value.isdigit():
+            break
+        parts.append(int(value))
+
+    pre = match.group('pre') if len(parts) == 3 else None
+    return tuple(parts), pre
+
+
+def semver_key_from_parts(parts: Tuple[int, ...], pre_key: tuple = SEMVER_RELEASE) -> tuple:
+    """
+    Key of the version made of ``parts`` padded with zeros.
+    """
+    padded = tuple(parts) + (0,) * (3 - len(parts))
+    return padded + (pre_key,)
+
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def semver_key(version: str) -> tuple:
+    """
+    Comparable key of a complete semantic version; build metadata is ignored.
+
+    Raises:
+        ValueError: If the version is partial or invalid
+    """
+    parts, pre = parse_semver_partial(version.strip())
+    if len(parts) != 3:
+        raise ValueError(f"Incomplete semantic version: {version!r}")
+    return semver_key_from_parts(parts, prerelease_key(pre))
+
+
+# --- Maven and loose versions ---
+
+_QUALIFIED_TOKEN_RE = re.compile(r'\d+|[a-z]+')
+_MAVEN_VERSION_RE = re.compile(r'^[0-9a-z][0-9a-z._+-]*$')
+
+# Qualifier ranks; 5 is the release itself
+_RELEASE_RANK = 5
+_MAVEN_QUALIFIERS = {
+    'alpha': 0, 'a': 0,
+    'beta': 1, 'b': 1,
+    'milestone': 2, 'm': 2,
+    'rc': 3, 'cr': 3,
+    'snapshot': 4,
+    '': 5, 'ga': 5, 'final': 5, 'release': 5,
+    'sp': 6,
+}
+_LOOSE_QUALIFIERS = {
+    'dev': 0, 'snapshot': 0,
+    'alpha': 1, 'a': 1,
+    'beta': 2, 'b': 2,
+    'pre': 3, 'preview': 3, 'c': 3, 'rc': 3, 'cr': 3, 'm': 3, 'milestone': 3,
+    '': 5, 'ga': 5, 'final': 5, 'release': 5, 'stable': 5,
+    'post': 6, 'sp': 6, 'patch': 6, 'p': 6, 'r': 6, 'rev': 6,
+}
+# Terminates every key, so '1.0' sorts above '1.0-alpha' and below '1.0.1'
+_NULL_ITEM = (0, _RELEASE_RANK, '')
+_ZERO_ITEM = (1, 0, '')
+
+
+def _qualified_key(version: str, qualifiers: Dict[str, int], unknown_rank: int) -> tuple:
+    items = []
+    for token in _QUALIFIED_TOKEN_RE.findall(version):
+        if token.isdigit():
+            items.append((1, int(token), ''))
+            continue
+
+        # Zeros before a qualifier are insignificant: '1.0-alpha' == '1-alpha'
+        while items and items[-1] == _ZERO_ITEM:
+            items.pop()
+        rank = qualifiers.get(token)
+        if rank is None:
+            items.append((0, unknown_rank, token))
+        else:
+            items.append((0, rank, ''))
+
+    # Trailing zeros and release qualifiers do not change the version
+    while items and items[-1] in (_ZERO_ITEM, _NULL_ITEM):
+        items.pop()
+    return tuple(items) + (_NULL_ITEM,)
+
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def maven_key(version: str) -> tuple:
+    """
+    Comparable key following Maven's ComparableVersion ordering.
+
+    Raises:
+        ValueError: For strings that are not versions, such as unresolved
+            properties ('${spring.version}')
+    """
+    version = version.strip().lower()
+    if not _MAVEN_VERSION_RE.match(version):
+        raise ValueError(f"Invalid Maven version: {version!r}")
+    # Unknown qualifiers sort after all known ones, alphabetically
+    return _qualified_key(version, _MAVEN_QUALIFIERS, 7)
+
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def loose_key(version: str) -> tuple:
+    """
+    Comparable key for a version in no particular scheme; never raises.
+
+    A leading 'v' is ignored, numbers compare numerically, and unknown words
+    sort after the release ('1.0-custom' > '1.0'), like Maven qualifiers.
+    """
+    version = version.strip().lower()
+    if version[:1] == 'v':
+        version = version[1:]
+    return _qualified_key(version, _LOOSE_QUALIFIERS, 7)
+
+
+# --- PEP 440 ---
+
+_PEP440_RE = re.compile(r'''
+    ^\s*v?
+    (?:(?P<epoch>[0-9]+)!)?
+    (?P<release>[0-9]+(?:\.[0-9]+)*)
+    (?P<pre>[-_.]?(?P<pre_l>alpha|a|beta|b|preview|pre|c|rc)[-_.]?(?P<pre_n>[0-9]+)?)?
+    (?P<post>(?:-(?P<post_n1>[0-9]+))|(?:[-_.]?(?P<post_l>post|rev|r)[-_.]?(?P<post_n2>[0-9]+)?))?
+    (?P<dev>[-_.]?(?P<dev_l>dev)[-_.]?(?P<dev_n>[0-9]+)?)?
+    (?:\+(?P<local>[a-z0-9]+(?:[-_.][a-z0-9]+)*))?
+    \s*$
+''', re.VERBOSE | re.IGNORECASE)
+
+_PEP440_LOCAL_SEPARATOR_RE = re.compile(r'[-_.]')
+_PEP440_PRE_RANKS = {'a': 0, 'alpha': 0, 'b': 1, 'beta': 1, 'c': 2, 'rc': 2, 'pre': 2, 'preview': 2}
+# Pre-release components sorting below and above every real pre-release
+_PEP440_BEFORE_PRE = (-1, 0)
+_PEP440_NO_PRE = (3, 0)
+
+
+def _trim_release(release) -> Tuple[int, ...]:
+    # '1.0' and '1.0.0' are the same version
+    release = list(release)
+    while release and release[-1] == 0:
+        release.pop()
+    return tuple(release)
+
+
+def parse_pep440_release(version: str) -> Tuple[int, Tuple[int, ...]]:
+    """
+    Get the epoch and the release segments of a PEP 440 version, as written.
+
+    Raises:
+        ValueError: If the version is invalid
+    """
+    match = _PEP440_RE.match(version)
+    if match is None:
+        raise ValueError(f"Invalid PEP 440 version: {version!r}")
+    return int(match.group('epoch') or 0), tuple(int(part) for part in match.group('release').split('.'))
+
+
+def pep440_floor(epoch: int, release: Tuple[int, ...]) -> tuple:
+    """
+    Lowest key of any version starting with ``release`` ('X.dev0').
+    """
+    return (epoch, _trim_release(release), _PEP440_BEFORE_PRE, -1, 0, ())
+
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def pep440_key(version: str) -> tuple:
+    """
+    Comparable key following PEP 440 ordering.
+
+    Raises:
+        ValueError: If the version is invalid
+    """
+    match = _PEP440_RE.match(version)
+    if match is None:
+        raise ValueError(f"Invalid PEP 440 version: {version!r}")
+
+    epoch = int(match.group('epoch') or 0)
+    release = _trim_release(int(part) for part in match.group('release').split('.'))
+
+    if match.group('pre_l'):
+        pre = (_PEP440_PRE_RANKS[match.group('pre_l').lower()], int(match.group('pre_n') or 0))
+    elif not match.group('post') and match.group('dev'):
+        # 1.0.dev0 sorts before 1.0a0
+        pre = _PEP440_BEFORE_PRE
+    else:
+        pre = _PEP440_NO_PRE
+
+    if match.group('post'):
+        post = int(match.group('post_n1') or match.group('post_n2') or 0)
+    else:
+        post = -1
+
+    dev = int(match.group('dev_n') or 0) if match.group('dev') else math.inf
+
+    local = ()
+    if match.group('local'):
+        local = tuple(
+            (1, int(part)) if part.isdigit() else (0, part.lower())
+            for part in _PEP440_LOCAL_SEPARATOR_RE.split(match.group('local'))
+        )
+
+    return epoch, release, pre, post, dev, local
+
+
+def pep440_is_prerelease(key: tuple) -> bool:
+    """
+    Check whether a PEP 440 key is a pre-release or development release.
+    """
+    return key[2] != _PEP440_NO_PRE or key[4] != math.inf
+
+
+_KEY_FUNCTIONS: Dict[str, Callable[[str], tuple]] = {
+    'pep440': pep440_key,
+    'semver': semver_key,
+    'npm': semver_key,
+    'cargo': semver_key,
+    'maven': maven_key,
+    'loose': loose_key,
+}
+
+SCHEMES = tuple(_KEY_FUNCTIONS)
+
+
+def version_key(scheme: str, version: str) -> tuple:
+    """
+    Comparable key of a version.
+
+    Args:
+        scheme (str): 'pep440', 'semver' (or 'npm'/'cargo'), 'maven' or 'loose'
+        version (str): Version string
+
+    Returns:
+        tuple: Key ordered like the ecosystem orders versions
+
+    Raises:
+        ValueError: If the scheme is unknown or the version invalid for it
+    """
+    key_function = _KEY_FUNCTIONS.get(scheme)
+    if key_function is None:
+        raise ValueError(f"Unknown version scheme: {scheme!r}")
+    return key_function(version)
+
+
+def sort_key(scheme: str) -> Callable[[str], tuple]:
+    """
+    Key function for ``sorted()`` that falls back to the loose scheme.
+
+    Versions invalid in ``scheme`` are ordered among themselves but after
+    every valid version, so mixed lists still sort without errors.
+
+    Args:
+        scheme (str): Preferred version scheme
+
+    Returns:
+        Callable[[str], tuple]: Key function
+    """
+    key_function = _KEY_FUNCTIONS[scheme]
+
+    def key(version: str) -> tuple:
+        try:
+            return (0, key_function(version))
+        except ValueError:
+            return (1, loose_key(version))
+
+    return key
+
+
+def compare_versions(version1: str, version2: str, scheme: str = 'pep440') -> int:
+    """
+    Compare two version strings.
+
+    Both versions are compared in ``scheme`` when both are valid in it,
+    otherwise both are compared with the loose scheme.
+
+    Args:
+        version1 (str): First version string
+        version2 (str): Second version string
+        scheme (str): Preferred version scheme
+
+    Returns:
+        int: -1 if version1 < version2, 0 if equal, 1 if version1 > version2
+    """
+    key_function = _KEY_FUNCTIONS[scheme]
+    try:
+        key1 = key_function(version1)
+        key2 = key_function(version2)
+    except ValueError:
+        key1 = loose_key(version1)
+        key2 = loose_key(version2)
+    return (key1 > key2) - (key1 < key2)
+
+
+def clear_caches():
+    """Drop all memoized keys."""
+    for cached in (parse_semver_partial, semver_key, maven_key, loose_key, pep440_key):
+        cached.cache_clear()
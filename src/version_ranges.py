@@ -0,0 +1,424 @@
+"""
+Version Ranges
+
+Parses the version requirement syntaxes of the supported ecosystems into
+unions of intervals over comparable version keys, so requirements can be
+intersected however they were written:
+
+- npm: caret, tilde, x-ranges, hyphen ranges, comparator sets and '||'
+- Cargo: comma-separated requirements, where a bare version means caret
+- Maven: soft versions and bracket ranges such as '[1.0,2.0),[3.0,)'
+- PEP 440: comma-separated specifiers including '~=', '==X.*' and '!='
+
+Versions are ordered with the keys from ``version_keys``. Parsed ranges
+are memoized, since a large repository declares the same few requirements
+over and over.
+"""
+
+import re
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import version_keys
+from version_keys import (
+    SEMVER_LOWEST_PRE,
+    maven_key,
+    parse_pep440_release,
+    parse_semver_partial,
+    pep440_floor,
+    pep440_key,
+    prerelease_key,
+    semver_key_from_parts,
+    version_key,  # re-exported: keys to test against ranges
+)
+
+SCHEMES = ('npm', 'cargo', 'maven', 'pep440')
+
+# Distinct requirement strings kept
+PARSE_CACHE_SIZE = 8192
+
+# (lower, lower inclusive, upper, upper inclusive); None bounds are unbounded
+Interval = Tuple[Optional[tuple], bool, Optional[tuple], bool]
+
+
+def _interval_empty(interval: Interval) -> bool:
+    lower, lower_inclusive, upper, upper_inclusive = interval
+    if lower is None or upper is None:
+        return False
+    return lower > upper or (lower == upper and not (lower_inclusive and upper_inclusive))
+
+
+def _intersect_intervals(a: Interval, b: Interval) -> Interval:
+    a_lower, a_lower_inclusive, a_upper, a_upper_inclusive = a
+    b_lower, b_lower_inclusive, b_upper, b_upper_inclusive = b
+
+    if a_lower is None or (b_lower is not None and b_lower > a_lower):
+        lower, lower_inclusive = b_lower, b_lower_inclusive
+    elif b_lower is None or a_lower > b_lower:
+        lower, lower_inclusive = a_lower, a_lower_inclusive
+    else:
+        lower, lower_inclusive = a_lower, a_lower_inclusive and b_lower_inclusive
+
+    if a_upper is None or (b_upper is not None and b_upper < a_upper):
+        upper, upper_inclusive = b_upper, b_upper_inclusive
+    elif b_upper is None or a_upper < b_upper:
+        upper, upper_inclusive = a_upper, a_upper_inclusive
+    else:
+        upper, upper_inclusive = a_upper, a_upper_inclusive and b_upper_inclusive
+
+    return lower, lower_inclusive, upper, upper_inclusive
+
+
+class VersionRange:
+    """
+    An immutable set of versions, as a union of intervals over version keys.
+    """
+
+    __slots__ = ('intervals',)
+
+    def __init__(self, intervals: Iterable[Interval]):
+        self.intervals = tuple(interval for interval in intervals if not _interval_empty(interval))
+
+    def is_empty(self) -> bool:
+        """Check whether no version satisfies the range."""
+        return not self.intervals
+
+    def intersect(self, other: 'VersionRange') -> 'VersionRange':
+        """
+        Get the versions satisfying both ranges.
+
+        Args:
+            other (VersionRange): Range of the same scheme
+
+        Returns:
+            VersionRange: Intersection
+        """
+        return VersionRange(
+            _intersect_intervals(a, b)
+            for a in self.intervals
+            for b in other.intervals
+        )
+
+    def union(self, other: 'VersionRange') -> 'VersionRange':
+        """Get the versions satisfying either range."""
+        return VersionRange(self.intervals + other.intervals)
+
+    def contains(self, key: tuple) -> bool:
+        """
+        Check whether a version key lies in the range.
+
+        Args:
+            key (tuple): Key from ``version_key`` of the same scheme
+
+        Returns:
+            bool: True if the version satisfies the range
+        """
+        for lower, lower_inclusive, upper, upper_inclusive in self.intervals:
+            if lower is not None and (key < lower or (key == lower and not lower_inclusive)):
+                continue
+            if upper is not None and (key > upper or (key == upper and not upper_inclusive)):
+                continue
+            return True
+        return False
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, VersionRange) and self.intervals == other.intervals
+
+    def __hash__(self) -> int:
+        return hash(self.intervals)
+
+    def __repr__(self) -> str:
+        return f"VersionRange({list(self.intervals)!r})"
+
+
+ANY = VersionRange([(None, False, None, False)])
+EMPTY = VersionRange([])
+
+
+def _exact(key: tuple) -> VersionRange:
+    return VersionRange([(key, True, key, True)])
+
+
+def _at_least(key: tuple, inclusive: bool = True) -> VersionRange:
+    return VersionRange([(key, inclusive, None, False)])
+
+
+def _below(key: tuple, inclusive: bool = False) -> VersionRange:
+    return VersionRange([(None, False, key, inclusive)])
+
+
+def _between(lower: tuple, upper: tuple) -> VersionRange:
+    """Half-open range [lower, upper)."""
+    return VersionRange([(lower, True, upper, False)])
+
+
+def _intersect_all(ranges: Iterable[VersionRange]) -> VersionRange:
+    result = ANY
+    for version_range in ranges:
+        result = result.intersect(version_range)
+    return result
+
+
+def _union_all(ranges: Iterable[VersionRange]) -> VersionRange:
+    result = EMPTY
+    for version_range in ranges:
+        result = result.union(version_range)
+    return result
+
+
+# --- Semantic versions (npm, Cargo) ---
+
+
+def _semver_bump(parts: Tuple[int, ...], index: int) -> tuple:
+    """Lowest key above every version starting with ``parts[:index + 1]``."""
+    bumped = parts[:index] + (parts[index] + 1,)
+    return semver_key_from_parts(bumped, SEMVER_LOWEST_PRE)
+
+
+def _semver_comparator(op: str, text: str) -> VersionRange:
+    """
+    Desugar one npm/Cargo comparator into a range.
+
+    Args:
+        op (str): One of '', '=', '<', '<=', '>', '>=', '~', '^'
+        text (str): Possibly partial version
+    """
+    parts, pre = parse_semver_partial(text)
+    count = len(parts)
+
+    if count == 0:
+        return EMPTY if op in ('<', '>') else ANY
+
+    full = count == 3
+    floor = semver_key_from_parts(parts, prerelease_key(pre))
+
+    if op in ('', '='):
+        return _exact(floor) if full else _between(floor, _semver_bump(parts, count - 1))
+    if op == '>=':
+        return _at_least(floor)
+    if op == '>':
+        return _at_least(floor, inclusive=False) if full else _at_least(_semver_bump(parts, count - 1))
+    if op == '<':
+        return _below(floor) if full else _below(semver_key_from_parts(parts, SEMVER_LOWEST_PRE))
+    if op == '<=':
+        return _below(floor, inclusive=True) if full else _below(_semver_bump(parts, count - 1))
+    if op == '~':
+        return _between(floor, _semver_bump(parts, min(count - 1, 1)))
+    if op == '^':
+        for index, part in enumerate(parts):
+            if part != 0:
+                break
+        else:
+            # ^0.0.0 allows only 0.0.0; ^0.0 allows 0.0.x; ^0 allows 0.x
+            index = count - 1
+        return _between(floor, _semver_bump(parts, index))
+
+    raise ValueError(f"Unknown comparator: {op!r}")
+
+
+_NPM_OR_RE = re.compile(r'\s*\|\|\s*')
+_NPM_HYPHEN_RE = re.compile(r'^(\S+)\s+-\s+(\S+)$')
+_NPM_OPERATOR_SPACE_RE = re.compile(r'(<=|>=|<|>|=|~>|~|\^)\s+')
+_NPM_COMPARATOR_RE = re.compile(r'^(<=|>=|<|>|=|~>|~|\^)?(.*)$')
+
+
+def _parse_npm(spec: str) -> VersionRange:
+    alternatives = []
+    for alternative in _NPM_OR_RE.split(spec.strip()):
+        hyphen = _NPM_HYPHEN_RE.match(alternative)
+        if hyphen:
+            alternatives.append(
+                _semver_comparator('>=', hyphen.group(1)).intersect(
+                    _semver_comparator('<=', hyphen.group(2))
+                )
+            )
+            continue
+
+        comparators = []
+        for token in _NPM_OPERATOR_SPACE_RE.sub(r'\1', alternative).split():
+            op, text = _NPM_COMPARATOR_RE.match(token).groups()
+            op = {'~>': '~', None: ''}.get(op, op)
+            comparators.append(_semver_comparator(op, text))
+        alternatives.append(_intersect_all(comparators))
+    return _union_all(alternatives)
+
+
+_CARGO_COMPARATOR_RE = re.compile(r'^(<=|>=|<|>|=|~|\^)?\s*(\S+)$')
+
+
+def _parse_cargo(spec: str) -> VersionRange:
+    comparators = []
+    for requirement in spec.split(','):
+        match = _CARGO_COMPARATOR_RE.match(requirement.strip())
+        if match is None:
+            raise ValueError(f"Invalid Cargo requirement: {spec!r}")
+        op, text = match.groups()
+        # A bare version is a caret requirement in Cargo
+        comparators.append(_semver_comparator(op or '^', text))
+    return _intersect_all(comparators)
+
+
+# --- Maven ---
+
+_MAVEN_RANGE_RE = re.compile(r'\s*([\[(])([^\[\]()]*)([\])])\s*(?:,|$)')
+
+
+def _parse_maven(spec: str) -> VersionRange:
+    spec = spec.strip()
+    if not spec.startswith(('[', '(')):
+        # Soft requirement: the declared version
+        return _exact(maven_key(spec))
+
+    ranges = []
+    position = 0
+    while position < len(spec):
+        match = _MAVEN_RANGE_RE.match(spec, position)
+        if match is None:
+            raise ValueError(f"Invalid Maven version range: {spec!r}")
+        opening, content, closing = match.groups()
+        position = match.end()
+
+        if ',' not in content:
+            if opening != '[' or closing != ']':
+                raise ValueError(f"Invalid Maven version range: {spec!r}")
+            ranges.append(_exact(maven_key(content)))
+            continue
+
+        lower, upper = (part.strip() for part in content.split(',', 1))
+        ranges.append(VersionRange([(
+            maven_key(lower) if lower else None,
+            opening == '[',
+            maven_key(upper) if upper else None,
+            closing == ']'
+        )]))
+    return _union_all(ranges)
+
+
+# --- PEP 440 ---
+
+_PEP440_CLAUSE_RE = re.compile(r'^\s*(~=|===|==|!=|<=|>=|<|>)?\s*(\S+?)\s*$')
+_PEP440_PREFIX_RE = re.compile(r'^\s*v?(?:([0-9]+)!)?([0-9]+(?:\.[0-9]+)*)\.\*\s*$')
+
+
+def _pep440_prefix_range(text: str) -> VersionRange:
+    """Versions matching a wildcard such as '1.2.*'."""
+    match = _PEP440_PREFIX_RE.match(text)
+    if match is None:
+        raise ValueError(f"Invalid PEP 440 prefix: {text!r}")
+    epoch = int(match.group(1) or 0)
+    release = tuple(int(part) for part in match.group(2).split('.'))
+    bumped = release[:-1] + (release[-1] + 1,)
+    return _between(pep440_floor(epoch, release), pep440_floor(epoch, bumped))
+
+
+def _pep440_clause(op: str, text: str) -> VersionRange:
+    if op in ('==', '!=') and text.endswith('.*'):
+        matched = _pep440_prefix_range(text)
+    elif op == '~=':
+        key = pep440_key(text)
+        _, release = parse_pep440_release(text)
+        if len(release) < 2:
+            raise ValueError(f"'~=' needs at least two release segments: {text!r}")
+        prefix = release[:-1]
+        bumped = prefix[:-1] + (prefix[-1] + 1,)
+        return _between(key, pep440_floor(key[0], bumped))
+    else:
+        key = pep440_key(text)
+        matched = _exact(key)
+        if op == '>=':
+            return _at_least(key)
+        if op == '>':
+            return _at_least(key, inclusive=False)
+        if op == '<=':
+            return _below(key, inclusive=True)
+        if op == '<':
+            return _below(key)
+
+    if op == '!=':
+        interval = matched.intervals[0]
+        lower, lower_inclusive, upper, upper_inclusive = interval
+        return VersionRange([
+            (None, False, lower, not lower_inclusive),
+            (upper, not upper_inclusive, None, False)
+        ])
+    # '==', '===' and bare versions
+    return matched
+
+
+def _parse_pep440(spec: str) -> VersionRange:
+    clauses = []
+    for clause in spec.split(','):
+        match = _PEP440_CLAUSE_RE.match(clause)
+        if match is None:
+            raise ValueError(f"Invalid PEP 440 specifier: {spec!r}")
+        op, text = match.groups()
+        clauses.append(_pep440_clause(op or '==', text))
+    return _intersect_all(clauses)
+
+
+_PARSERS: Dict[str, Callable[[str], VersionRange]] = {
+    'npm': _parse_npm,
+    'cargo': _parse_cargo,
+    'maven': _parse_maven,
+    'pep440': _parse_pep440,
+}
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_range_cached(scheme: str, spec: str) -> Optional[VersionRange]:
+    # Failures are cached as None so unparseable specs are not retried
+    try:
+        return _PARSERS[scheme](spec)
+    except (ValueError, IndexError):
+        return None
+
+
+def parse_range(scheme: str, spec: str) -> VersionRange:
+    """
+    Parse a version requirement into a range.
+
+    Args:
+        scheme (str): One of 'npm', 'cargo', 'maven' or 'pep440'
+        spec (str): Requirement as written in the manifest
+
+    Returns:
+        VersionRange: Versions satisfying the requirement
+
+    Raises:
+        ValueError: If the scheme is unknown or the requirement cannot be parsed
+            (e.g. git URLs, dist-tags or unresolved properties)
+    """
+    if scheme not in _PARSERS:
+        raise ValueError(f"Unknown version scheme: {scheme!r}")
+    version_range = _parse_range_cached(scheme, spec)
+    if version_range is None:
+        raise ValueError(f"Unparseable {scheme} requirement: {spec!r}")
+    return version_range
+
+
+def ranges_overlap(scheme: str, specs: Iterable[str]) -> bool:
+    """
+    Check whether some version satisfies every requirement.
+
+    Args:
+        scheme (str): Version scheme of the requirements
+        specs (Iterable[str]): Requirements as written
+
+    Returns:
+        bool: False if the intersection of the ranges is empty
+
+    Raises:
+        ValueError: If a requirement cannot be parsed
+    """
+    result = ANY
+    for spec in specs:
+        result = result.intersect(parse_range(scheme, spec))
+        if result.is_empty():
+            return False
+    return True
+
+
+def clear_caches():
+    """Drop memoized versions and ranges."""
+    version_keys.clear_caches()
+    _parse_range_cached.cache_clear()
@@ -0,0 +1,80 @@
+import os
+import shutil
+import tempfile
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+
+from analysis_cache import AnalysisCache, default_cache_dir
+from analyzer import JavaDependencyAnalyzer, PythonDependencyAnalyzer
+
+def test_cache_reuses_unchanged_files_and_invalidates_changes():
+    """
+    Test that unchanged files are served from the cache and changed ones re-parsed.
+    """
+    project_path = tempfile.mkdtemp()
+    java_file = os.path.join(project_path, 'App.java')
+    with open(java_file, 'w') as f:
+        f.write('import java.util.List;\n')
+    with open(os.path.join(project_path, 'main.py'), 'w') as f:
+        f.write('import requests\n')
+
+    try:
+        cache = AnalysisCache(default_cache_dir(project_path))
+        JavaDependencyAnalyzer(cache=cache).analyze_dependencies(project_path)
+        PythonDependencyAnalyzer(cache=cache).analyze_dependencies(project_path)
+        cache.close()
+        assert cache.hits == 0
+
+        # Second run: everything comes from the cache
+        cache = AnalysisCache(default_cache_dir(project_path))
+        java_result = JavaDependencyAnalyzer(cache=cache).analyze_dependencies(project_path)
+        python_result = PythonDependencyAnalyzer(cache=cache).analyze_dependencies(project_path)
+        assert cache.misses == 0 and cache.hits == 2
+        assert [dep['name'] for dep in java_result['dependencies']] == ['java.util.List']
+        assert python_result['imported_modules'] == ['requests']
+
+        # A modified file is parsed again
+        with open(java_file, 'w') as f:
+            f.write('import java.io.File;\nimport java.net.URL;\n')
+        java_result = JavaDependencyAnalyzer(cache=cache).analyze_dependencies(project_path)
+        assert [dep['name'] for dep in java_result['dependencies']] == ['java.io.File', 'java.net.URL']
+
+        # Bumping the analyzer's cache version invalidates its entries
+        class PatchedAnalyzer(JavaDependencyAnalyzer):
+            cache_version = JavaDependencyAnalyzer.cache_version + 1
+
+            @classmethod
+            def _cache_namespace(cls, kind):
+                return JavaDependencyAnalyzer._cache_namespace(kind)
+
+        misses = cache.misses
+        PatchedAnalyzer(cache=cache).analyze_dependencies(project_path)
+        assert cache.misses == misses + 1
+        cache.close()
+    finally:
+        shutil.rmtree(project_path)
+
+def test_cache_evicts_least_recently_used_entries():
+    """
+    Test size-bounded eviction.
+    """
+    cache_dir = tempfile.mkdtemp()
+    paths = []
+    for i in range(3):
+        path = os.path.join(cache_dir, f'file_{i}.txt')
+        with open(path, 'w') as f:
+            f.write(str(i))
+        paths.append(path)
+
+    try:
+        cache = AnalysisCache(cache_dir, max_size=250)
+        for path in paths:
+            cache.put('test', 1, path, ['x' * 100])
+            cache.flush()
+
+        assert cache.get('test', 1, paths[0]) is None
+        assert cache.get('test', 1, paths[2]) == ['x' * 100]
+        cache.close()
+    finally:
+        shutil.rmtree(cache_dir)
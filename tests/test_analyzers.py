@@ -140,4 +140,176 @@ def test_multi_language_conflict_detection():
         # Clean up temporary directories
         import shutil
         for path in project_paths.values():
-            shutil.rmtree(path)
\ No newline at end of file
+            shutil.rmtree(path)
+
+
+def test_python_parallel_imports_match_serial():
+    """
+    Test that process-pool import parsing gives the same result as the serial path.
+    """
+    project_path = tempfile.mkdtemp()
+    modules = ['os', 'json', 're', 'sys', 'ast', 'abc', 'csv', 'uuid']
+    
+    for i in range(40):
+        with open(os.path.join(project_path, f'module_{i}.py'), 'w') as f:
+            f.write(f'import {modules[i % len(modules)]}\nfrom pkg_{i}.sub import thing\n')
+    with open(os.path.join(project_path, 'broken.py'), 'w') as f:
+        f.write('def broken(:\n')
+    
+    try:
+        serial = PythonDependencyAnalyzer.analyze_imports(project_path, workers=1)
+        parallel = PythonDependencyAnalyzer.analyze_imports(project_path, workers=2)
+        
+        assert sorted(parallel) == sorted(serial)
+        assert len(serial) == len(modules) + 40
+    finally:
+        import shutil
+        shutil.rmtree(project_path)
+
+
+def test_python_fast_import_extraction():
+    """
+    Test the header scan against strings, nested imports and unparsable files.
+    """
+    project_path = tempfile.mkdtemp()
+    sources = {
+        'doc.py': '"""\nimport not_a_module\n"""\nimport os.path, json as j  # import fake\nfrom .pkg.sub import x\n',
+        'nested.py': 'def f():\n    from yaml import load\n    try: import toml\n    except ImportError: pass\n',
+        'plain.py': 'x = "no imports here"\n',
+        'broken.py': 'try: import requests\ndef broken(:\n',
+    }
+    for name, content in sources.items():
+        with open(os.path.join(project_path, name), 'w') as f:
+            f.write(content)
+    
+    try:
+        errors = []
+        imports = PythonDependencyAnalyzer.analyze_imports(project_path, errors=errors)
+        
+        assert sorted(imports) == ['json', 'os', 'pkg', 'toml', 'yaml']
+        assert len(errors) == 1 and errors[0].startswith(os.path.join(project_path, 'broken.py'))
+    finally:
+        import shutil
+        shutil.rmtree(project_path)
+
+
+def test_java_import_scan_stops_at_type_declaration():
+    """
+    Test comment handling, static imports and early termination of the Java scanner.
+    """
+    project_path = tempfile.mkdtemp()
+    with open(os.path.join(project_path, 'App.java'), 'w') as f:
+        f.write(
+            '/* Licensed under\n'
+            ' * import com.example.license; */\n'
+            'package com.example;\n'
+            '\n'
+            'import java.util.List; // import java.fake.Comment;\n'
+            'import static org.junit.Assert.assertEquals;\n'
+            'import static java.lang.Math.*;\n'
+            'import java.util\n'
+            '    .Map;\n'
+            '\n'
+            '@SuppressWarnings("unused")\n'
+            'public class App {\n'
+            '    String s = "import java.fake.Body;";\n'
+            '}\n'
+            'import java.fake.AfterClass;\n'
+        )
+    
+    try:
+        result = JavaDependencyAnalyzer().analyze_dependencies(project_path)
+        names = [dep['name'] for dep in result['dependencies']]
+        
+        assert names == ['java.util.List', 'org.junit.Assert', 'java.lang.Math', 'java.util.Map']
+    finally:
+        import shutil
+        shutil.rmtree(project_path)
+
+
+def test_javascript_import_forms_and_package_counts():
+    """
+    Test that all import forms are found once, normalized to packages and counted.
+    """
+    project_path = tempfile.mkdtemp()
+    with open(os.path.join(project_path, 'a.ts'), 'w') as f:
+        f.write(
+            '// import nope from "commented"\n'
+            'import React, { useState,\n    useEffect } from "react";\n'
+            "import type { Foo } from '@scope/pkg/sub';\n"
+            "import * as fp from 'lodash/fp';\n"
+            "export { a } from './local';\n"
+            "export * from 'lodash';\n"
+            "const lazy = import('lazy-mod');\n"
+            "const s = \"require('in-string')\";\n"
+        )
+    with open(os.path.join(project_path, 'b.js'), 'w') as f:
+        f.write("const _ = require('lodash');\nimport 'react';\n")
+    
+    try:
+        result = JavaScriptDependencyAnalyzer().analyze_dependencies(project_path)
+        counts = {dep['name']: dep['count'] for dep in result['dependencies']}
+        
+        assert counts == {'react': 2, '@scope/pkg': 1, 'lodash': 3, 'lazy-mod': 1}
+        lodash = next(dep for dep in result['dependencies'] if dep['name'] == 'lodash')
+        assert sorted(os.path.basename(path) for path in lodash['sources']) == ['a.ts', 'b.js']
+    finally:
+        import shutil
+        shutil.rmtree(project_path)
+
+
+def test_import_table_aggregates_and_adapts_to_legacy_dicts():
+    """
+    Test compact per-package import records and the one-dict-per-occurrence adapter.
+    """
+    from dependency_records import ImportTable
+    
+    table = ImportTable()
+    table.add_all(['java.util.List', 'java.io.File', 'java.util.List'], 'A.java')
+    table.add('java.util.List', 'B.java', count=2)
+    
+    assert len(table) == 2
+    assert table['java.util.List'].count == 4
+    assert table.paths.paths == ['A.java', 'B.java']
+    
+    aggregated = {d['name']: d for d in table.to_dicts()}
+    assert aggregated['java.util.List']['sources'] == ['A.java', 'B.java']
+    assert aggregated['java.util.List']['source'] == 'A.java'
+    
+    legacy = list(table.iter_occurrence_dicts())
+    assert len(legacy) == 5
+    assert legacy[0] == {'name': 'java.util.List', 'source': 'A.java', 'type': 'import'}
+
+
+def test_conflicts_group_every_version_by_normalized_name():
+    """
+    Test single-pass conflict grouping across all declarations of a package.
+    """
+    dependencies = [
+        {'name': 'serde', 'version': '1.0', 'source': 'a/Cargo.toml'},
+        {'name': 'serde', 'version': '2.0', 'source': 'b/Cargo.toml'},
+        {'name': 'Serde', 'version': '3.0', 'source': 'c/Cargo.toml'},
+        {'name': 'serde', 'version': '1.0', 'source': 'd/Cargo.toml'},
+        {'name': 'serde', 'source': 'main.rs', 'type': 'import'},
+        {'name': 'tokio', 'version': 'Unknown', 'source': 'a/Cargo.toml'},
+        {'name': 'tokio', 'version': '1.0', 'source': 'b/Cargo.toml'},
+        {'name': 'rand_core', 'version': '0.6', 'source': 'a/Cargo.toml'},
+        {'name': 'rand-core', 'version': '0.5', 'source': 'b/Cargo.toml'},
+    ]
+
+    conflicts = RustDependencyAnalyzer().detect_conflicts(dependencies)
+    assert [conflict['name'] for conflict in conflicts] == ['serde', 'rand_core']
+    assert conflicts[0]['versions'] == [
+        {'version': '1.0', 'sources': ['a/Cargo.toml', 'd/Cargo.toml']},
+        {'version': '2.0', 'sources': ['b/Cargo.toml']},
+        {'version': '3.0', 'sources': ['c/Cargo.toml']},
+    ]
+    assert conflicts[0]['existing_version'] == '1.0'
+    assert conflicts[0]['conflicting_source'] == 'b/Cargo.toml'
+
+    # Java coordinates are case-sensitive
+    java_conflicts = JavaDependencyAnalyzer().detect_conflicts([
+        {'name': 'org.Foo:bar', 'version': '1', 'source': 'pom.xml'},
+        {'name': 'org.foo:bar', 'version': '2', 'source': 'build.gradle'},
+    ])
+    assert java_conflicts == []
@@ -0,0 +1,131 @@
+import io
+import json
+import os
+import sys
+import tarfile
+import zipfile
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+
+from fetcher.artifact_store import ArtifactStore, file_sha256, parse_lock_file, split_artifact_filename
+
+def make_wheel(directory, name, version, payload=b''):
+    path = os.path.join(directory, f'{name}-{version}-py3-none-any.whl')
+    with zipfile.ZipFile(path, 'w') as wheel:
+        wheel.writestr(f'{name}-{version}.dist-info/METADATA', f'Name: {name}\nVersion: {version}\n')
+        wheel.writestr(f'{name}/__init__.py', payload)
+    return path
+
+def make_npm_tarball(directory, filename, name, version):
+    path = os.path.join(directory, filename)
+    manifest = json.dumps({'name': name, 'version': version}).encode()
+    with tarfile.open(path, 'w:gz') as tarball:
+        info = tarfile.TarInfo('package/package.json')
+        info.size = len(manifest)
+        tarball.addfile(info, io.BytesIO(manifest))
+    return path
+
+def test_split_artifact_filename():
+    """
+    Test that artifacts are identified by their filename.
+    """
+    assert split_artifact_filename('Foo_Bar-1.0-py3-none-any.whl') == ('pypi', 'foo-bar', '1.0')
+    assert split_artifact_filename('left-pad-1.3.0.tgz') == ('npm', 'left-pad', '1.3.0')
+    assert split_artifact_filename('serde_json-1.0.108.crate') == ('crates', 'serde-json', '1.0.108')
+    assert split_artifact_filename('notes.txt') is None
+
+def test_parse_lock_files(tmp_path):
+    """
+    Test reading pins from requirements and package-lock.json files.
+    """
+    digest = 'a' * 64
+    requirements = tmp_path / 'requirements.txt'
+    requirements.write_text(f'# pinned\nRequests==2.31.0 \\\n    --hash=sha256:{digest}\nidna>=3\n')
+    assert [tuple(artifact) for artifact in parse_lock_file(str(requirements))] == [
+        ('pypi', 'requests', '2.31.0', (digest,))
+    ]
+
+    package_lock = tmp_path / 'package-lock.json'
+    package_lock.write_text(json.dumps({'packages': {
+        '': {'name': 'app', 'version': '0.1.0'},
+        'node_modules/@scope/util': {'version': '2.0.0'},
+        'node_modules/local': {'version': '1.0.0', 'link': True}
+    }}))
+    assert [tuple(artifact) for artifact in parse_lock_file(str(package_lock))] == [
+        ('npm', '@scope/util', '2.0.0', ())
+    ]
+
+def test_warm_find_and_evict(tmp_path):
+    """
+    Test warming from a source directory, hash checks and LRU eviction.
+    """
+    source = tmp_path / 'mirror'
+    (source / 'npm').mkdir(parents=True)
+    wheel = make_wheel(str(source), 'demo', '1.0', b'x' * 4000)
+    other = make_wheel(str(source), 'other', '2.0', b'y' * 4000)
+    # Scoped packages don't say their name in the filename
+    make_npm_tarball(str(source / 'npm'), 'util-2.0.0.tgz', '@scope/util', '2.0.0')
+
+    lock = tmp_path / 'lock.json'
+    lock.write_text(json.dumps({'packages': [
+        {'ecosystem': 'pypi', 'name': 'Demo', 'version': '1.0', 'hashes': [f'sha256:{file_sha256(wheel)}']},
+        {'ecosystem': 'pypi', 'name': 'other', 'version': '2.0', 'hashes': ['sha256:' + '0' * 64]},
+        {'ecosystem': 'npm', 'name': '@scope/util', 'version': '2.0.0'},
+        {'ecosystem': 'crates', 'name': 'serde', 'version': '1.0.0'}
+    ]}))
+
+    store = ArtifactStore(str(tmp_path / 'store'))
+    outcome = store.warm(parse_lock_file(str(lock)), str(source))
+    assert outcome == {'added': 2, 'cached': 0, 'missing': ['pypi:other==2.0', 'crates:serde==1.0.0']}
+    assert store.warm(parse_lock_file(str(lock))[:1], str(source))['cached'] == 1
+
+    [(sha256, path)] = store.find('pypi', 'demo', '1.0')
+    assert sha256 == file_sha256(wheel)
+    assert os.path.dirname(path) == store.links_dir('pypi')
+    assert os.path.samefile(path, store.get(sha256))
+    assert len(store.find('npm', '@scope/util', '2.0.0')) == 1
+
+    # Adding past the size cap drops the least recently used artifact
+    store.max_size = store.size() + os.path.getsize(other) - 1
+    store.get(sha256)
+    store.add(other)
+    assert store.find('npm', '@scope/util', '2.0.0') == []
+    assert len(store.find('pypi', 'demo', '1.0')) == 1
+    assert len(store.find('pypi', 'other', '2.0')) == 1
+    store.close()
+
+def make_crate(directory, name, version, manifest=''):
+    path = os.path.join(directory, f'{name}-{version}.crate')
+    content = f'[package]\nname = "{name}"\nversion = "{version}"\n{manifest}'.encode()
+    with tarfile.open(path, 'w:gz') as crate:
+        info = tarfile.TarInfo(f'{name}-{version}/Cargo.toml')
+        info.size = len(content)
+        crate.addfile(info, io.BytesIO(content))
+    return path
+
+def test_crates_registry_index(tmp_path):
+    """
+    Test that stored crates are indexed as a Cargo local registry.
+    """
+    store = ArtifactStore(str(tmp_path / 'store'))
+    crate = make_crate(str(tmp_path), 'serde_json', '1.0.108', (
+        '[dependencies.serde]\nversion = "^1.0.100"\n'
+        '[dependencies.indexmap]\nversion = "^2"\noptional = true\n'
+        '[target."cfg(unix)".dependencies]\nrand = "0.8"\n'
+        '[features]\ndefault = ["std"]\nstd = ["serde/std"]\npreserve_order = ["dep:indexmap"]\n'
+    ))
+    store.add(crate)
+    store.add(make_crate(str(tmp_path), 'syn', '2.0.0'))
+
+    registry = store.crates_registry()
+    assert os.path.isfile(os.path.join(registry, 'serde_json-1.0.108.crate'))
+    assert os.path.isfile(os.path.join(registry, 'index', '3', 's', 'syn'))
+    with open(os.path.join(registry, 'index', 'se', 'rd', 'serde_json')) as f:
+        [entry] = [json.loads(line) for line in f]
+    assert entry['name'] == 'serde_json' and entry['vers'] == '1.0.108' and entry['cksum'] == file_sha256(crate)
+    assert [(dep['name'], dep['req'], dep['optional'], dep['target']) for dep in entry['deps']] == [
+        ('indexmap', '^2', True, None), ('serde', '^1.0.100', False, None), ('rand', '0.8', False, 'cfg(unix)')
+    ]
+    assert entry['features'] == {'default': ['std'], 'std': ['serde/std']}
+    assert entry['features2'] == {'preserve_order': ['dep:indexmap']} and entry['v'] == 2
+    store.close()
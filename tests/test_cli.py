@@ -0,0 +1,176 @@
+import io
+import os
+import json
+import shutil
+import subprocess
+import tempfile
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+
+from cli import PolyDependCLI
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../src'))
+
+# Wall-clock budget for importing the CLI and printing --help, in seconds
+HELP_IMPORT_BUDGET = 0.5
+
+HEAVY_MODULES = [
+    'pkg_resources',
+    'packaging',
+    'toml',
+    'xml.etree.ElementTree',
+    'concurrent.futures.process',
+]
+
+def create_mixed_project():
+    """
+    Create a temporary project with Rust and JavaScript sources.
+    """
+    temp_dir = tempfile.mkdtemp()
+    with open(os.path.join(temp_dir, 'Cargo.toml'), 'w') as f:
+        f.write('[dependencies]\nserde = "1.0"\n\n[dev-dependencies]\nserde = "2.0"\n')
+    with open(os.path.join(temp_dir, 'main.rs'), 'w') as f:
+        f.write('use std::fs;\nuse serde::Serialize;\n')
+    with open(os.path.join(temp_dir, 'index.js'), 'w') as f:
+        f.write("const _ = require('lodash');\n")
+    return temp_dir
+
+def test_ndjson_streams_one_record_per_line():
+    """
+    Test that streamed records cover dependencies, imports and conflicts.
+    """
+    project_path = create_mixed_project()
+
+    try:
+        stream = io.StringIO()
+        PolyDependCLI().stream_results(project_path, stream=stream)
+        records = [json.loads(line) for line in stream.getvalue().splitlines()]
+
+        rust = [r for r in records if r['language'] == 'rust']
+        assert [r['kind'] for r in rust if r['kind'] == 'dependency'] == ['dependency', 'dependency']
+        assert {r['name'] for r in rust if r['kind'] == 'import'} == {'std', 'serde'}
+        assert [r['name'] for r in rust if r['kind'] == 'conflict'] == ['serde']
+
+        javascript = [r for r in records if r['language'] == 'javascript']
+        assert javascript == [{
+            'language': 'javascript',
+            'kind': 'import',
+            'name': 'lodash',
+            'source': os.path.join(project_path, 'index.js'),
+            'type': 'import',
+            'count': 1
+        }]
+    finally:
+        shutil.rmtree(project_path)
+
+class FailingAnalyzer:
+    source_extensions = ('.js',)
+    manifest_names = ()
+    cache = None
+
+    def analyze_dependencies(self, project_path, file_index=None):
+        raise RuntimeError('analyzer failed')
+
+def test_concurrent_analysis_matches_sequential():
+    """
+    Test that running analyzers in parallel keeps results, order and error isolation.
+    """
+    project_path = create_mixed_project()
+
+    try:
+        sequential = PolyDependCLI(jobs=1).analyze_project(project_path)
+        concurrent_cli = PolyDependCLI(jobs=4)
+        concurrent = concurrent_cli.analyze_project(project_path)
+        assert list(concurrent) == list(sequential)
+        assert concurrent == sequential
+
+        concurrent_cli.analyzers['javascript'] = FailingAnalyzer()
+        results = concurrent_cli.analyze_project(project_path)
+        assert results['javascript'] == {'error': 'analyzer failed'}
+        assert results['rust'] == sequential['rust']
+    finally:
+        shutil.rmtree(project_path)
+
+def test_detection_runs_only_analyzers_with_evidence():
+    """
+    Test that analyzers without manifests or sources in the project are skipped.
+    """
+    project_path = create_mixed_project()
+    # Deeper than the bounded detection walk reaches
+    deep_dir = os.path.join(project_path, 'a', 'b', 'c', 'd', 'e')
+    os.makedirs(deep_dir)
+
+    try:
+        cli = PolyDependCLI()
+        results = cli.analyze_project(project_path)
+        assert cli.detected_ecosystems == ['javascript', 'rust']
+        assert list(results) == ['javascript', 'rust']
+
+        with open(os.path.join(deep_dir, 'App.java'), 'w') as f:
+            f.write('import java.util.List;\n')
+        results = cli.analyze_project(project_path)
+        assert cli.detected_ecosystems == ['javascript', 'java', 'rust']
+        assert list(results) == ['javascript', 'java', 'rust']
+
+        cli = PolyDependCLI(detect=False)
+        results = cli.analyze_project(project_path)
+        assert cli.detected_ecosystems is None
+        assert list(results) == ['python', 'javascript', 'java', 'rust']
+    finally:
+        shutil.rmtree(project_path)
+
+def test_json_output_reports_detection_beside_results(capsys):
+    """
+    Test that detected ecosystems are a top-level field, not a language entry.
+    """
+    results = {'rust': {'dependencies': [], 'conflicts': []}}
+    PolyDependCLI().output_results(results, 'json', ['rust'])
+    assert json.loads(capsys.readouterr().out) == {'detected_ecosystems': ['rust'], 'results': results}
+
+    PolyDependCLI().output_results(results, 'json')
+    assert json.loads(capsys.readouterr().out) == results
+
+def test_default_json_output_keeps_language_keys(capsys, monkeypatch):
+    """
+    Test that the CLI's JSON has one key per language unless detection is asked for.
+    """
+    import cli
+
+    project_path = create_mixed_project()
+    try:
+        monkeypatch.setattr(sys, 'argv', ['polydepend-cli', project_path])
+        cli.main()
+        assert list(json.loads(capsys.readouterr().out)) == ['javascript', 'rust']
+
+        monkeypatch.setattr(sys, 'argv', ['polydepend-cli', project_path, '--show-detected'])
+        cli.main()
+        output = json.loads(capsys.readouterr().out)
+        assert output['detected_ecosystems'] == ['javascript', 'rust']
+        assert list(output['results']) == ['javascript', 'rust']
+    finally:
+        shutil.rmtree(project_path)
+
+def test_help_stays_within_import_budget():
+    """
+    Test that `polydepend-cli --help` starts fast and loads no heavy modules.
+    """
+    script = (
+        'import json, sys, time\n'
+        f'sys.path.insert(0, {SRC_DIR!r})\n'
+        'start = time.perf_counter()\n'
+        'import cli\n'
+        'sys.argv = ["polydepend-cli", "--help"]\n'
+        'try:\n'
+        '    cli.main()\n'
+        'except SystemExit:\n'
+        '    pass\n'
+        'elapsed = time.perf_counter() - start\n'
+        f'loaded = [name for name in {HEAVY_MODULES!r} if name in sys.modules]\n'
+        'sys.stderr.write(json.dumps({"elapsed": elapsed, "loaded": loaded}))\n'
+    )
+    completed = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True)
+    report = json.loads(completed.stderr)
+
+    assert report['loaded'] == []
+    assert report['elapsed'] < HELP_IMPORT_BUDGET
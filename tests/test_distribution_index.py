@@ -0,0 +1,62 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+
+from analyzer import PythonDependencyAnalyzer
+from distribution_index import DistributionIndex
+from resolver.resolver_engine import DependencyResolver
+
+def install_fake(site_packages, name, version, requires=(), top_level=None, files=()):
+    """
+    Write the metadata of a distribution the way pip lays it out.
+    """
+    dist_info = os.path.join(site_packages, f"{name.replace('-', '_')}-{version}.dist-info")
+    os.makedirs(dist_info)
+    with open(os.path.join(dist_info, 'METADATA'), 'w') as f:
+        f.write(f'Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n')
+        for requirement in requires:
+            f.write(f'Requires-Dist: {requirement}\n')
+    if top_level is not None:
+        with open(os.path.join(dist_info, 'top_level.txt'), 'w') as f:
+            f.write('\n'.join(top_level) + '\n')
+    with open(os.path.join(dist_info, 'RECORD'), 'w') as f:
+        f.write(''.join(f'{path},,\n' for path in files))
+
+def test_index_of_target_environment(tmp_path):
+    """
+    Test lookups by name and import name in a venv other than the running one.
+    """
+    site_packages = tmp_path / 'venv' / 'lib' / 'python3.11' / 'site-packages'
+    site_packages.mkdir(parents=True)
+    install_fake(str(site_packages), 'PyYAML', '6.0.1', top_level=['_yaml', 'yaml'])
+    install_fake(
+        str(site_packages), 'requests', '2.31.0',
+        requires=['idna<4,>=2.5', 'PySocks!=1.5.7,>=1.5.6; extra == "socks"'],
+        files=['requests/__init__.py', 'requests-2.31.0.dist-info/METADATA']
+    )
+    install_fake(str(site_packages), 'idna', '3.6', files=['idna/__init__.py'])
+
+    index = DistributionIndex.for_environment(str(tmp_path / 'venv'))
+    assert len(index) == 3
+    assert index.get('pyyaml').version == '6.0.1'
+    assert index.find('yaml').name == 'PyYAML'
+    assert [dist.name for dist in index.distributions_for_import('requests.adapters')] == ['requests']
+    assert DistributionIndex.for_environment(str(tmp_path / 'venv')) is index
+
+    analyzer = PythonDependencyAnalyzer(environment=str(tmp_path / 'venv'))
+    info = analyzer.get_dependency_info(['requests', 'yaml', 'missing'])
+    assert info['requests']['requires'] == ['idna']
+    assert info['yaml']['distribution'] == 'PyYAML'
+    assert info['missing'] == {'status': 'Not installed'}
+
+    resolver = DependencyResolver(environment=str(tmp_path / 'venv'))
+    assert resolver.resolve_version_conflicts(['requests']) == {'idna': '3.6', 'requests': '2.31.0'}
+    assert resolver.check_compatibility({'requests': '2.31.0', 'idna': '4.0'}) == [
+        'Potential conflict: requests requires idna<4,>=2.5, but resolved version is 4.0'
+    ]
+
+    # Installing a distribution changes the directory's mtime
+    install_fake(str(site_packages), 'idna-ssl', '1.1.0')
+    os.utime(str(site_packages), ns=(0, os.stat(str(site_packages)).st_mtime_ns + 1))
+    assert 'idna_ssl' in DistributionIndex.for_environment(str(tmp_path / 'venv'))
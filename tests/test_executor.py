@@ -0,0 +1,55 @@
+import asyncio
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+
+from fetcher.executor import NOT_FOUND_RETURNCODE, AsyncExecutor
+
+def python(code):
+    return [sys.executable, '-c', code]
+
+def test_output_is_streamed_and_collected():
+    """
+    Test that lines reach the callback as they are written, and the result holds all output.
+    """
+    lines = []
+    result = AsyncExecutor().run_sync(
+        python("import sys\nprint('one')\nprint('two', file=sys.stderr)\nsys.stdout.write('three')"),
+        callback=lambda stream, line: lines.append((stream, line))
+    )
+    assert result.success
+    assert result.stdout.splitlines() == ['one', 'three']
+    assert result.stderr.strip() == 'two'
+    assert sorted(lines) == [('stderr', 'two'), ('stdout', 'one'), ('stdout', 'three')]
+
+def test_timeout_and_missing_program():
+    """
+    Test that a command running too long is killed and a missing program is reported.
+    """
+    executor = AsyncExecutor(timeout=0.5)
+    result = executor.run_sync(python("print('started', flush=True)\nimport time\ntime.sleep(30)"))
+    assert result.timed_out and not result.success
+    assert result.stdout.strip() == 'started'
+    assert result.duration < 10
+
+    missing = executor.run_sync(['polydepend-no-such-tool'])
+    assert missing.returncode == NOT_FOUND_RETURNCODE and not missing.success
+
+def test_concurrency_limit_and_tool_locks():
+    """
+    Test that commands run concurrently up to the limit, except those sharing a lock.
+    """
+    executor = AsyncExecutor(max_concurrency=4)
+    sleep = python('import time; time.sleep(0.4)')
+
+    async def timed(locks):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        results = await asyncio.gather(*(executor.run(sleep, lock=lock) for lock in locks))
+        assert all(result.success for result in results)
+        return loop.time() - start
+
+    # Four independent tools at once, then two commands on one venv in turn
+    assert asyncio.run(timed(['pip', 'npm', 'cargo', 'mvn'])) < 1.2
+    assert asyncio.run(timed([('pip', 'venv'), ('pip', 'venv')])) >= 0.8
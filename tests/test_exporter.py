@@ -0,0 +1,84 @@
+import json
+import os
+import sys
+import zipfile
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+
+from fetcher.artifact_store import ArtifactStore, parse_lock_file
+from fetcher.exporter import format_requirements, scan_environment
+from fetcher.fetcher import DependencyFetcher
+
+def install_fake(site_packages, name, version, direct_url=None, requires=()):
+    """
+    Write the metadata pip leaves in site-packages for an installed distribution.
+    """
+    dist_info = os.path.join(site_packages, f"{name.replace('-', '_')}-{version}.dist-info")
+    os.makedirs(dist_info)
+    with open(os.path.join(dist_info, 'METADATA'), 'w') as f:
+        f.write(f'Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n')
+        f.write(''.join(f'Requires-Dist: {requirement}\n' for requirement in requires))
+        f.write('\nName: not-a-header\n')
+    if direct_url is not None:
+        with open(os.path.join(dist_info, 'direct_url.json'), 'w') as f:
+            json.dump(direct_url, f)
+
+@pytest.fixture
+def venv_path(tmp_path):
+    site_packages = tmp_path / 'venv' / 'lib' / 'python3.11' / 'site-packages'
+    site_packages.mkdir(parents=True)
+    install_fake(str(site_packages), 'requests', '2.31.0', requires=['idna<4,>=2.5'])
+    install_fake(str(site_packages), 'PyYAML', '6.0.1')
+    install_fake(str(site_packages), 'pip', '23.2.1')
+    install_fake(str(site_packages), 'mylib', '0.1', {'url': 'file:///src/mylib', 'dir_info': {'editable': True}})
+    install_fake(str(site_packages), 'tool', '1.0', {
+        'url': 'https://github.com/org/tool.git',
+        'vcs_info': {'vcs': 'git', 'commit_id': 'abc123'}
+    })
+    install_fake(str(site_packages), 'pkg', '2.0', {
+        'url': 'https://example.com/pkg-2.0-py3-none-any.whl',
+        'archive_info': {'hashes': {'sha256': 'b' * 64}}
+    })
+    return str(tmp_path / 'venv')
+
+def test_freeze_format(venv_path):
+    """
+    Test that the export matches pip freeze, including direct URL and editable installs.
+    """
+    assert format_requirements(scan_environment(venv_path)) == (
+        '# Editable install with no version control (mylib==0.1)\n'
+        '-e /src/mylib\n'
+        'pkg @ https://example.com/pkg-2.0-py3-none-any.whl\n'
+        'PyYAML==6.0.1\n'
+        'requests==2.31.0\n'
+        'tool @ git+https://github.com/org/tool.git@abc123\n'
+    )
+    assert 'pip==23.2.1\n' in format_requirements(scan_environment(venv_path), include_all=True)
+
+def test_hashed_and_json_formats(venv_path, tmp_path):
+    """
+    Test hash pins from direct_url.json and an artifact store, and the JSON lock.
+    """
+    store = ArtifactStore(str(tmp_path / 'store'))
+    wheel = tmp_path / 'requests-2.31.0-py3-none-any.whl'
+    with zipfile.ZipFile(wheel, 'w') as archive:
+        archive.writestr('requests-2.31.0.dist-info/METADATA', 'Name: requests\nVersion: 2.31.0\n')
+    digest = store.add(str(wheel))
+
+    dists = [dist for dist in scan_environment(venv_path) if dist.name in ('pkg', 'requests')]
+    assert format_requirements(dists, 'hashes', store) == (
+        f'pkg @ https://example.com/pkg-2.0-py3-none-any.whl \\\n    --hash=sha256:{"b" * 64}\n'
+        f'requests==2.31.0 \\\n    --hash=sha256:{digest}\n'
+    )
+    with pytest.raises(ValueError):
+        format_requirements(scan_environment(venv_path), 'hashes', store)
+
+    # The JSON lock can warm an artifact store
+    output = DependencyFetcher.export_requirements(venv_path, str(tmp_path / 'lock.json'), 'json', store)
+    with open(output) as f:
+        lock = json.load(f)
+    requests = next(package for package in lock['packages'] if package['name'] == 'requests')
+    assert requests['hashes'] == [f'sha256:{digest}'] and requests['requires'] == ['idna<4,>=2.5']
+    assert ('pypi', 'requests', '2.31.0', (digest,)) in [tuple(locked) for locked in parse_lock_file(output)]
+    store.close()
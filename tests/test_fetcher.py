@@ -0,0 +1,278 @@
+import io
+import json
+import os
+import shutil
+import stat
+import sys
+import tarfile
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+
+from fetcher.artifact_store import ArtifactStore
+from fetcher.fetcher import DependencyFetcher
+from fetcher.venv_pool import VenvPool
+
+# Stands in for pip: fails on requirements starting with 'bad', logs every call
+FAKE_PIP = '''#!{python}
+import json, sys
+args = sys.argv[1:]
+with open({log!r}, 'a') as f:
+    f.write(json.dumps(args) + '\\n')
+requirements = [arg for arg in args[1:] if not arg.startswith('-') and not arg.endswith(('.json', '.txt'))]
+if any(requirement.startswith('bad') for requirement in requirements):
+    sys.stderr.write('ERROR: No matching distribution\\n')
+    sys.exit(1)
+if '--report' in args:
+    install = [{{'metadata': {{'name': r, 'version': '1.0'}}, 'requested': True}} for r in requirements]
+    with open(args[args.index('--report') + 1], 'w') as f:
+        json.dump({{'install': install}}, f)
+'''
+
+@pytest.fixture
+def fake_venv(tmp_path):
+    bin_dir = tmp_path / 'venv' / ('Scripts' if sys.platform == 'win32' else 'bin')
+    bin_dir.mkdir(parents=True)
+    pip = bin_dir / 'pip'
+    pip.write_text(FAKE_PIP.format(python=sys.executable, log=str(tmp_path / 'calls.log')))
+    pip.chmod(pip.stat().st_mode | stat.S_IEXEC)
+    return tmp_path
+
+def calls(fake_venv):
+    with open(fake_venv / 'calls.log') as f:
+        return [json.loads(line) for line in f]
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='fake pip is a POSIX script')
+def test_batched_install_uses_one_pip_invocation(fake_venv):
+    """
+    Test that a good batch is installed at once, with a constraints file.
+    """
+    venv_path = str(fake_venv / 'venv')
+    outcome = DependencyFetcher.install_batch(['requests', 'idna'], venv_path, constraints={'idna': '3.6'})
+    assert outcome == {
+        'success': True,
+        'installed': {'requests': '1.0', 'idna': '1.0'},
+        'packages': {'requests': '1.0', 'idna': '1.0'},
+        'error': ''
+    }
+
+    results = DependencyFetcher.install_dependencies(['requests', 'idna'], venv_path)
+    assert results == {'requests': True, 'idna': True}
+    assert len(calls(fake_venv)) == 2
+    assert '--constraint' in calls(fake_venv)[0]
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='fake pip is a POSIX script')
+def test_failed_batch_is_bisected(fake_venv):
+    """
+    Test that only the failing requirement is reported when a batch fails.
+    """
+    venv_path = str(fake_venv / 'venv')
+    details = {}
+    lines = []
+    results = DependencyFetcher.install_dependencies(
+        ['a', 'b', 'bad-pkg', 'c'], venv_path, details=details, callback=lambda stream, line: lines.append(line)
+    )
+    assert results == {'a': True, 'b': True, 'bad-pkg': False, 'c': True}
+    # Per-package outcomes come from pip's report
+    assert details['a'] == {'success': True, 'version': '1.0', 'error': ''}
+    assert not details['bad-pkg']['success'] and 'No matching distribution' in details['bad-pkg']['error']
+    assert 'Failed to install bad-pkg' in lines
+    # Whole batch, then [a, b] and [bad-pkg, c], then each of the latter
+    assert len(calls(fake_venv)) == 5
+
+def fake_installer(installed):
+    """
+    Installer that records its calls and writes a marker module per requirement.
+    """
+    def install(missing, path):
+        installed.append(list(missing))
+        for requirement in missing:
+            with open(os.path.join(path, f'{requirement}.marker'), 'w') as f:
+                f.write(requirement)
+        return [requirement for requirement in missing if not requirement.startswith('bad')]
+    return install
+
+def test_venv_pool_reuses_and_clones(tmp_path):
+    """
+    Test reuse on an identical key, cloning from the closest venv and eviction.
+    """
+    pool = VenvPool(str(tmp_path / 'pool'), max_entries=3, with_pip=False)
+    installed = []
+
+    base = pool.acquire()
+    first = pool.acquire(['Requests>=2', 'idna'], installer=fake_installer(installed))
+    assert pool.acquire(['idna', 'requests >= 2'], installer=fake_installer(installed)) == first
+    assert installed == [['idna', 'requests>=2']]
+
+    second = pool.acquire(['idna', 'requests>=2', 'six'], installer=fake_installer(installed))
+    assert installed[-1] == ['six']
+    # Unchanged files are hardlinked; scripts point at the clone
+    assert os.stat(os.path.join(first, 'idna.marker')).st_ino == os.stat(os.path.join(second, 'idna.marker')).st_ino
+    if sys.platform != 'win32':
+        with open(os.path.join(second, 'bin', 'activate')) as f:
+            activate = f.read()
+        assert second in activate and first not in activate
+    assert os.path.isdir(base)
+
+    # A failed requirement is not part of the pooled venv's key
+    third = pool.acquire(['six', 'bad-pkg'], installer=fake_installer(installed))
+    assert pool.acquire(['six'], installer=fake_installer(installed)) == third
+
+    # Four venvs now exist; the least recently used one is gone, while the
+    # bare venv was just cloned from and stays
+    assert not os.path.exists(first)
+    assert os.path.isdir(base) and os.path.isdir(second) and os.path.isdir(third)
+
+    # Refreshing reinstalls everything instead of reusing the pooled venv
+    refreshed = pool.acquire(['six'], installer=fake_installer(installed), refresh=True)
+    assert refreshed != third and installed[-1] == ['six'] and not os.path.exists(third)
+    assert pool.acquire(['six']) == refreshed
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='fake pip is a POSIX script')
+def test_new_venvs_are_cloned_from_the_pool(fake_venv, monkeypatch):
+    """
+    Test that new venvs are private clones, pooled by resolved pins.
+    """
+    pool = VenvPool(str(fake_venv / 'pool'), with_pip=False)
+    base = pool.acquire()
+    os.link(fake_venv / 'venv' / 'bin' / 'pip', os.path.join(base, 'bin', 'pip'))
+    monkeypatch.chdir(fake_venv)
+
+    created = DependencyFetcher.create_virtual_environment(pool=pool)
+    assert created == str(fake_venv / 'polydepend_venv') and os.path.isdir(created) and created != base
+
+    pins = ['idna==3.6', 'requests==2.31.0']
+    monkeypatch.setattr(DependencyFetcher, 'resolve_pins', classmethod(lambda cls, *args: pins))
+    details = {}
+    first = str(fake_venv / 'first')
+    assert DependencyFetcher.install_dependencies(['Requests>=2'], first, pool=pool, details=details) == {
+        'Requests>=2': True
+    }
+    assert details['Requests>=2']['version'] == '2.31.0'
+    assert calls(fake_venv)[-1][-2:] == pins
+
+    # Same pins: the pooled venv is copied without running pip, unless upgrading
+    DependencyFetcher.install_dependencies(['requests'], str(fake_venv / 'second'), pool=pool)
+    assert len(calls(fake_venv)) == 1
+    DependencyFetcher.install_dependencies(['requests'], str(fake_venv / 'third'), upgrade=True, pool=pool)
+    assert len(calls(fake_venv)) == 2 and '--upgrade' in calls(fake_venv)[-1]
+    assert os.path.isdir(first) and os.path.isdir(fake_venv / 'second') and os.path.isdir(fake_venv / 'third')
+
+    # Unresolvable sets are installed into a clone of the bare venv directly
+    monkeypatch.setattr(DependencyFetcher, 'resolve_pins', classmethod(lambda cls, *args: None))
+    results = DependencyFetcher.install_dependencies(['six', 'bad-pkg'], str(fake_venv / 'fourth'), pool=pool)
+    assert results == {'six': True, 'bad-pkg': False}
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='fake pip is a POSIX script')
+def test_offline_install_uses_artifact_store(fake_venv):
+    """
+    Test that installs from an artifact store never reach the package index.
+    """
+    store = ArtifactStore(str(fake_venv / 'store'))
+    results = DependencyFetcher.install_dependencies(['requests'], str(fake_venv / 'venv'), artifact_store=store)
+    assert results == {'requests': True}
+    [call] = calls(fake_venv)
+    assert call[call.index('--find-links') + 1] == store.links_dir('pypi')
+    assert '--no-index' in call
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='fake tools are POSIX scripts')
+def test_ecosystems_install_concurrently(fake_venv, monkeypatch):
+    """
+    Test that each language's package manager runs, with output streamed per language.
+    """
+    tools = fake_venv / 'tools'
+    tools.mkdir()
+    for tool, code in (('npm', 0), ('cargo', 101)):
+        script = tools / tool
+        script.write_text(f'#!/bin/sh\necho "{tool} $*"\nexit {code}\n')
+        script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv('PATH', f"{tools}{os.pathsep}{os.environ['PATH']}")
+
+    lines = []
+    results = DependencyFetcher.install_concurrently(
+        {'python': ['requests'], 'javascript': ['lodash@4'], 'rust': ['serde']},
+        venv_path=str(fake_venv / 'venv'),
+        project_path=str(fake_venv),
+        callback=lambda stream, line: lines.append(line)
+    )
+    assert results == {'python': {'requests': True}, 'javascript': {'lodash@4': True}, 'rust': {'serde': False}}
+    assert '[javascript] npm install --no-audit --no-fund lodash@4' in lines
+    assert '[rust] cargo add serde' in lines
+    assert '[rust] Failed to install rust dependencies' in lines
+
+    with pytest.raises(ValueError):
+        DependencyFetcher.install_concurrently({'python': ['requests']})
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='fake pip is a POSIX script')
+def test_concurrent_install_creates_missing_venv(fake_venv, monkeypatch):
+    """
+    Test that a missing venv is created before pip runs, and failures say why.
+    """
+    created = []
+
+    def create(cls, path=None, pool=None):
+        created.append(path)
+        shutil.copytree(fake_venv / 'venv', path)
+        return path
+
+    monkeypatch.setattr(DependencyFetcher, 'create_virtual_environment', classmethod(create))
+    empty = fake_venv / 'empty'
+    empty.mkdir()
+    monkeypatch.setenv('PATH', str(empty))
+
+    lines = []
+    venv_path = str(fake_venv / 'missing')
+    results = DependencyFetcher.install_concurrently(
+        {'python': ['six'], 'javascript': ['lodash@4']},
+        venv_path=venv_path,
+        project_path=str(fake_venv),
+        callback=lambda stream, line: lines.append(line)
+    )
+    assert results == {'python': {'six': True}, 'javascript': {'lodash@4': False}}
+    assert created == [venv_path]
+    [failure] = [line for line in lines if 'Failed to install' in line]
+    assert failure.startswith('[javascript] Failed to install javascript dependencies: ') and 'npm' in failure
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='fake tools are POSIX scripts')
+def test_concurrent_installs_use_artifact_store(fake_venv, monkeypatch):
+    """
+    Test that npm installs stored tarballs and cargo uses the store's registry, both offline.
+    """
+    tools = fake_venv / 'tools'
+    tools.mkdir()
+    for tool in ('npm', 'cargo'):
+        script = tools / tool
+        script.write_text(f'#!/bin/sh\necho "{tool} $*"\n')
+        script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv('PATH', f"{tools}{os.pathsep}{os.environ['PATH']}")
+
+    manifest = json.dumps({'name': '@scope/util', 'version': '2.0.0'}).encode()
+    tarball = fake_venv / 'util-2.0.0.tgz'
+    with tarfile.open(tarball, 'w:gz') as archive:
+        info = tarfile.TarInfo('package/package.json')
+        info.size = len(manifest)
+        archive.addfile(info, io.BytesIO(manifest))
+    store = ArtifactStore(str(fake_venv / 'store'))
+    store.add(str(tarball))
+    [(_, stored)] = store.find('npm', '@scope/util', '2.0.0')
+
+    lines = []
+    results = DependencyFetcher.install_concurrently(
+        {'python': ['requests'], 'javascript': ['@scope/util@2.0.0', 'lodash@^4'], 'rust': ['serde@1.0.0']},
+        venv_path=str(fake_venv / 'venv'),
+        project_path=str(fake_venv),
+        callback=lambda stream, line: lines.append(line),
+        artifact_store=store
+    )
+    assert results == {
+        'python': {'requests': True},
+        'javascript': {'@scope/util@2.0.0': True, 'lodash@^4': False},
+        'rust': {'serde@1.0.0': True}
+    }
+    assert '--no-index' in calls(fake_venv)[0]
+    assert f'[javascript] npm install --offline --no-audit --no-fund {stored}' in lines
+    assert '[javascript] No stored tarball for lodash@^4' in lines
+    [cargo] = [line for line in lines if line.startswith('[rust] cargo')]
+    assert cargo.startswith('[rust] cargo --offline --config') and cargo.endswith(' add serde@1.0.0')
+    assert f'local-registry = "{store.crates_registry()}"' in cargo
+    store.close()
@@ -0,0 +1,115 @@
+import io
+import json
+import os
+import sys
+import tarfile
+import time
+import zipfile
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+
+from resolver.metadata_store import MetadataStore, PackageRecord
+from resolver.providers import OfflineMetadataProvider
+from resolver.resolver_engine import DependencyResolver
+
+def write_wheel(directory, name, version, requires=()):
+    metadata = f'Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n'
+    metadata += ''.join(f'Requires-Dist: {requirement}\n' for requirement in requires)
+    path = os.path.join(directory, f'{name}-{version}-py3-none-any.whl')
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr(f'{name}/__init__.py', '')
+        archive.writestr(f'{name}-{version}.dist-info/METADATA', metadata)
+    return path
+
+def write_tarball(path, files):
+    with tarfile.open(path, 'w:gz') as archive:
+        for name, text in files.items():
+            data = text.encode('utf-8')
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+
+def test_import_local_artifacts_and_resolve_offline(tmp_path):
+    """
+    Test importing every artifact kind and resolving against the store.
+    """
+    artifacts = tmp_path / 'artifacts'
+    artifacts.mkdir()
+    write_wheel(str(artifacts), 'app', '1.0', ['Web_Lib>=1', 'extra-only; extra == "docs"'])
+    write_wheel(str(artifacts), 'web_lib', '1.0')
+    write_wheel(str(artifacts), 'web_lib', '2.0', ['missing-dep'])
+    write_tarball(str(artifacts / 'oldpkg-0.9.tar.gz'), {
+        'oldpkg-0.9/PKG-INFO': 'Metadata-Version: 1.1\nName: oldpkg\nVersion: 0.9\n',
+        'oldpkg-0.9/oldpkg.egg-info/requires.txt': 'six>=1.0\n\n[test]\npytest\n',
+    })
+    write_tarball(str(artifacts / 'left-pad-1.3.0.tgz'), {
+        'package/package.json': json.dumps({
+            'name': 'left-pad', 'version': '1.3.0', 'dependencies': {'lodash': '^4.17.0'}
+        }),
+    })
+    write_tarball(str(artifacts / 'serde_json-1.0.100.crate'), {
+        'serde_json-1.0.100/Cargo.toml': (
+            '[package]\nname = "serde_json"\nversion = "1.0.100"\n'
+            '[dependencies]\nserde = { version = "1.0.100" }\nitoa = "1.0"\n'
+            'indexmap = { version = "2", optional = true }\n'
+        ),
+    })
+    (artifacts / 'broken.whl').write_bytes(b'not a zip')
+
+    errors = []
+    with MetadataStore(str(tmp_path / 'store' / 'metadata.sqlite3')) as store:
+        assert store.import_archives(str(artifacts), errors) == 6
+        assert [error['source'] for error in errors] == [str(artifacts / 'broken.whl')]
+
+        assert store.requires('pypi', 'oldpkg', '0.9') == ['six>=1.0']
+        assert store.requires('npm', 'left-pad', '1.3.0') == ['lodash@^4.17.0']
+        assert store.requires('crates', 'serde-json', '1.0.100') == ['itoa@1.0', 'serde@1.0.100']
+        assert sorted(store.versions('pypi', 'Web.Lib')) == ['1.0', '2.0']
+
+        resolver = DependencyResolver(OfflineMetadataProvider(store))
+        # web_lib 2.0 needs a package the store does not have
+        assert resolver.resolve_version_conflicts(['app']) == {'app': '1.0', 'web-lib': '1.0'}
+
+        start = time.perf_counter()
+        for _ in range(1000):
+            store.versions('pypi', 'web-lib')
+        assert (time.perf_counter() - start) / 1000 < 0.001
+
+def test_simple_index_dump_and_snapshot_ids(tmp_path):
+    """
+    Test the simple-index importer and that snapshot ids depend on contents only.
+    """
+    project = tmp_path / 'simple' / 'requests'
+    project.mkdir(parents=True)
+    (project / 'index.html').write_text(
+        '<html><body>'
+        '<a href="../../packages/requests-2.31.0-py3-none-any.whl#sha256=00">requests-2.31.0-py3-none-any.whl</a>'
+        '<a href="../../packages/requests-2.31.0.tar.gz#sha256=11">requests-2.31.0.tar.gz</a>'
+        '<a href="https://files.example/requests-2.30.0.tar.gz">requests-2.30.0.tar.gz</a>'
+        '</body></html>'
+    )
+    packages = tmp_path / 'packages'
+    packages.mkdir()
+    (packages / 'requests-2.31.0-py3-none-any.whl.metadata').write_text(
+        'Metadata-Version: 2.1\nName: requests\nVersion: 2.31.0\nRequires-Dist: idna<4,>=2.5\n'
+    )
+
+    first = MetadataStore(str(tmp_path / 'first.sqlite3'))
+    assert first.import_simple_index(str(tmp_path / 'simple')) == 2
+    assert sorted(first.versions('pypi', 'requests')) == ['2.30.0', '2.31.0']
+    assert first.requires('pypi', 'requests', '2.31.0') == ['idna<4,>=2.5']
+    assert first.requires('pypi', 'requests', '2.30.0') is None
+
+    records = [
+        PackageRecord('npm', 'react', '18.2.0', ['loose-envify@^1.1.0'], 'a'),
+        PackageRecord('pypi', 'idna', '3.6', [], 'b'),
+    ]
+    before = first.snapshot_id()
+    first.import_records(records)
+    assert first.snapshot_id() != before
+    assert first.import_records(records) == 0
+
+    second = MetadataStore(str(tmp_path / 'second.sqlite3'))
+    second.import_records(reversed(records))
+    second.import_simple_index(str(tmp_path / 'simple'))
+    assert second.snapshot_id() == first.snapshot_id()
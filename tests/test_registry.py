@@ -0,0 +1,103 @@
+import os
+import shutil
+import tempfile
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+
+from analyzer import registry
+from analyzer.registry import AnalyzerSpec, BUILTIN_SPECS, create_analyzer, load_analyzer_specs
+from cli import PolyDependCLI
+
+PLUGIN_SOURCE = '''
+from base_analyzer import BaseAnalyzer
+
+class GoDependencyAnalyzer(BaseAnalyzer):
+    source_extensions = ('.go',)
+    manifest_names = ('go.mod',)
+
+    def analyze_dependencies(self, project_path, file_index=None):
+        file_index = self._get_file_index(project_path, file_index)
+        return {'dependencies': [{'name': path} for path in file_index.files_named('go.mod')]}
+
+    def detect_conflicts(self, dependencies):
+        return []
+'''
+
+class FakeEntryPoint:
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+
+    def load(self):
+        return self.value
+
+class CachelessAnalyzer:
+    """Plugin analyzer whose constructor takes no arguments."""
+    def __init__(self):
+        self.workers = None
+
+    def analyze_dependencies(self, project_path, file_index=None):
+        return {'dependencies': []}
+
+def test_builtin_specs_match_analyzers():
+    """
+    Test that built-in specs route the same files their analyzers read.
+    """
+    for spec in BUILTIN_SPECS:
+        analyzer_class = spec.load()
+        assert spec.manifest_names == analyzer_class.manifest_names
+        assert spec.source_extensions == analyzer_class.source_extensions
+
+def test_plugin_is_imported_only_for_matching_projects():
+    """
+    Test that an entry-point analyzer is routed by its spec and loaded lazily.
+    """
+    plugin_dir = tempfile.mkdtemp()
+    project_path = tempfile.mkdtemp()
+    with open(os.path.join(plugin_dir, 'polydepend_go_plugin.py'), 'w') as f:
+        f.write(PLUGIN_SOURCE)
+    with open(os.path.join(project_path, 'main.py'), 'w') as f:
+        f.write('import os\n')
+
+    spec = {
+        'target': 'polydepend_go_plugin:GoDependencyAnalyzer',
+        'manifest_names': ['go.mod'],
+        'source_extensions': ['.go']
+    }
+    original = registry._iter_entry_points
+    registry._iter_entry_points = lambda group: [FakeEntryPoint('go', spec)]
+    sys.path.insert(0, plugin_dir)
+
+    try:
+        specs = load_analyzer_specs()
+        assert list(specs) == ['python', 'javascript', 'java', 'rust', 'go']
+        assert isinstance(specs['go'], AnalyzerSpec)
+
+        cli = PolyDependCLI()
+        results = cli.analyze_project(project_path)
+        assert cli.detected_ecosystems == ['python']
+        assert 'polydepend_go_plugin' not in sys.modules
+
+        with open(os.path.join(project_path, 'go.mod'), 'w') as f:
+            f.write('module example.com/app\n')
+        results = cli.analyze_project(project_path)
+        assert cli.detected_ecosystems == ['python', 'go']
+        assert results['go'] == {'dependencies': [{'name': os.path.join(project_path, 'go.mod')}]}
+        assert 'polydepend_go_plugin' in sys.modules
+    finally:
+        registry._iter_entry_points = original
+        sys.path.remove(plugin_dir)
+        sys.modules.pop('polydepend_go_plugin', None)
+        shutil.rmtree(plugin_dir)
+        shutil.rmtree(project_path)
+
+def test_create_analyzer_without_cache_argument():
+    """
+    Test that plugin classes whose constructor takes no cache still load.
+    """
+    cache = object()
+    spec = AnalyzerSpec('cacheless', f'{__name__}:CachelessAnalyzer')
+    analyzer = create_analyzer(spec, cache=cache, workers=2)
+    assert isinstance(analyzer, CachelessAnalyzer)
+    assert analyzer.cache is cache and analyzer.workers == 2
@@ -0,0 +1,158 @@
+import os
+import random
+import pytest
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+
+from resolver.providers import InMemoryMetadataProvider
+from resolver.resolution_cache import ResolutionCache, resolution_key
+from resolver.resolver_engine import DependencyResolver
+from resolver.solver import BacktrackingSolver, ResolutionImpossible, parse_requirement
+from version_ranges import version_key
+
+def assert_consistent(provider, requirements, versions):
+    """
+    Check that chosen versions satisfy the root and every transitive requirement.
+    """
+    pending = list(requirements)
+    for name, version in versions.items():
+        pending.extend(provider.get_dependencies(name, version))
+    for requirement in pending:
+        name, version_range = parse_requirement(requirement)
+        assert version_range.contains(version_key('pep440', versions[name])), requirement
+
+def test_resolver_backtracks_over_transitive_conflicts():
+    """
+    Test that a newer version is abandoned when its dependencies cannot be met.
+    """
+    provider = InMemoryMetadataProvider({
+        'app': {'1.0': ['web>=1', 'db>=1']},
+        'web': {'1.0': ['json-lib<2'], '2.0': ['json-lib>=3']},
+        'db': {'1.0': ['json_lib<3'], '1.1': ['json-lib>=2,<3']},
+        'json-lib': {'1.0': [], '2.0': [], '2.5': [], '3.0': []},
+    })
+
+    resolution = BacktrackingSolver(provider).solve(['app'])
+    # web 2.0 needs json-lib>=3 which no db accepts; web 1.0 rules out db 1.1
+    assert resolution.versions == {'app': '1.0', 'db': '1.0', 'json-lib': '1.0', 'web': '1.0'}
+    assert resolution.stats['backjumps'] > 0
+    assert_consistent(provider, ['app'], resolution.versions)
+    assert resolution.stats['elapsed_seconds'] >= resolution.stats['metadata_seconds']
+
+    with pytest.raises(ResolutionImpossible) as excinfo:
+        BacktrackingSolver(provider).solve(['web>=2', 'db'])
+    assert excinfo.value.stats['nogoods'] > 0
+
+def test_resolver_honors_specifiers():
+    """
+    Test that DependencyResolver intersects specifiers instead of sorting strings.
+    """
+    provider = InMemoryMetadataProvider({
+        'requests': {'2.9.0': [], '2.25.1': [], '2.31.0': [], '3.0.0b1': []},
+    })
+    resolver = DependencyResolver(provider)
+
+    assert resolver.resolve_version_conflicts(['requests>=2.9', 'requests<2.31']) == {'requests': '2.25.1'}
+    assert resolver.resolve_version_conflicts(['requests']) == {'requests': '2.31.0'}
+    assert resolver.resolve_version_conflicts(['requests>=3.0.0b1']) == {'requests': '3.0.0b1'}
+
+    report = resolver.resolve_dependencies(['requests>3.0'])
+    assert report['resolved_dependencies'] == {}
+    assert 'requests' in report['compatibility_warnings'][0]
+    assert 'elapsed_seconds' in report['resolution_stats']
+
+def test_pin_fallback_for_requirements_installed_packages_miss():
+    """
+    Test that roots the installed packages can't satisfy resolve to their exact pins.
+    """
+    resolver = DependencyResolver(InMemoryMetadataProvider({
+        'localapp': {'2.0': ['locallib>=1']},
+        'locallib': {'1.5': []}
+    }))
+    # As with the default provider of installed distributions
+    resolver.pin_fallback = True
+
+    report = resolver.resolve_dependencies([
+        'localapp', 'locallib==1.0', 'absent==1.0', 'absent-range<3', 'absent-excluded!=2.0', 'absent-wild==1.*'
+    ])
+    # The conflicting installed pin falls back; everything else still resolves
+    assert report['resolved_dependencies'] == {
+        'localapp': '2.0', 'locallib': '1.0', 'absent': '1.0',
+        'absent-range': '*', 'absent-excluded': '*', 'absent-wild': '*'
+    }
+    assert report['resolution_stats']['pinned'] == [
+        'absent', 'absent-excluded', 'absent-range', 'absent-wild', 'locallib'
+    ]
+    assert any('locallib' in warning for warning in report['compatibility_warnings'])
+
+    # Contradictory requirements leave the package unresolved and say so
+    report = resolver.resolve_dependencies(['absent>=1.0,<2', 'absent==3.0', 'localapp'])
+    assert report['resolved_dependencies'] == {'localapp': '2.0', 'locallib': '1.5'}
+    assert 'Conflicting requirements on absent: absent>=1.0,<2, absent==3.0' in report['compatibility_warnings']
+
+    # Without the fallback an unsatisfiable set is still an error
+    resolver.pin_fallback = False
+    with pytest.raises(ResolutionImpossible):
+        resolver.resolve(['locallib==1.0'])
+
+def test_resolver_scales_to_large_dependency_sets():
+    """
+    Test that a few hundred interdependent packages resolve quickly.
+    """
+    rng = random.Random(1)
+    index = {}
+    for i in range(300):
+        index[f'pkg{i}'] = {}
+        for v in range(30):
+            requirements = []
+            for _ in range(rng.randint(0, 4)):
+                if i == 299:
+                    break
+                lower = rng.randint(0, 29)
+                upper = lower + rng.randint(1, 12)
+                requirements.append(f'pkg{rng.randint(i + 1, 299)}>={lower}.0,<{upper}.0')
+            index[f'pkg{i}'][f'{v}.0'] = requirements
+    provider = InMemoryMetadataProvider(index)
+    requirements = [f'pkg{i}' for i in range(40)]
+
+    resolution = BacktrackingSolver(provider).solve(requirements)
+    assert_consistent(provider, requirements, resolution.versions)
+    assert resolution.stats['elapsed_seconds'] < 5
+
+def test_resolution_cache_hits_on_equivalent_requirements(tmp_path):
+    """
+    Test that reports are reused until the requirements or the metadata change.
+    """
+    provider = InMemoryMetadataProvider({
+        'requests': {'2.25.1': ['idna<3'], '2.31.0': ['idna>=2.5,<4']},
+        'idna': {'2.10': [], '3.6': []},
+    })
+    resolver = DependencyResolver(provider, cache=ResolutionCache(str(tmp_path)))
+
+    first = resolver.resolve_dependencies(['Requests >= 2.25', 'idna'])
+    assert first['resolved_dependencies'] == {'idna': '3.6', 'requests': '2.31.0'}
+    assert 'cache_hit' not in first['resolution_stats']
+
+    again = resolver.resolve_dependencies(['idna', 'requests>=2.25'])
+    assert again['resolved_dependencies'] == first['resolved_dependencies']
+    assert again['resolution_stats']['cache_hit'] is True
+
+    provider.add('idna', '3.7')
+    assert resolver.resolve_dependencies(['idna', 'requests>=2.25'])['resolved_dependencies']['idna'] == '3.7'
+    assert resolver.cache.hits == 1
+
+def test_resolution_cache_eviction(tmp_path):
+    """
+    Test eviction by age and by total size.
+    """
+    cache = ResolutionCache(str(tmp_path), max_size=150, max_age=3600)
+    report = {'resolved_dependencies': {'pkg': '1.0' * 10}}
+    for requirement in ('a', 'b', 'c'):
+        cache.put(resolution_key([requirement], 'snapshot'), report)
+    assert cache.get(resolution_key(['a'], 'snapshot')) is None
+    assert cache.get(resolution_key(['c'], 'snapshot')) == report
+
+    cache.max_age = -1
+    cache.evict()
+    assert cache.get(resolution_key(['c'], 'snapshot')) is None
@@ -0,0 +1,37 @@
+import os
+import random
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+
+from analyzer import JavaScriptDependencyAnalyzer
+from resolver.resolver_engine import DependencyResolver
+from version_keys import compare_versions, is_semantic_version, loose_key, sort_key
+
+def test_loose_keys_are_totally_ordered():
+    """
+    Test that arbitrary version strings sort without errors and in release order.
+    """
+    ordered = ['1.0.dev1', '1.0-alpha', '1.0b2', '1.0rc1', '1.0', '1.0.post1', '1.0-custom', '1.0.1', '1.10', 'v2']
+    shuffled = list(ordered)
+    random.Random(0).shuffle(shuffled)
+
+    assert sorted(shuffled, key=loose_key) == ordered
+    assert loose_key('1.0') == loose_key('1.0.0') == loose_key('v1')
+    assert sorted(['latest', '2.0', 'workspace:*', '', '1.0'], key=loose_key)
+    assert DependencyResolver.parse_version('2.0.0-beta') < DependencyResolver.parse_version('2.0.0')
+
+def test_compare_versions_by_scheme():
+    """
+    Test scheme-aware comparison and the loose fallback for invalid versions.
+    """
+    assert compare_versions('1.10.0', '1.9.0') == 1
+    assert compare_versions('1.0.0-rc.1', '1.0.0', 'semver') == -1
+    assert compare_versions('1.0', '1.0.0', 'maven') == 0
+    assert compare_versions('1.0-custom', '1.0') == 1
+    assert sorted(['2.0.0', 'next', '1.0.0'], key=sort_key('semver')) == ['1.0.0', '2.0.0', 'next']
+
+    analyzer = JavaScriptDependencyAnalyzer()
+    assert analyzer._compare_versions('1.2.3-beta.2', '1.2.3-beta.10') == -1
+    assert analyzer._is_semantic_version('1.2.3-rc.1+build.5')
+    assert not is_semantic_version('1.2')
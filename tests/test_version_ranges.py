@@ -0,0 +1,85 @@
+import os
+import pytest
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+
+from analyzer import JavaScriptDependencyAnalyzer
+from version_ranges import parse_range, ranges_overlap, version_key
+
+@pytest.mark.parametrize('scheme, specs, overlap', [
+    ('npm', ['^4.17.21', '^4.17.0'], True),
+    ('npm', ['^4.0.0', '^5.0.0'], False),
+    ('npm', ['~1.2.3', '1.2.x'], True),
+    ('npm', ['~1.2.3', '1.3.x'], False),
+    ('npm', ['^0.2.3', '^0.3.0'], False),
+    ('npm', ['1.2.3 - 2', '2.9.9'], True),
+    ('npm', ['^1.0.0 || ^2.0.0', '~2.1.0'], True),
+    ('npm', ['^1.0.0', '2.0.0-beta.1'], False),
+    ('npm', ['>= 1.2.3 <2', '*'], True),
+    ('cargo', ['1.0', '1.2.3'], True),
+    ('cargo', ['1.0', '2.0'], False),
+    ('cargo', ['0.1', '0.2'], False),
+    ('cargo', ['>=2, <3', '=3.1'], False),
+    ('maven', ['[1.0,2.0)', '1.5'], True),
+    ('maven', ['[1.0,2.0)', '2.0'], False),
+    ('maven', ['(,1.0],[1.2,)', '1.1'], False),
+    ('maven', ['1.0', '1.0.0'], True),
+    ('pep440', ['>=2,<3', '3.1'], False),
+    ('pep440', ['~=1.4.5', '==1.4.9'], True),
+    ('pep440', ['~=1.4.5', '==1.5.0'], False),
+    ('pep440', ['!=1.2.*', '==1.2.7'], False),
+    ('pep440', ['!=1.2.7', '>=1.2'], True),
+])
+def test_ranges_overlap(scheme, specs, overlap):
+    """
+    Test range intersection for each supported requirement syntax.
+    """
+    assert ranges_overlap(scheme, specs) is overlap
+
+def test_version_keys_follow_ecosystem_ordering():
+    """
+    Test that version keys sort like each ecosystem orders versions.
+    """
+    pep440 = ['1.0.dev0', '1.0a1', '1.0b0', '1.0rc1', '1.0', '1.0+local', '1.0.post1', '1.1.dev0', '1!0.1']
+    assert sorted(pep440, key=lambda v: version_key('pep440', v)) == pep440
+
+    maven = ['1.0-alpha-1', '1.0-beta', '1.0-SNAPSHOT', '1.0', '1.0-sp', '1.0.1']
+    assert sorted(maven, key=lambda v: version_key('maven', v)) == maven
+
+    semver = ['1.0.0-alpha', '1.0.0-alpha.1', '1.0.0-beta', '1.0.0', '1.0.1', '1.10.0']
+    assert sorted(semver, key=lambda v: version_key('npm', v)) == semver
+
+    assert parse_range('npm', '^1.2.3').contains(version_key('npm', '1.9.0'))
+    assert not parse_range('npm', '^1.2.3').contains(version_key('npm', '2.0.0'))
+
+@pytest.mark.parametrize('scheme, spec', [
+    ('npm', 'latest'),
+    ('npm', 'git+https://github.com/user/repo.git'),
+    ('maven', '${spring.version}'),
+    ('pep440', 'not a version'),
+])
+def test_unparseable_requirements_raise(scheme, spec):
+    """
+    Test that requirements outside the grammar are rejected.
+    """
+    with pytest.raises(ValueError):
+        parse_range(scheme, spec)
+
+def test_conflicts_require_disjoint_ranges():
+    """
+    Test that only unsatisfiable or unparseable requirement sets conflict.
+    """
+    analyzer = JavaScriptDependencyAnalyzer()
+    compatible = [
+        {'name': 'lodash', 'version': '^4.17.21', 'source': 'a/package.json'},
+        {'name': 'lodash', 'version': '^4.17.0', 'source': 'b/package.json'},
+    ]
+    assert analyzer.detect_conflicts(compatible) == []
+
+    incompatible = compatible + [{'name': 'lodash', 'version': '^3.10.1', 'source': 'c/package.json'}]
+    conflicts = analyzer.detect_conflicts(incompatible)
+    assert [v['version'] for v in conflicts[0]['versions']] == ['^4.17.21', '^4.17.0', '^3.10.1']
+
+    unparseable = compatible + [{'name': 'lodash', 'version': 'github:lodash/lodash', 'source': 'c/package.json'}]
+    assert len(analyzer.detect_conflicts(unparseable)) == 1
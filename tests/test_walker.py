@@ -0,0 +1,136 @@
+import os
+import shutil
+import tempfile
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+
+from project_walker import ProjectWalker
+from analyzer import JavaDependencyAnalyzer
+
+def create_tree(files):
+    """
+    Create a temporary directory containing the given relative file paths.
+    """
+    temp_dir = tempfile.mkdtemp()
+    for rel_path, content in files.items():
+        full_path = os.path.join(temp_dir, rel_path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'w') as f:
+            f.write(content)
+    return temp_dir
+
+def test_walker_groups_by_extension_and_name():
+    """
+    Test that a single walk routes files by extension and manifest name.
+    """
+    root = create_tree({
+        'pom.xml': '<project/>',
+        'sub/pom.xml': '<project/>',
+        'sub/App.java': 'import java.util.List;\n',
+        'main.rs': 'use std::fs;\n',
+        'README.md': '# readme\n',
+    })
+
+    try:
+        index = ProjectWalker(['.java', '.rs'], ['pom.xml']).walk(root)
+
+        assert index.files_with_extensions(['.java']) == [os.path.join(root, 'sub', 'App.java')]
+        assert index.files_with_extensions(['.rs']) == [os.path.join(root, 'main.rs')]
+        assert index.files_with_extensions(['.md']) == []
+
+        # Files of a directory come before those of its subdirectories
+        assert index.first_file_named('pom.xml') == os.path.join(root, 'pom.xml')
+        assert len(index.files_named('pom.xml')) == 2
+    finally:
+        shutil.rmtree(root)
+
+def test_analyzer_uses_shared_index():
+    """
+    Test that an analyzer only reads the files handed to it by the index.
+    """
+    root = create_tree({
+        'src/Main.java': 'import java.io.File;\n',
+        'other/Skipped.java': 'import java.net.URL;\n',
+    })
+
+    try:
+        index = ProjectWalker(['.rs'], []).walk(root)
+        index.add_by_extension('.java', os.path.join(root, 'src', 'Main.java'))
+
+        result = JavaDependencyAnalyzer().analyze_dependencies(root, index)
+        names = [dep['name'] for dep in result['dependencies']]
+
+        assert names == ['java.io.File']
+    finally:
+        shutil.rmtree(root)
+
+def test_walker_prunes_default_and_ignored_directories():
+    """
+    Test built-in pruning plus .gitignore, .polydependignore and extra patterns.
+    """
+    root = create_tree({
+        'app/main.py': 'import requests\n',
+        'node_modules/lodash/index.js': 'require("x")\n',
+        'build/lib/gen.py': 'import gen\n',
+        '.gitignore': 'generated/\n*.tmp.py\n',
+        'generated/out.py': 'import out\n',
+        'app/scratch.tmp.py': 'import scratch\n',
+        'pkg/.gitignore': '/local.py\n',
+        'pkg/local.py': 'import local\n',
+        'pkg/sub/local.py': 'import kept\n',
+        '.polydependignore': 'legacy/**\n',
+        'legacy/old.py': 'import old\n',
+        'tools/script.py': 'import click\n',
+    })
+
+    try:
+        walker = ProjectWalker(['.py', '.js'], [], ignore_patterns=['tools/'])
+        found = sorted(
+            os.path.relpath(path, root).replace(os.sep, '/')
+            for path in walker.walk(root).files_with_extensions(['.py', '.js'])
+        )
+
+        assert found == ['app/main.py', 'pkg/sub/local.py']
+
+        # Everything is scanned once pruning and ignore files are disabled
+        walker = ProjectWalker(['.py', '.js'], [], prune_dirs=None, use_ignore_files=False)
+        assert len(walker.walk(root).files_with_extensions(['.py', '.js'])) == 9
+    finally:
+        shutil.rmtree(root)
+
+def test_detect_is_bounded_and_stops_early():
+    """
+    Test the breadth-first detection walk and its truncation flag.
+    """
+    root = create_tree({
+        'Cargo.toml': '',
+        'node_modules/dep/package.json': '{}',
+        'src/lib/deep/mod.rs': '',
+        'src/lib/deep/deeper/App.java': '',
+    })
+
+    try:
+        walker = ProjectWalker(['.rs', '.java'], ['Cargo.toml', 'package.json'])
+        assert walker.detect(root) == ({'Cargo.toml', '.rs'}, True)
+        assert walker.detect(root, max_depth=4) == ({'Cargo.toml', '.rs', '.java'}, False)
+
+        walker = ProjectWalker(['.rs'], ['Cargo.toml'])
+        assert walker.detect(root, max_depth=0) == ({'Cargo.toml'}, True)
+        assert walker.detect(root) == ({'Cargo.toml', '.rs'}, False)
+    finally:
+        shutil.rmtree(root)
+
+    # Directories at the depth limit are all scanned, even after one had children
+    root = create_tree({
+        'a/pom.xml': '',
+        'a/nested/notes.txt': '',
+        'b/App.java': '',
+        'b/nested/notes.txt': '',
+    })
+
+    try:
+        walker = ProjectWalker(['.java'], ['pom.xml'])
+        assert walker.detect(root, max_depth=1) == ({'pom.xml', '.java'}, False)
+    finally:
+        shutil.rmtree(root)